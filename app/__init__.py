@@ -1,8 +1,14 @@
 # app/__init__.py
 import os
+import threading
+import time
 from flask import Flask
+from sqlalchemy import text
 from config import Config
 from .extensions import db, migrate, login_manager
+from .wrappers import UploadRequest
+from .engine import apply_engine_profile
+from . import cli, compression, http_cache, instrumentation
 
 # Blueprints
 from .blueprints.auth import auth_bp
@@ -10,18 +16,18 @@ from .blueprints.core import core_bp
 from .blueprints.providers import providers_bp
 from .blueprints.clients import clients_bp
 from .blueprints.accounts import accounts_bp
+from .blueprints.api import api_bp
 
-# Notificaciones (scheduler opcional)
-from apscheduler.schedulers.background import BackgroundScheduler
-from .services.notify import send_pushover_now
-
-# Evitamos múltiples schedulers en procesos/instancias
+# APScheduler, notify (requests) y pandas se importan al usarse: el arranque
+# en frío de las máquinas de Fly (scale-to-zero) no paga esas importaciones.
+# Un scheduler por proceso; el lease en la BD decide cuál ejecuta los jobs
 scheduler = None
 
 
 def create_app():
     app = Flask(__name__, instance_relative_config=True)
     app.config.from_object(Config)
+    app.request_class = UploadRequest
 
     # Carpetas necesarias (subidas, instancia, etc.)
     os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
@@ -32,7 +38,13 @@ def create_app():
 
     # Extensiones
     db.init_app(app)
+    with app.app_context():
+        apply_engine_profile(db.engine, app.config)
+        instrumentation.init_app(app, db.engine)
     migrate.init_app(app, db)
+    cli.init_app(app)
+    http_cache.init_app(app)
+    compression.init_app(app)
     login_manager.login_view = "auth.login"
     login_manager.init_app(app)
 
@@ -42,37 +54,75 @@ def create_app():
     app.register_blueprint(providers_bp, url_prefix="/providers")
     app.register_blueprint(clients_bp, url_prefix="/clients")
     app.register_blueprint(accounts_bp, url_prefix="/accounts")
+    app.register_blueprint(api_bp, url_prefix="/api/v1")
 
     # === Scheduler diario (controlado por ENV) ===
     # ENABLE_SCHEDULER: activa/desactiva en general (Config)
-    # RUN_SCHEDULER: útil cuando escalas a varias máquinas (solo 1 con "1")
+    # RUN_SCHEDULER=0 deja a este proceso fuera de la elección de líder.
+    # Todos los procesos laten; solo el que tiene el lease en la BD ejecuta
+    # los jobs (services/scheduler.py), así no se duplican entre workers/máquinas.
     if app.config.get("ENABLE_SCHEDULER", True) and os.environ.get("RUN_SCHEDULER", "1") == "1":
         global scheduler
         if scheduler is None:
-            scheduler = BackgroundScheduler(daemon=True)
+            from .services.scheduler import LeaderScheduler, DailyJob
             hour = int(app.config.get("NOTIFY_RUN_HOUR", 9))
-            scheduler.add_job(
-                func=lambda: _run_notify_job(app),
-                trigger="cron",
-                hour=hour,
-                minute=0,
-                id="notify_daily",
-                replace_existing=True,
-            )
-            scheduler.start()
-            app.logger.info("APScheduler iniciado: job 'notify_daily' a las %02d:00", hour)
+            scheduler = LeaderScheduler(app, [
+                DailyJob("notify_daily", hour, 0, _run_notify_job),
+                # Cuentas que cruzan de "activa" a "por vencer" o a "vencida" con el cambio de día
+                DailyJob("status_buckets_daily", 0, 5, _run_status_job),
+            ]).start()
+            app.logger.info("Scheduler iniciado (%s): 'notify_daily' a las %02d:00", scheduler.holder, hour)
         else:
-            app.logger.info("APScheduler ya estaba iniciado; no se duplica.")
+            app.logger.info("Scheduler ya estaba iniciado; no se duplica.")
+
+    # Calentamiento tras el arranque (conexión a la BD, plantillas)
+    if app.config.get("WARMUP_ON_BOOT", True):
+        threading.Thread(target=warm_up, args=(app,), name="warmup", daemon=True).start()
+
+    # Importaciones que quedaron a medias en un arranque anterior
+    if app.config.get("IMPORT_RESUME_ON_BOOT", True):
+        threading.Thread(target=_resume_imports, args=(app,), name="import-resume", daemon=True).start()
 
     return app
 
 
+def _resume_imports(app):
+    from .services.jobs import resume_pending
+    resume_pending(app)
+
+
+def warm_up(app):
+    """Abre la conexión a la BD y compila las plantillas antes de la primera visita."""
+    started = time.perf_counter()
+    with app.app_context():
+        try:
+            db.session.execute(text("SELECT 1"))
+            for name in ("base.html", "auth/login.html", "core/dashboard.html", "accounts/accounts.html"):
+                app.jinja_env.get_template(name)
+        except Exception as e:
+            app.logger.warning("Warm-up incompleto: %s", e)
+        finally:
+            db.session.remove()
+    app.logger.info("Warm-up listo en %.0f ms", (time.perf_counter() - started) * 1000)
+
+
 def _run_notify_job(app):
     """Job que envía el resumen por Pushover."""
+    from .services.notify import send_pushover_now
+    with app.app_context():
+        # La función ya usa current_app/config internamente
+        results = send_pushover_now()
+        app.logger.info("Pushover notifications enviadas: %s", results)
+
+
+def _run_status_job(app):
+    """Job que recalcula Account.status_bucket tras el cambio de día."""
+    from .services.status import refresh_status_buckets
     with app.app_context():
         try:
-            # La función ya usa current_app/config internamente
-            results = send_pushover_now()
-            app.logger.info("Pushover notifications enviadas: %s", results)
-        except Exception as e:
-            app.logger.exception("Notifier error: %s", e)
+            changed = refresh_status_buckets()
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        app.logger.info("status_bucket recalculado en %s cuentas", changed)
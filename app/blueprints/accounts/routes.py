@@ -1,19 +1,33 @@
-import os
 from datetime import date, datetime, timedelta
-from io import BytesIO
 
 from flask import (
     render_template, request, redirect, url_for,
-    flash, send_file, current_app
+    flash, send_file, current_app, Response, stream_with_context,
+    jsonify, abort
 )
-from flask_login import login_required
-from sqlalchemy import or_, func
+from flask_login import login_required, current_user
+from sqlalchemy import func, select
+from sqlalchemy.orm import contains_eager, joinedload
 
 from . import accounts_bp
 from ...extensions import db
-from ...models import Account, Provider, Client
-from ...services.excel_io import generate_template_bytes
-import pandas as pd
+from ...models import Account, Provider, Client, ImportJob, SOON_DAYS
+from ...services.excel_io import (
+    generate_template_bytes, iter_csv, iter_xlsx, EXPORT_COLUMNS
+)
+from ...services.filters import join_account_names, apply_account_filters
+from ...services.status import ensure_fresh as ensure_status_fresh
+from ...services.importer import MODES as IMPORT_MODES
+from ...services import jobs as import_jobs
+from ...services.pagination import keyset_paginate, order_forward
+from ...services import cache, bulk, metrics
+from ...services.bulk import ACTIONS as BULK_ACTIONS
+from ...services.lookups import search as search_lookup, KINDS as LOOKUP_KINDS
+from ...http_cache import conditional
+from ...compression import no_compress
+
+# Filas por lote al leer de la BD en el export
+EXPORT_BATCH = 1000
 
 
 def parse_date_str(s: str):
@@ -32,17 +46,10 @@ def parse_date_str(s: str):
         return None
 
 
-def parse_date_cell(v):
-    if pd.isna(v):
-        return None
-    try:
-        return pd.to_datetime(v).date()
-    except Exception:
-        return None
-
-
 @accounts_bp.route('/', methods=['GET', 'POST'])
 @login_required
+@no_compress   # contraseñas + `q` reflejado: sin compresión por BREACH
+@conditional
 def index():
     # Crear nueva
     if request.method == 'POST' and request.form.get('action') == 'create':
@@ -66,89 +73,59 @@ def index():
 
     # Filtros
     today = date.today()
-    soon_limit = today + timedelta(days=7)
+    soon_limit = today + timedelta(days=SOON_DAYS)
 
     q        = (request.args.get('q') or "").strip()            # libre
     status   = (request.args.get('status') or 'all').strip()    # estado (incluye 'down')
     platform = (request.args.get('platform') or "").strip()     # selector plataforma
 
-    page = int(request.args.get('page', 1) or 1)
+    after    = request.args.get('after') or None               # cursor página siguiente
+    before   = request.args.get('before') or None              # cursor página anterior
     per_page = 10
 
-    query = (Account.query.outerjoin(Client).outerjoin(Provider))
-
-    if platform:
-        query = query.filter(
-            func.lower(func.trim(Account.platform)) ==
-            func.lower(func.trim(func.cast(platform, db.String())))
-        )
+    ensure_status_fresh(today)
+    # Cliente y proveedor salen del mismo JOIN que usan los filtros (sin N+1)
+    query = join_account_names(Account.query).options(
+        contains_eager(Account.client), contains_eager(Account.provider)
+    )
+    query = apply_account_filters(query, q=q, status=status, platform=platform)
 
-    if q:
-        term = f"%{q.replace('%','').replace('_','').strip()}%"
-        term_l = func.lower(term)
-        query = query.filter(or_(
-            func.lower(Account.platform).like(term_l),
-            func.lower(Account.username).like(term_l),
-            func.lower(Client.name).like(term_l),
-            func.lower(Provider.name).like(term_l),
-        ))
-
-    # Estado (el manual 'Caída' predomina)
-    if status == 'down':
-        query = query.filter(Account.status_manual == 'CAIDA')
-    elif status == 'nodate':
-        query = query.filter(Account.status_manual.is_(None),
-                             Account.end_date.is_(None))
-    elif status == 'expired':
-        query = query.filter(Account.status_manual.is_(None),
-                             Account.end_date.is_not(None), Account.end_date < today)
-    elif status == 'expiring':
-        query = query.filter(Account.status_manual.is_(None),
-                             Account.end_date.is_not(None),
-                             Account.end_date >= today, Account.end_date <= soon_limit)
-    elif status == 'active':
-        query = query.filter(Account.status_manual.is_(None),
-                             Account.end_date.is_not(None), Account.end_date > soon_limit)
-
-    query = query.order_by(Account.end_date.is_(None),
-                           Account.end_date.asc(),
-                           Account.created_at.desc())
-
-    pagination = query.paginate(page=page, per_page=per_page, error_out=False)
+    pagination = keyset_paginate(query, per_page, after=after, before=before)
     accounts = pagination.items
 
-    providers = Provider.query.order_by(Provider.name).all()
-    clients = Client.query.order_by(Client.name).all()
-
-    platform_options = [
-        row[0] for row in (
-            db.session.query(func.trim(Account.platform))
-            .filter(Account.platform.isnot(None))
-            .distinct()
-            .order_by(func.lower(func.trim(Account.platform)))
-            .all()
+    # Total opcional: un COUNT sobre el join por filtro, cacheado hasta el próximo commit
+    total = None
+    if current_app.config.get("ACCOUNTS_LIST_COUNT", True):
+        total = cache.get_or_set(
+            ("accounts_count", q, status, platform, today),
+            query.count,
+            current_app.config.get("DASHBOARD_CACHE_TTL", 30),
         )
-    ]
 
     return render_template(
         'accounts/accounts.html',
         accounts=accounts,
-        providers=providers,
-        clients=clients,
         today=today,
         soon_limit=soon_limit,
         q=q,
         status=status,
         platform_selected=platform,
-        platform_options=platform_options,
-        pagination=pagination
+        pagination=pagination,
+        total=total,
+        after=after,
+        before=before,
+        import_job=request.args.get('import_job', type=int)
     )
 
 
 @accounts_bp.route('/<int:id>/edit', methods=['GET', 'POST'])
 @login_required
 def edit(id):
-    a = Account.query.get_or_404(id)
+    a = db.first_or_404(
+        select(Account)
+        .options(joinedload(Account.client), joinedload(Account.provider))
+        .where(Account.id == id)
+    )
     if request.method == 'POST':
         a.platform = request.form.get('platform')
         a.username = request.form.get('username')
@@ -166,9 +143,20 @@ def edit(id):
         flash('Cuenta actualizada', 'success')
         return redirect(url_for('accounts.index'))
 
-    providers = Provider.query.order_by(Provider.name).all()
-    clients = Client.query.order_by(Client.name).all()
-    return render_template('accounts/account_form.html', account=a, providers=providers, clients=clients)
+    return render_template('accounts/account_form.html', account=a)
+
+
+@accounts_bp.route('/lookup/<kind>')
+@login_required
+def lookup(kind):
+    """Autocompletado JSON: /accounts/lookup/<providers|clients|platforms>?q=pre&limit=10"""
+    if kind not in LOOKUP_KINDS:
+        abort(404)
+    try:
+        limit = int(request.args.get('limit', 10))
+    except ValueError:
+        limit = 10
+    return jsonify(search_lookup(kind, request.args.get('q', ''), limit))
 
 
 @accounts_bp.route('/<int:id>/delete', methods=['POST'])
@@ -201,163 +189,172 @@ def upload_excel():
         flash('No se subió archivo', 'warning')
         return redirect(url_for('accounts.index'))
 
-    path = os.path.join(current_app.config['UPLOAD_FOLDER'], f.filename)
-    f.save(path)
+    mode = (request.form.get('mode') or 'insert').strip()
+    if mode not in IMPORT_MODES:
+        mode = 'insert'
 
+    app = current_app._get_current_object()
+    if app.config.get('IMPORT_ASYNC', True) and import_jobs.active_count() >= app.config.get('IMPORT_MAX_ACTIVE', 5):
+        flash('Hay demasiadas importaciones en curso; intenta en unos minutos.', 'warning')
+        return redirect(url_for('accounts.index'))
+
+    # La hoja se copia para el job (y se borra al terminar); se procesa por lotes
     try:
-        df = pd.read_excel(path, engine='openpyxl')
-    except Exception as e:
-        flash(f'Error leyendo Excel: {e}', 'danger')
+        job, columns = import_jobs.create_job(app, f, mode, user_id=current_user.id)
+    except ValueError as e:
+        flash(str(e), 'danger')
         return redirect(url_for('accounts.index'))
 
-    df.columns = [c.lower() for c in df.columns]
     required = {'platform', 'username'}
-    if not required.issubset(set(df.columns)):
+    if not required.issubset(set(columns)):
+        import_jobs.discard_job(job)
         flash(f'La plantilla debe contener: {required}', 'danger')
         return redirect(url_for('accounts.index'))
 
-    inserted = 0
-    for _, row in df.iterrows():
-        provider = client = None
-        if 'provider' in df.columns and pd.notna(row.get('provider')):
-            provider_name = str(row['provider']).strip()
-            provider = Provider.query.filter_by(name=provider_name).first()
-            if not provider:
-                provider = Provider(name=provider_name)
-                db.session.add(provider)
-                db.session.flush()
-
-        if 'client' in df.columns and pd.notna(row.get('client')):
-            client_name = str(row['client']).strip()
-            client = Client.query.filter_by(name=client_name).first()
-            if not client:
-                client = Client(name=client_name, provider=provider)
-                db.session.add(client)
-                db.session.flush()
-
-        a = Account(
-            platform=str(row.get('platform')).strip(),
-            username=str(row.get('username')).strip(),
-            password=str(row.get('password')) if 'password' in df.columns else None,
-            provider=provider,
-            client=client,
-            start_date=parse_date_cell(row.get('start_date')),
-            end_date=parse_date_cell(row.get('end_date')),
-            time_allocated=int(row.get('time_allocated')) if ('time_allocated' in df.columns and pd.notna(row.get('time_allocated'))) else None,
-            notes=str(row.get('notes')) if 'notes' in df.columns else None
+    db.session.commit()
+    job_id = job.id
+    import_jobs.submit(app, job_id)
+
+    job = db.session.get(ImportJob, job_id, populate_existing=True)
+    if job.status == 'failed':
+        flash(job.error or 'La importación falló', 'danger')
+    elif job.status == 'done':
+        s = job.to_dict()
+        flash(
+            f"{s['inserted']} cuentas importadas, {s['updated']} actualizadas, "
+            f"{s['skipped']} omitidas ({s['rows_per_second']:.0f} filas/s)",
+            'success'
         )
-        db.session.add(a)
-        inserted += 1
+    else:
+        flash(f'Importación #{job_id} en curso: puedes seguir usando la app.', 'info')
+    return redirect(url_for('accounts.index', import_job=job_id))
 
-    db.session.commit()
-    flash(f'{inserted} cuentas importadas', 'success')
-    return redirect(url_for('accounts.index'))
+
+@accounts_bp.route('/import-jobs/<int:id>')
+@login_required
+def import_job_status(id):
+    """Progreso de una importación en JSON (lo consulta la lista cada pocos segundos)."""
+    job = db.get_or_404(ImportJob, id)
+    app = current_app._get_current_object()
+    stale = datetime.utcnow() - timedelta(seconds=app.config.get('IMPORT_STALE_SECONDS', 300))
+    # Un job sin latido quedó huérfano (reinicio del proceso): se vuelve a encolar
+    if job.status == 'running' and (job.heartbeat_at is None or job.heartbeat_at < stale):
+        import_jobs.submit(app, job.id)
+    return jsonify(job.to_dict())
 
 
 @accounts_bp.route('/export')
 @login_required
 def export_accounts():
-    """Exporta a Excel respetando filtros (q, status, platform)."""
-    today = date.today()
-    soon_limit = today + timedelta(days=7)
+    """Exporta a Excel (o CSV con format=csv) respetando filtros (q, status, platform)."""
     q        = (request.args.get('q') or "").strip()
     status   = (request.args.get('status') or 'all').strip()
     platform = (request.args.get('platform') or "").strip()
+    fmt      = (request.args.get('format') or 'xlsx').strip().lower()
+
+    # Solo las columnas necesarias, con join: nada de objetos ORM ni lazy loads
+    stmt = join_account_names(select(
+        Account.platform,
+        Account.username,
+        Account.password,
+        Client.name,
+        Provider.name,
+        Account.start_date,
+        Account.end_date,
+        func.coalesce(Account.status_manual, ''),
+        Account.notes,
+    ).select_from(Account))
+    ensure_status_fresh()
+    stmt = apply_account_filters(stmt, q=q, status=status, platform=platform)
+    # Mismo orden que la lista: lo sirve su índice, sin ordenar en memoria
+    stmt = stmt.order_by(*order_forward())
+
+    def rows():
+        n = 0
+        result = db.session.execute(stmt.execution_options(yield_per=EXPORT_BATCH))
+        for row in result:
+            n += 1
+            yield tuple(row)
+        metrics.inc('app_export_rows_total', n, format=fmt)
+
+    if fmt != 'csv':
+        fmt = 'xlsx'
+    metrics.inc('app_exports_total', format=fmt)
+    if fmt == 'csv':
+        body = iter_csv(EXPORT_COLUMNS, rows())
+        mimetype = 'text/csv'
+        filename = 'cuentas_filtradas.csv'
+    else:
+        body = iter_xlsx(EXPORT_COLUMNS, rows())
+        mimetype = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+        filename = 'cuentas_filtradas.xlsx'
+
+    return Response(
+        stream_with_context(body),
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename={filename}'}
+    )
 
-    query = Account.query.outerjoin(Client).outerjoin(Provider)
-
-    if platform:
-        query = query.filter(
-            func.lower(func.trim(Account.platform)) ==
-            func.lower(func.trim(func.cast(platform, db.String())))
-        )
+# --- Acciones masivas: un solo UPDATE/DELETE sobre la selección o el filtro ---
+BULK_MESSAGES = {
+    'delete': 'Se eliminaron {n} cuentas.',
+    'mark_down': '{n} cuentas marcadas como caídas.',
+    'clear_status': 'Se quitó el estado manual a {n} cuentas.',
+    'extend_days': 'Se extendió la fecha de {n} cuentas.',
+    'extend_allocated': 'Se extendió la fecha de {n} cuentas según su tiempo asignado.',
+    'reassign': 'Se reasignaron {n} cuentas.',
+}
 
-    if q:
-        term = f"%{q.replace('%','').replace('_','').strip()}%"
-        term_l = func.lower(term)
-        query = query.filter(or_(
-            func.lower(Account.platform).like(term_l),
-            func.lower(Account.username).like(term_l),
-            func.lower(Client.name).like(term_l),
-            func.lower(Provider.name).like(term_l),
-        ))
-
-    if status == 'down':
-        query = query.filter(Account.status_manual == 'CAIDA')
-    elif status == 'nodate':
-        query = query.filter(Account.status_manual.is_(None),
-                             Account.end_date.is_(None))
-    elif status == 'expired':
-        query = query.filter(Account.status_manual.is_(None),
-                             Account.end_date.is_not(None), Account.end_date < today)
-    elif status == 'expiring':
-        query = query.filter(Account.status_manual.is_(None),
-                             Account.end_date.is_not(None),
-                             Account.end_date >= today, Account.end_date <= soon_limit)
-    elif status == 'active':
-        query = query.filter(Account.status_manual.is_(None),
-                             Account.end_date.is_not(None), Account.end_date > soon_limit)
-
-    rows = []
-    for a in query.order_by(Account.end_date.is_(None), Account.end_date.asc()).all():
-        # Puedes incluir status_manual si quieres verlo en Excel
-        rows.append({
-            'platform': a.platform,
-            'username': a.username,
-            'password': a.password,
-            'client': a.client.name if a.client else '',
-            'provider': a.provider.name if a.provider else '',
-            'start_date': a.start_date,
-            'end_date': a.end_date,
-            'status_manual': a.status_manual or '',
-            'notes': a.notes
-        })
-
-    df = pd.DataFrame(rows)
-    bio = BytesIO()
-    with pd.ExcelWriter(bio, engine='openpyxl') as writer:
-        df.to_excel(writer, index=False, sheet_name='Cuentas')
-    bio.seek(0)
-    return send_file(
-        bio,
-        as_attachment=True,
-        download_name='cuentas_filtradas.xlsx',
-        mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-    )
 
-# --- Acciones masivas: eliminar varias cuentas ---
 @accounts_bp.route('/bulk-action', methods=['POST'])
 @login_required
 def bulk_action():
     action = (request.form.get('action') or '').strip()
+    scope = (request.form.get('scope') or 'selected').strip()   # 'selected' o 'filter'
     ids = request.form.getlist('selected')  # viene de los checkboxes
 
     # Conservamos filtros para volver a la vista tal cual estaba
     q = request.form.get('q') or ''
     status = request.form.get('status') or 'all'
     platform = request.form.get('platform') or ''
-    page = request.form.get('page') or 1
+    after = request.form.get('after') or None
+    before = request.form.get('before') or None
+    back = redirect(url_for('accounts.index', q=q, status=status, platform=platform, after=after, before=before))
+
+    if action not in BULK_ACTIONS:
+        flash('Acción no soportada.', 'warning')
+        return back
 
-    if not ids:
-        flash('No seleccionaste ninguna cuenta.', 'warning')
-        return redirect(url_for('accounts.index', q=q, status=status, platform=platform, page=page))
+    if scope == 'filter':
+        # Todo lo que cumple el filtro actual, resuelto en la BD
+        ensure_status_fresh()
+        criterion = bulk.selection(q=q.strip(), status=status.strip(), platform=platform.strip())
+    else:
+        if not ids:
+            flash('No seleccionaste ninguna cuenta.', 'warning')
+            return back
+        # Sanitizar a enteros
+        try:
+            criterion = bulk.selection(ids=[int(x) for x in ids])
+        except ValueError:
+            flash('IDs inválidos.', 'danger')
+            return back
 
-    # Sanitizar a enteros
     try:
-        ids_int = [int(x) for x in ids]
-    except ValueError:
-        flash('IDs inválidos.', 'danger')
-        return redirect(url_for('accounts.index', q=q, status=status, platform=platform, page=page))
+        n = bulk.run(
+            action, criterion,
+            days=request.form.get('days'),
+            provider_id=request.form.get('provider_id') or None,
+            client_id=request.form.get('client_id') or None,
+        )
+    except ValueError as e:
+        db.session.rollback()
+        flash(str(e), 'danger')
+        return back
+    db.session.commit()
 
+    flash(BULK_MESSAGES[action].format(n=n), 'success')
+    # Tras borrar, los cursores pueden apuntar a filas que ya no existen
     if action == 'delete':
-        # Elimina de forma segura
-        to_delete = Account.query.filter(Account.id.in_(ids_int)).all()
-        n = len(to_delete)
-        for a in to_delete:
-            db.session.delete(a)
-        db.session.commit()
-        flash(f'Se eliminaron {n} cuentas.', 'success')
-    else:
-        flash('Acción no soportada.', 'warning')
-
-    return redirect(url_for('accounts.index', q=q, status=status, platform=platform, page=page))
+        return redirect(url_for('accounts.index', q=q, status=status, platform=platform))
+    return back
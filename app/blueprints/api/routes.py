@@ -0,0 +1,144 @@
+"""
+API JSON de cuentas (/api/v1), autenticada con token:
+
+    Authorization: Bearer <token>      (flask api-token create --email ...)
+
+GET   /api/v1/accounts    ?fields=id,platform,...&q=&status=&platform=&limit=&after=
+                          JSON {"items": [...], "next_cursor": ...} o, con
+                          Accept: application/x-ndjson (o format=ndjson), una
+                          cuenta por línea en streaming; si se cortó por `limit`,
+                          la última línea es {"next_cursor": ...}.
+POST  /api/v1/accounts    [{...}, ...]            alta por lotes, una transacción
+PATCH /api/v1/accounts    [{"id": 1, ...}, ...]   cambios por lotes, una transacción
+"""
+import json
+from datetime import datetime, timedelta
+from functools import wraps
+
+from flask import Response, current_app, g, jsonify, request, stream_with_context
+from sqlalchemy import select, update
+
+from . import api_bp
+from ...extensions import db
+from ...models import ApiToken
+from ...security import hash_api_token
+from ...services import api_accounts
+from ...services.status import ensure_fresh as ensure_status_fresh
+
+NDJSON = 'application/x-ndjson'
+# last_used_at se actualiza como mucho una vez por este intervalo
+TOKEN_TOUCH = timedelta(minutes=5)
+
+
+def _error(status, message, **extra):
+    return jsonify(error=message, **extra), status
+
+
+def token_required(view):
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        scheme, _, token = (request.headers.get('Authorization') or '').partition(' ')
+        if scheme.lower() != 'bearer' or not token.strip():
+            return _error(401, 'Falta el token (Authorization: Bearer <token>)')
+        api_token = db.session.scalar(
+            select(ApiToken).where(ApiToken.token_hash == hash_api_token(token.strip()),
+                                   ApiToken.revoked_at.is_(None))
+        )
+        if api_token is None:
+            return _error(401, 'Token inválido o revocado')
+
+        now = datetime.utcnow()
+        if api_token.last_used_at is None or now - api_token.last_used_at > TOKEN_TOUCH:
+            db.session.execute(
+                update(ApiToken).where(ApiToken.id == api_token.id).values(last_used_at=now)
+                .execution_options(synchronize_session=False)
+            )
+            db.session.commit()
+        g.api_token = api_token
+        return view(*args, **kwargs)
+    return wrapper
+
+
+def _wants_ndjson():
+    if request.args.get('format') == 'ndjson':
+        return True
+    # Con */* gana JSON: NDJSON solo si se pide explícitamente
+    return request.accept_mimetypes.best_match(['application/json', NDJSON]) == NDJSON
+
+
+@api_bp.route('/accounts', methods=['GET'])
+@token_required
+def list_accounts():
+    try:
+        fields = api_accounts.parse_fields(request.args.get('fields'))
+    except ValueError as e:
+        return _error(400, str(e))
+
+    ndjson = _wants_ndjson()
+    max_limit = current_app.config.get('API_MAX_PAGE', 1000)
+    limit = request.args.get('limit', type=int)
+    if limit is not None and limit < 1:
+        return _error(400, "'limit' debe ser >= 1")
+    if not ndjson:
+        limit = min(limit or current_app.config.get('API_PAGE_SIZE', 100), max_limit)
+
+    try:
+        stmt = api_accounts.select_accounts(
+            fields,
+            q=(request.args.get('q') or '').strip(),
+            status=(request.args.get('status') or 'all').strip(),
+            platform=(request.args.get('platform') or '').strip(),
+            after=request.args.get('after'),
+        )
+    except ValueError as e:
+        return _error(400, str(e))
+    ensure_status_fresh()
+
+    if not ndjson:
+        rows = db.session.execute(stmt.limit(limit + 1)).all()
+        has_next = len(rows) > limit
+        rows = rows[:limit]
+        return jsonify(
+            items=[api_accounts.row_to_dict(r, fields) for r in rows],
+            next_cursor=api_accounts.row_cursor(rows[-1]) if has_next else None,
+        )
+
+    if limit is not None:
+        stmt = stmt.limit(limit + 1)
+
+    def lines():
+        result = db.session.execute(stmt.execution_options(yield_per=current_app.config.get('API_STREAM_BATCH', 1000)))
+        n, last = 0, None
+        for row in result:
+            if limit is not None and n == limit:
+                yield json.dumps({'next_cursor': api_accounts.row_cursor(last)}) + '\n'
+                break
+            yield json.dumps(api_accounts.row_to_dict(row, fields), ensure_ascii=False) + '\n'
+            n, last = n + 1, row
+
+    return Response(stream_with_context(lines()), mimetype=NDJSON)
+
+
+def _write_batch(operation, status):
+    items = request.get_json(silent=True)
+    if isinstance(items, dict):
+        items = items.get('accounts')
+    try:
+        ids = operation(items, max_items=current_app.config.get('API_MAX_BATCH', 5000))
+    except api_accounts.BatchError as e:
+        db.session.rollback()
+        return _error(422, 'Lote inválido: no se guardó nada', errors=e.errors)
+    db.session.commit()
+    return jsonify(count=len(ids), ids=ids), status
+
+
+@api_bp.route('/accounts', methods=['POST'])
+@token_required
+def create_accounts():
+    return _write_batch(api_accounts.create_many, 201)
+
+
+@api_bp.route('/accounts', methods=['PATCH'])
+@token_required
+def update_accounts():
+    return _write_batch(api_accounts.update_many, 200)
@@ -1,13 +1,16 @@
-from flask import render_template, request, redirect, url_for, flash
+from flask import render_template, request, redirect, url_for, flash, current_app
 from flask_login import login_user, logout_user, current_user
+from sqlalchemy import select
 from . import auth_bp
 from ...extensions import db, login_manager
 from ...models import User
-from ...security import hash_password, verify_password
+from ...security import hash_password, verify_password, PasswordHashBusy
+from ...services import identity
 
 @login_manager.user_loader
 def load_user(user_id):
-    return User.query.get(int(user_id))
+    # Caché en proceso con TTL: las peticiones autenticadas no consultan la BD
+    return identity.load(int(user_id), current_app.config.get('USER_CACHE_TTL', 60))
 
 @auth_bp.route('/login', methods=['GET','POST'])
 def login():
@@ -15,7 +18,12 @@ def login():
         email = request.form.get('email')
         password = request.form.get('password')
         user = User.query.filter_by(email=email).first()
-        if user and verify_password(user.password_hash, password):
+        try:
+            ok = user is not None and verify_password(user.password_hash, password)
+        except PasswordHashBusy:
+            flash('Hay muchos inicios de sesión en curso; intenta de nuevo en unos segundos.', 'warning')
+            return render_template('auth/login.html'), 503
+        if ok:
             login_user(user, remember=bool(request.form.get('remember')))
             return redirect(url_for('core.dashboard'))
         flash('Email o contraseña inválida', 'danger')
@@ -24,7 +32,9 @@ def login():
 @auth_bp.route('/register', methods=['GET','POST'])
 def register():
     from config import Config
-    if not Config.ALLOW_REGISTRATION and User.query.count() > 0:
+    # Una sola consulta (EXISTS) sirve para el permiso y para el primer admin
+    has_users = db.session.scalar(select(User.id).limit(1)) is not None
+    if not Config.ALLOW_REGISTRATION and has_users:
         flash('Registro deshabilitado. Contacta al administrador.', 'warning')
         return redirect(url_for('auth.login'))
     if request.method == 'POST':
@@ -34,8 +44,13 @@ def register():
         if User.query.filter_by(email=email).first():
             flash('Usuario ya existe', 'warning')
             return redirect(url_for('auth.register'))
-        u = User(email=email, name=name, password_hash=hash_password(password))
-        if User.query.count() == 0:
+        try:
+            password_hash = hash_password(password)
+        except PasswordHashBusy:
+            flash('Servidor ocupado; intenta de nuevo en unos segundos.', 'warning')
+            return render_template('auth/register.html'), 503
+        u = User(email=email, name=name, password_hash=password_hash)
+        if not has_users:
             u.is_admin = True
         db.session.add(u)
         db.session.commit()
@@ -1,10 +1,11 @@
 # app/blueprints/clients/routes.py
-from flask import Blueprint, render_template, request, redirect, url_for, flash
+from flask import render_template, request, redirect, url_for, flash
 from flask_login import login_required
+from sqlalchemy.orm import joinedload
+from . import clients_bp
 from ...extensions import db
 from ...models import Client, Provider
 
-clients_bp = Blueprint("clients", __name__, template_folder="../../templates/clients")
 
 @clients_bp.route("/", methods=["GET", "POST"])
 @login_required
@@ -30,8 +31,12 @@ def index():
         return redirect(url_for("clients.index"))
 
     providers = Provider.query.order_by(Provider.name.asc()).all()
-    clients = Client.query.order_by(Client.name.asc()).all()
-    return render_template("clients/index.html", providers=providers, clients=clients)
+    # El proveedor de cada cliente viene en el mismo SELECT (sin N+1 en la tabla)
+    clients = (Client.query
+               .options(joinedload(Client.provider))
+               .order_by(Client.name.asc())
+               .all())
+    return render_template("clients/clients.html", providers=providers, clients=clients)
 
 @clients_bp.post("/<int:id>/delete")
 @login_required
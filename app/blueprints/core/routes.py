@@ -1,56 +1,65 @@
-from flask import render_template, flash, redirect, url_for
+import hmac
+
+from flask import render_template, flash, redirect, url_for, current_app, request, Response, abort
 from flask_login import login_required, current_user
 from . import core_bp
-from ...models import Account, Provider, Client
-from datetime import date, timedelta
-from sqlalchemy import or_, and_
-from ...services.notify import send_pushover_now
+from ...extensions import db
+from ...models import Account, Provider, Client, SOON_DAYS
+from ...services import cache, metrics
+from ...http_cache import conditional
+from ...services.status import ensure_fresh as ensure_status_fresh
+from datetime import date
+from sqlalchemy import select, func, case
 
-@core_bp.route('/')
-@login_required
-def dashboard():
-    today = date.today()
-    window_days = 7
-    soon_limit = today + timedelta(days=window_days)
+def _dashboard_stmt():
+    """Todos los contadores del dashboard en una sola consulta (SUM(CASE ...))."""
 
-    total_accounts   = Account.query.count()
-    total_providers  = Provider.query.count()
-    total_clients    = Client.query.count()
+    def bucket(name):
+        return func.coalesce(func.sum(case((Account.status_bucket == name, 1), else_=0)), 0)
 
-    # Sin fecha
-    no_date = Account.query.filter(Account.end_date.is_(None)).count()
+    return select(
+        func.count(Account.id),
+        bucket("nodate"),
+        bucket("expired"),
+        bucket("expiring"),
+        bucket("active"),
+        bucket("down"),
+        select(func.count(Provider.id)).scalar_subquery(),
+        select(func.count(Client.id)).scalar_subquery(),
+    ).select_from(Account)
 
-    # Vencidas
-    expired = Account.query.filter(
-        Account.end_date.is_not(None),
-        Account.end_date < today
-    ).count()
 
-    # Por vencer (en los próximos N días, incluye hoy)
-    expiring = Account.query.filter(
-        Account.end_date.is_not(None),
-        Account.end_date >= today,
-        Account.end_date <= soon_limit
-    ).count()
-
-    # Activas (más allá de la ventana)
-    active = Account.query.filter(
-        Account.end_date.is_not(None),
-        Account.end_date > soon_limit
-    ).count()
-
-    return render_template(
-        'core/dashboard.html',
-        total_accounts=total_accounts,
-        total_providers=total_providers,
-        total_clients=total_clients,
+def _dashboard_counts(window_days):
+    total, no_date, expired, expiring, active, down, providers, clients = db.session.execute(_dashboard_stmt()).one()
+    return dict(
+        total_accounts=total,
+        total_providers=providers,
+        total_clients=clients,
         active=active,
         expiring=expiring,
         expired=expired,
         no_date=no_date,
-        window_days=window_days
+        down=down,
+        window_days=window_days,
     )
 
+
+@core_bp.route('/')
+@login_required
+@conditional
+def dashboard():
+    today = date.today()
+    window_days = SOON_DAYS
+
+    ensure_status_fresh(today)
+    ttl = current_app.config.get("DASHBOARD_CACHE_TTL", 30)
+    counts = cache.get_or_set(
+        ("dashboard", today),
+        lambda: _dashboard_counts(window_days),
+        ttl,
+    )
+    return render_template('core/dashboard.html', **counts)
+
 @core_bp.route('/admin/run-pushover')
 @login_required
 def run_pushover():
@@ -59,7 +68,9 @@ def run_pushover():
         flash("Solo admin puede enviar notificaciones.", "warning")
         return redirect(url_for('core.dashboard'))
 
-    results = send_pushover_now()
+    from ...services.notify import send_pushover_now
+    # El botón del dashboard envía el resumen completo; ?mode=delta solo las novedades
+    results = send_pushover_now(mode=request.args.get('mode') or 'full')
     ok_any = any(ok for _, ok, _ in results)
 
     # 👇 OJO: comillas normales, sin barras invertidas
@@ -67,3 +78,19 @@ def run_pushover():
 
     flash(f"Envío Pushover: {detail}", "success" if ok_any else "danger")
     return redirect(url_for('core.dashboard'))
+
+
+@core_bp.route('/metrics')
+def prometheus_metrics():
+    """
+    Métricas en formato Prometheus (sumadas entre los workers). Exponen rutas,
+    latencias y volúmenes: sin METRICS_TOKEN configurado la ruta no existe.
+    """
+    token = current_app.config.get("METRICS_TOKEN")
+    if not token:
+        abort(404)
+    if not hmac.compare_digest(request.headers.get("Authorization", ""), f"Bearer {token}"):
+        abort(401)
+    directory = current_app.config.get("METRICS_DIR")
+    metrics.flush(directory, force=True)
+    return Response(metrics.render(directory), mimetype="text/plain; version=0.0.4")
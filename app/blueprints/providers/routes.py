@@ -1,10 +1,10 @@
 # app/blueprints/providers/routes.py
-from flask import Blueprint, render_template, request, redirect, url_for, flash
+from flask import render_template, request, redirect, url_for, flash
 from flask_login import login_required
+from . import providers_bp
 from ...extensions import db
 from ...models import Provider
 
-providers_bp = Blueprint("providers", __name__, template_folder="../../templates/providers")
 
 @providers_bp.route("/", methods=["GET", "POST"])
 @login_required
@@ -24,7 +24,7 @@ def index():
         return redirect(url_for("providers.index"))
 
     providers = Provider.query.order_by(Provider.name.asc()).all()
-    return render_template("providers/index.html", providers=providers)
+    return render_template("providers/providers.html", providers=providers)
 
 @providers_bp.post("/<int:id>/delete")
 @login_required
@@ -0,0 +1,99 @@
+"""Comandos de `flask` propios de la app."""
+import time
+from datetime import datetime
+
+import click
+from sqlalchemy import delete, select
+
+from .extensions import db
+
+
+@click.command("seed")
+@click.option("--accounts", default=100_000, show_default=True, help="Cuentas a crear.")
+@click.option("--clients", default=5_000, show_default=True, help="Clientes del catálogo.")
+@click.option("--providers", default=300, show_default=True, help="Proveedores del catálogo.")
+@click.option("--seed", "rng_seed", default=42, show_default=True, help="Semilla (mismos datos en cada corrida).")
+@click.option("--wipe", is_flag=True, help="Borra antes TODAS las cuentas, clientes y proveedores.")
+@click.option("--yes", is_flag=True, help="No pedir confirmación para --wipe.")
+def seed_command(accounts, clients, providers, rng_seed, wipe, yes):
+    """Llena la BD con un dataset sintético (ver services/synthetic.py)."""
+    from .models import Account, Client, NotificationLog, Provider
+    from .services import cache, synthetic
+
+    if wipe:
+        if not yes:
+            click.confirm("Se borrarán todas las cuentas, clientes y proveedores. ¿Continuar?", abort=True)
+        for model in (NotificationLog, Account, Client, Provider):
+            db.session.execute(delete(model))
+        db.session.commit()
+
+    started = time.perf_counter()
+    step = max(accounts // 10, 1)
+
+    def progress(done):
+        if done % step < synthetic.BATCH or done == accounts:
+            click.echo(f"  {done}/{accounts} cuentas")
+
+    totals = synthetic.seed(accounts=accounts, clients=clients, providers=providers,
+                            rng_seed=rng_seed, progress=progress)
+    cache.clear()
+    click.echo(
+        f"Listo en {time.perf_counter() - started:.1f} s: {totals['accounts']} cuentas, "
+        f"{totals['clients']} clientes, {totals['providers']} proveedores."
+    )
+
+
+@click.group("api-token")
+def api_token_group():
+    """Tokens de la API JSON (/api/v1)."""
+
+
+@api_token_group.command("create")
+@click.option("--email", required=True, help="Usuario dueño del token.")
+@click.option("--name", default=None, help="Para qué integración es.")
+def api_token_create(email, name):
+    """Crea un token y lo muestra (solo esta vez)."""
+    from .models import ApiToken, User
+    from .security import generate_api_token, hash_api_token
+
+    user = db.session.scalar(select(User).where(User.email == email))
+    if user is None:
+        raise click.ClickException(f"No existe el usuario {email}")
+    token = generate_api_token()
+    api_token = ApiToken(user_id=user.id, name=name, token_hash=hash_api_token(token))
+    db.session.add(api_token)
+    db.session.commit()
+    click.echo(f"Token #{api_token.id} para {email}: {token}")
+
+
+@api_token_group.command("list")
+def api_token_list():
+    """Lista los tokens (sin el secreto)."""
+    from .models import ApiToken, User
+
+    rows = db.session.execute(
+        select(ApiToken, User.email).join(User, ApiToken.user_id == User.id).order_by(ApiToken.id)
+    ).all()
+    for t, email in rows:
+        state = f"revocado {t.revoked_at:%Y-%m-%d}" if t.revoked_at else "activo"
+        used = f"{t.last_used_at:%Y-%m-%d %H:%M}" if t.last_used_at else "nunca"
+        click.echo(f"#{t.id}  {email}  {t.name or '-'}  {state}  último uso: {used}")
+
+
+@api_token_group.command("revoke")
+@click.argument("token_id", type=int)
+def api_token_revoke(token_id):
+    """Revoca un token por su número."""
+    from .models import ApiToken
+
+    api_token = db.session.get(ApiToken, token_id)
+    if api_token is None:
+        raise click.ClickException(f"No existe el token #{token_id}")
+    api_token.revoked_at = datetime.utcnow()
+    db.session.commit()
+    click.echo(f"Token #{token_id} revocado.")
+
+
+def init_app(app):
+    app.cli.add_command(seed_command)
+    app.cli.add_command(api_token_group)
@@ -0,0 +1,98 @@
+"""
+Compresión de respuestas dinámicas (HTML, CSV, JSON) con brotli o gzip
+según Accept-Encoding.
+
+brotli es opcional (`pip install brotli`); sin él se usa gzip. Las
+respuestas en streaming (export CSV) se comprimen por trozos, sin juntarlas
+en memoria. El .xlsx ya es un zip y los estáticos llevan caché de un año
+(ver http_cache.py), así que no se tocan.
+
+Las vistas que mezclan secretos con texto del usuario en la misma página
+(la lista de cuentas muestra contraseñas y repite `q`) se marcan con
+@no_compress: comprimidas serían vulnerables a BREACH.
+"""
+import zlib
+from functools import wraps
+
+from flask import make_response, request
+
+try:
+    import brotli
+except ImportError:  # opcional
+    brotli = None
+
+COMPRESSIBLE = {"text/html", "text/csv", "text/plain", "application/json", "application/x-ndjson"}
+
+
+def no_compress(view):
+    """La respuesta de esta vista sale sin comprimir."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        response = make_response(view(*args, **kwargs))
+        response.no_compress = True
+        return response
+    return wrapper
+
+
+def _choose_encoding(accept_encoding):
+    if brotli is not None and accept_encoding["br"]:
+        return "br"
+    if accept_encoding["gzip"]:
+        return "gzip"
+    return None
+
+
+def _compressor(encoding, cfg):
+    if encoding == "br":
+        c = brotli.Compressor(quality=int(cfg.get("COMPRESS_BR_QUALITY", 4)))
+        return c.process, c.finish
+    c = zlib.compressobj(int(cfg.get("COMPRESS_LEVEL", 6)), zlib.DEFLATED, 31)  # 31 = cabecera gzip
+    return c.compress, c.flush
+
+
+def _compress_stream(chunks, encoding, cfg):
+    compress, finish = _compressor(encoding, cfg)
+    try:
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode("utf-8")
+            out = compress(chunk)
+            if out:
+                yield out
+        yield finish()
+    finally:
+        close = getattr(chunks, "close", None)
+        if close is not None:
+            close()
+
+
+def compress_response(response, cfg):
+    if (response.status_code != 200
+            or response.direct_passthrough
+            or "Content-Encoding" in response.headers
+            or getattr(response, "no_compress", False)
+            or response.mimetype not in COMPRESSIBLE):
+        return response
+    encoding = _choose_encoding(request.accept_encodings)
+    response.vary.add("Accept-Encoding")
+    if encoding is None:
+        return response
+
+    if response.is_streamed:
+        response.response = _compress_stream(response.response, encoding, cfg)
+        response.headers.pop("Content-Length", None)
+    else:
+        data = response.get_data()
+        if len(data) < int(cfg.get("COMPRESS_MIN_SIZE", 500)):
+            return response
+        compress, finish = _compressor(encoding, cfg)
+        response.set_data(compress(data) + finish())
+    response.headers["Content-Encoding"] = encoding
+    # El ETag (débil) sigue valiendo: el contenido es el mismo
+    return response
+
+
+def init_app(app):
+    if not app.config.get("COMPRESS", True):
+        return
+    app.after_request(lambda response: compress_response(response, app.config))
@@ -0,0 +1,57 @@
+"""
+Perfil del engine aplicado al conectar.
+
+SQLite (archivo en el volumen /data, 2 workers x 4 hilos + scheduler):
+- journal_mode=WAL: los lectores no bloquean al escritor ni al revés.
+- synchronous=NORMAL: con WAL, fsync solo en los checkpoints.
+- busy_timeout: espera al lock en vez de fallar con "database is locked".
+- mmap_size / cache_size: lecturas servidas desde memoria.
+
+PostgreSQL: el pool (tamaño, pre-ping, recycle) va en SQLALCHEMY_ENGINE_OPTIONS.
+"""
+from sqlalchemy import event
+
+JOURNAL_MODES = ("WAL", "DELETE", "TRUNCATE", "PERSIST", "MEMORY", "OFF")
+SYNCHRONOUS = ("OFF", "NORMAL", "FULL", "EXTRA")
+
+
+def sqlite_pragmas(cfg, in_memory=False):
+    """Lista de PRAGMA para cada conexión nueva según la configuración."""
+    journal = str(cfg.get("SQLITE_JOURNAL_MODE", "WAL")).upper()
+    sync = str(cfg.get("SQLITE_SYNCHRONOUS", "NORMAL")).upper()
+    if journal not in JOURNAL_MODES:
+        raise ValueError(f"SQLITE_JOURNAL_MODE no válido: {journal}")
+    if sync not in SYNCHRONOUS:
+        raise ValueError(f"SQLITE_SYNCHRONOUS no válido: {sync}")
+
+    pragmas = []
+    # Una BD en memoria no admite WAL (ni lo necesita)
+    if not in_memory:
+        pragmas.append(f"PRAGMA journal_mode={journal}")
+    pragmas += [
+        f"PRAGMA synchronous={sync}",
+        f"PRAGMA busy_timeout={int(cfg.get('SQLITE_BUSY_TIMEOUT_MS', 5000))}",
+        f"PRAGMA mmap_size={int(cfg.get('SQLITE_MMAP_SIZE', 0))}",
+        # Negativo = tamaño en KiB en vez de páginas
+        f"PRAGMA cache_size={-abs(int(cfg.get('SQLITE_CACHE_SIZE_KB', 2000)))}",
+    ]
+    return pragmas
+
+
+def apply_engine_profile(engine, cfg):
+    """Registra los PRAGMA en el evento connect del engine (solo SQLite)."""
+    if engine.dialect.name != "sqlite" or not cfg.get("SQLITE_PRAGMAS", True):
+        return []
+    in_memory = engine.url.database in (None, "", ":memory:")
+    pragmas = sqlite_pragmas(cfg, in_memory=in_memory)
+
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for stmt in pragmas:
+                cursor.execute(stmt)
+        finally:
+            cursor.close()
+
+    return pragmas
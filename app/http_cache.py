@@ -0,0 +1,138 @@
+"""
+Caché HTTP: GET condicionales para las páginas que se refrescan a menudo y
+huellas de contenido en los estáticos.
+
+- @conditional: ETag (débil) y Last-Modified a partir de la fila global
+  data_version. Si el navegador trae el mismo ETag se responde 304 sin
+  consultar ni renderizar nada; la única consulta es la de la versión.
+  El ETag incluye usuario, URL completa, fecha (el estado de las cuentas
+  cambia con el día) y la huella de plantillas/estáticos (cambia al desplegar).
+- Estáticos: url_for('static', ...) agrega ?v=<hash del archivo>; las
+  peticiones con esa huella se sirven con Cache-Control inmutable de un año.
+"""
+import hashlib
+import os
+from datetime import date, datetime, time, timezone
+from functools import wraps
+
+from flask import current_app, make_response, request, session
+from flask_login import current_user
+
+from .extensions import db
+from .services import cache
+
+_fingerprints = {}
+
+
+# ---------- huellas ----------
+
+def _file_hash(path):
+    h = hashlib.md5(usedforsecurity=False)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(64 * 1024), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def static_fingerprint(app, filename):
+    """Hash corto del contenido de un estático (None si no existe)."""
+    path = os.path.join(app.static_folder, filename)
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+    hit = _fingerprints.get(path)
+    if hit is None or hit[0] != mtime:
+        hit = _fingerprints[path] = (mtime, _file_hash(path)[:10])
+    return hit[1]
+
+
+def build_id(app):
+    """Huella de plantillas y estáticos: igual en todos los workers de un despliegue."""
+    h = hashlib.md5(usedforsecurity=False)
+    for folder in (os.path.join(app.root_path, app.template_folder), app.static_folder):
+        for root, dirs, files in os.walk(folder):
+            dirs.sort()
+            for name in sorted(files):
+                path = os.path.join(root, name)
+                h.update(os.path.relpath(path, folder).encode())
+                h.update(_file_hash(path).encode())
+    return h.hexdigest()[:12]
+
+
+def _static_url_defaults(endpoint, values):
+    if endpoint == "static" and "filename" in values and "v" not in values:
+        v = static_fingerprint(current_app, values["filename"])
+        if v:
+            values["v"] = v
+
+
+def _static_cache_headers(response):
+    if request.endpoint == "static" and request.args.get("v") and response.status_code == 200:
+        response.cache_control.public = True
+        response.cache_control.max_age = current_app.config.get("STATIC_MAX_AGE", 31536000)
+        response.cache_control.immutable = True
+        response.cache_control.no_cache = None
+    return response
+
+
+# ---------- GET condicional ----------
+
+def _etag(version):
+    user_id = current_user.get_id() if current_user.is_authenticated else ""
+    raw = f"{version}:{user_id}:{date.today().isoformat()}:{request.full_path}:{current_app.config['BUILD_ID']}"
+    return hashlib.sha1(raw.encode(), usedforsecurity=False).hexdigest()[:20]
+
+
+def _last_modified(changed_at):
+    # Con el cambio de día las cuentas cambian de estado aunque nadie escriba
+    midnight = datetime.combine(date.today(), time.min).astimezone(timezone.utc)
+    if changed_at is None:
+        return midnight
+    return max(changed_at.replace(tzinfo=timezone.utc, microsecond=0), midnight)
+
+
+def _validators(response, etag, last_modified):
+    response.set_etag(etag, weak=True)
+    response.last_modified = last_modified
+    # Siempre se revalida; la copia es solo del navegador de este usuario
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
+
+
+def conditional(view):
+    """Responde 304 si los datos no cambiaron desde la copia del navegador."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        # Con mensajes flash pendientes hay que renderizar para mostrarlos
+        if (request.method != "GET" or not current_app.config.get("CONDITIONAL_GET", True)
+                or session.get("_flashes")):
+            return view(*args, **kwargs)
+
+        version, changed_at = cache.global_version(db.session)
+        cache.sync_global(version)
+        etag = _etag(version)
+        last_modified = _last_modified(changed_at)
+
+        if request.if_none_match:
+            fresh = request.if_none_match.contains_weak(etag)
+        else:
+            fresh = request.if_modified_since is not None and last_modified <= request.if_modified_since
+        if fresh:
+            # Se cierra la transacción de lectura antes de responder
+            db.session.rollback()
+            return _validators(current_app.response_class(status=304), etag, last_modified)
+
+        response = make_response(view(*args, **kwargs))
+        if response.status_code == 200:
+            _validators(response, etag, last_modified)
+        return response
+    return wrapper
+
+
+def init_app(app):
+    if not app.config.get("BUILD_ID"):
+        app.config["BUILD_ID"] = build_id(app)
+    app.url_defaults(_static_url_defaults)
+    app.after_request(_static_cache_headers)
@@ -0,0 +1,100 @@
+"""
+Instrumentación por petición: número y tiempo de sentencias SQL, tiempo de
+render de plantillas y latencia total.
+
+Se publica como cabecera Server-Timing (visible en las DevTools), se registra
+un aviso cuando la petición supera SLOW_REQUEST_MS y alimenta las métricas
+de services/metrics.py que expone /metrics.
+"""
+import time
+
+from flask import g, has_request_context, request, before_render_template, template_rendered
+from sqlalchemy import event
+
+from .services import metrics
+
+
+def _stats():
+    if not has_request_context():
+        return None
+    return g.get("_perf")
+
+
+# ---------- SQL ----------
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None and _stats() is not None:
+        context._perf_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _stats()
+    started = getattr(context, "_perf_started", None)
+    if stats is None or started is None:
+        return
+    stats["sql_count"] += 1
+    stats["sql_time"] += time.perf_counter() - started
+
+
+# ---------- plantillas ----------
+
+def _before_render(app, template, context, **extra):
+    stats = _stats()
+    if stats is not None:
+        stats["_tpl_started"] = time.perf_counter()
+
+
+def _rendered(app, template, context, **extra):
+    stats = _stats()
+    if stats is not None and stats.get("_tpl_started") is not None:
+        stats["tpl_time"] += time.perf_counter() - stats.pop("_tpl_started")
+
+
+# ---------- ciclo de la petición ----------
+
+def _start():
+    g._perf = {"start": time.perf_counter(), "sql_count": 0, "sql_time": 0.0, "tpl_time": 0.0}
+
+
+def _finish(response, app):
+    stats = g.pop("_perf", None)
+    if stats is None:
+        return response
+    total = time.perf_counter() - stats["start"]
+    endpoint = request.endpoint or "none"
+
+    response.headers.add(
+        "Server-Timing",
+        f'sql;dur={stats["sql_time"] * 1000:.1f};desc="{stats["sql_count"]} queries", '
+        f'tpl;dur={stats["tpl_time"] * 1000:.1f}, '
+        f'total;dur={total * 1000:.1f}',
+    )
+
+    if endpoint != "static":
+        labels = {"endpoint": endpoint, "method": request.method}
+        metrics.observe("http_request_duration_seconds", total, status=str(response.status_code), **labels)
+        metrics.observe("http_request_sql_seconds", stats["sql_time"], **labels)
+        metrics.inc("http_request_sql_statements_total", stats["sql_count"], **labels)
+        metrics.inc("http_request_template_seconds_total", stats["tpl_time"], **labels)
+        metrics.flush(app.config.get("METRICS_DIR"))
+
+    slow_ms = app.config.get("SLOW_REQUEST_MS", 0)
+    if slow_ms and total * 1000 >= slow_ms:
+        app.logger.warning(
+            "Petición lenta: %s %s (%s) %s en %.0f ms · SQL %d sentencias / %.0f ms · plantillas %.0f ms",
+            request.method, request.full_path.rstrip("?"), endpoint, response.status_code,
+            total * 1000, stats["sql_count"], stats["sql_time"] * 1000, stats["tpl_time"] * 1000,
+        )
+    return response
+
+
+def init_app(app, engine):
+    """Conecta los hooks de Flask, de Jinja (señales) y del engine de SQLAlchemy."""
+    if not app.config.get("REQUEST_TIMING", True):
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    before_render_template.connect(_before_render, app)
+    template_rendered.connect(_rendered, app)
+    app.before_request(_start)
+    app.after_request(lambda response: _finish(response, app))
@@ -1,7 +1,8 @@
-from datetime import datetime
+from datetime import date, datetime, timedelta
 from flask_login import UserMixin
-from werkzeug.security import generate_password_hash, check_password_hash
+from sqlalchemy import DDL, case, event, func, inspect, literal_column, select, update, bindparam
 from .extensions import db
+from .security import hash_password, verify_password
 
 # -----------------------
 # Usuario (autenticación)
@@ -15,10 +16,10 @@ class User(db.Model, UserMixin):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
     def set_password(self, password: str) -> None:
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = hash_password(password)
 
     def check_password(self, password: str) -> bool:
-        return check_password_hash(self.password_hash, password)
+        return verify_password(self.password_hash, password)
 
 
 # -----------------------
@@ -50,7 +51,8 @@ class Client(db.Model):
     provider_id = db.Column(
         db.Integer,
         db.ForeignKey("provider.id", ondelete="SET NULL"),
-        nullable=True
+        nullable=True,
+        index=True,
     )
 
     contact = db.Column(db.String(255))          # mantener
@@ -78,13 +80,306 @@ class Account(db.Model):
 
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
-    provider_id = db.Column(db.Integer, db.ForeignKey("provider.id"))
-    client_id   = db.Column(db.Integer, db.ForeignKey("client.id"))
+    provider_id = db.Column(db.Integer, db.ForeignKey("provider.id"), index=True)
+    client_id   = db.Column(db.Integer, db.ForeignKey("client.id"), index=True)
 
     provider = db.relationship("Provider", back_populates="accounts")
     client   = db.relationship("Client",   back_populates="accounts")
 
     status_manual = db.Column(db.String(20), nullable=True)
 
+    # Estado calculado (down/nodate/expired/expiring/active); lo mantienen los
+    # eventos de abajo y el job diario (services/status.py)
+    status_bucket = db.Column(db.String(10), nullable=True)
 
-__all__ = ["User", "Provider", "Client", "Account"]
+    # Documento de búsqueda: plataforma, usuario, cliente y proveedor en
+    # minúsculas. Lo indexa FTS5 (SQLite) o pg_trgm (PostgreSQL); ver services/search.py
+    search_text = db.Column(db.Text, nullable=True)
+
+    # Índices de notify (ventana por end_date, en orden end_date, id) y del
+    # estado (dashboard y refresco diario); los del orden de la lista y el
+    # export van tras la clase (son de expresión)
+    __table_args__ = (
+        db.Index("ix_account_end_date_id", "end_date", "id"),
+        db.Index("ix_account_status_bucket_end_date", "status_bucket", "end_date"),
+    )
+
+
+# Orden de la lista de cuentas (services/pagination.py): end_date con las sin
+# fecha al final, created_at DESC con los NULL al final, id DESC. La fecha va
+# como una sola expresión sin NULL (y no "end_date IS NULL, end_date") para que
+# el cursor sea un rango sobre el índice en SQLite y PostgreSQL.
+NO_END_DATE = date(9999, 12, 31)
+account_end_key = func.coalesce(Account.end_date, literal_column(f"'{NO_END_DATE.isoformat()}'"))
+LIST_ORDER = (account_end_key, Account.created_at.is_(None), Account.created_at.desc(), Account.id.desc())
+
+db.Index("ix_account_list_order", *LIST_ORDER)
+# Filtro por estado + el mismo orden
+db.Index("ix_account_status_list_order", Account.status_bucket, *LIST_ORDER)
+
+
+# -----------------------
+# Estado por fechas
+# -----------------------
+# Ventana de "por vencer" (días)
+SOON_DAYS = 7
+
+
+def compute_status_bucket(status_manual, end_date, today=None):
+    """Mismo criterio que la lista: el manual 'Caída' predomina."""
+    today = today or date.today()
+    if status_manual == "CAIDA":
+        return "down"
+    if end_date is None:
+        return "nodate"
+    if end_date < today:
+        return "expired"
+    if end_date <= today + timedelta(days=SOON_DAYS):
+        return "expiring"
+    return "active"
+
+
+def status_bucket_expr(today=None, status_manual=None, end_date=None):
+    """
+    compute_status_bucket() como expresión SQL (para UPDATE masivos).
+    status_manual/end_date permiten usar los valores nuevos de un mismo UPDATE
+    (por defecto, las columnas).
+    """
+    today = today or date.today()
+    status_manual = Account.status_manual if status_manual is None else status_manual
+    end_date = Account.end_date if end_date is None else end_date
+    return case(
+        (status_manual == "CAIDA", "down"),
+        (end_date.is_(None), "nodate"),
+        (end_date < today, "expired"),
+        (end_date <= today + timedelta(days=SOON_DAYS), "expiring"),
+        else_="active",
+    )
+
+
+@event.listens_for(Account, "before_insert")
+@event.listens_for(Account, "before_update")
+def _sync_status_bucket(mapper, connection, target):
+    target.status_bucket = compute_status_bucket(target.status_manual, target.end_date)
+
+
+# -----------------------
+# Documento de búsqueda
+# -----------------------
+def search_document(platform, username, client=None, provider=None):
+    """Texto que indexa la búsqueda libre de la lista de cuentas."""
+    return " ".join(p.strip() for p in (platform, username, client, provider) if p and p.strip()).lower() or None
+
+
+def refresh_search_text(connection, criterion):
+    """Recalcula search_text de las cuentas que cumplen `criterion` (UPDATE por lotes)."""
+    rows = connection.execute(
+        select(Account.id, Account.platform, Account.username, Client.name, Provider.name)
+        .select_from(Account)
+        .outerjoin(Client, Account.client_id == Client.id)
+        .outerjoin(Provider, Account.provider_id == Provider.id)
+        .where(criterion)
+    ).all()
+    if rows:
+        connection.execute(
+            update(Account.__table__)
+            .where(Account.__table__.c.id == bindparam("_id"))
+            .values(search_text=bindparam("_doc")),
+            [{"_id": id_, "_doc": search_document(p, u, c, pr)} for id_, p, u, c, pr in rows],
+        )
+    return len(rows)
+
+
+_SEARCH_ATTRS = ("platform", "username", "client_id", "provider_id", "client", "provider")
+
+
+@event.listens_for(Account, "before_insert")
+@event.listens_for(Account, "before_update")
+def _sync_search_text(mapper, connection, target):
+    state = inspect(target)
+    if state.persistent and not any(state.attrs[a].history.has_changes() for a in _SEARCH_ATTRS):
+        return
+    client = provider = None
+    if target.client_id or target.provider_id:
+        client, provider = connection.execute(select(
+            select(Client.name).where(Client.id == target.client_id).scalar_subquery(),
+            select(Provider.name).where(Provider.id == target.provider_id).scalar_subquery(),
+        )).one()
+    target.search_text = search_document(target.platform, target.username, client, provider)
+
+
+@event.listens_for(Client, "after_update")
+def _client_renamed(mapper, connection, target):
+    if inspect(target).attrs.name.history.has_changes():
+        refresh_search_text(connection, Account.client_id == target.id)
+
+
+@event.listens_for(Provider, "after_update")
+def _provider_renamed(mapper, connection, target):
+    if inspect(target).attrs.name.history.has_changes():
+        refresh_search_text(connection, Account.provider_id == target.id)
+
+
+# Índices de texto según el motor: FTS5 con tokenizador trigram (contenido
+# externo sobre account.search_text, sincronizado por triggers) o GIN pg_trgm.
+_FTS5_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS account_fts USING fts5("
+    "search_text, content='account', content_rowid='id', tokenize='trigram')",
+    "CREATE TRIGGER IF NOT EXISTS account_fts_ai AFTER INSERT ON account BEGIN "
+    "INSERT INTO account_fts(rowid, search_text) VALUES (new.id, new.search_text); END",
+    "CREATE TRIGGER IF NOT EXISTS account_fts_ad AFTER DELETE ON account BEGIN "
+    "INSERT INTO account_fts(account_fts, rowid, search_text) VALUES ('delete', old.id, old.search_text); END",
+    "CREATE TRIGGER IF NOT EXISTS account_fts_au AFTER UPDATE OF search_text ON account BEGIN "
+    "INSERT INTO account_fts(account_fts, rowid, search_text) VALUES ('delete', old.id, old.search_text); "
+    "INSERT INTO account_fts(rowid, search_text) VALUES (new.id, new.search_text); END",
+)
+
+
+def _sqlite_has_trigram(ddl, target, bind, **kw):
+    import sqlite3
+    return bind.dialect.name == "sqlite" and sqlite3.sqlite_version_info >= (3, 34)
+
+
+for _stmt in _FTS5_DDL:
+    event.listen(Account.__table__, "after_create", DDL(_stmt).execute_if(callable_=_sqlite_has_trigram))
+event.listen(Account.__table__, "after_drop",
+             DDL("DROP TABLE IF EXISTS account_fts").execute_if(dialect="sqlite"))
+event.listen(Account.__table__, "before_create",
+             DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"))
+event.listen(Account.__table__, "after_create", DDL(
+    "CREATE INDEX IF NOT EXISTS ix_account_search_text_trgm ON account USING gin (search_text gin_trgm_ops)"
+).execute_if(dialect="postgresql"))
+
+
+# -----------------------
+# Importaciones en segundo plano
+# -----------------------
+class ImportJob(db.Model):
+    """
+    Importación de una hoja ejecutada fuera de la petición (services/jobs.py).
+    `rows_processed` se guarda en la misma transacción que cada lote de
+    cuentas: si el proceso muere, el job se retoma desde ese punto.
+    """
+    id       = db.Column(db.Integer, primary_key=True)
+    status   = db.Column(db.String(10), nullable=False, default="queued", index=True)  # queued/running/done/failed
+    mode     = db.Column(db.String(10), nullable=False, default="insert")
+    filename = db.Column(db.String(255))
+    mimetype = db.Column(db.String(100))          # el de la subida: elige el mismo lector al retomar
+    path     = db.Column(db.String(500))          # copia de la subida mientras el job vive
+
+    rows_processed = db.Column(db.Integer, nullable=False, default=0)
+    inserted       = db.Column(db.Integer, nullable=False, default=0)
+    updated        = db.Column(db.Integer, nullable=False, default=0)
+    skipped        = db.Column(db.Integer, nullable=False, default=0)
+    error          = db.Column(db.Text)
+
+    created_at   = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at   = db.Column(db.DateTime)
+    heartbeat_at = db.Column(db.DateTime)         # último lote confirmado
+    finished_at  = db.Column(db.DateTime)
+
+    user_id = db.Column(db.Integer, db.ForeignKey("user.id", ondelete="SET NULL"), nullable=True)
+
+    def to_dict(self):
+        elapsed = None
+        if self.started_at:
+            end = self.finished_at or datetime.utcnow()
+            elapsed = max((end - self.started_at).total_seconds(), 0.0)
+        return {
+            "id": self.id,
+            "status": self.status,
+            "mode": self.mode,
+            "filename": self.filename,
+            "rows_processed": self.rows_processed,
+            "inserted": self.inserted,
+            "updated": self.updated,
+            "skipped": self.skipped,
+            "error": self.error,
+            "seconds": elapsed,
+            "rows_per_second": (self.rows_processed / elapsed) if elapsed else 0.0,
+            "finished": self.status in ("done", "failed"),
+        }
+
+
+# -----------------------
+# Avisos enviados (resúmenes incrementales)
+# -----------------------
+class NotificationLog(db.Model):
+    """
+    Qué cuentas ya se avisaron para qué fecha de vencimiento. Si cambia
+    end_date la clave es otra y la cuenta vuelve a avisarse.
+    """
+    id         = db.Column(db.Integer, primary_key=True)
+    account_id = db.Column(db.Integer, db.ForeignKey("account.id", ondelete="CASCADE"), nullable=False)
+    end_date   = db.Column(db.Date, nullable=False)
+    section    = db.Column(db.String(10), nullable=False)   # hoy/mañana/soon en el último aviso
+    notified_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.UniqueConstraint("account_id", "end_date", name="uq_notification_log_account_end_date"),
+    )
+
+
+# -----------------------
+# Scheduler (un solo líder entre procesos y máquinas)
+# -----------------------
+class SchedulerLease(db.Model):
+    """Fila de liderazgo: quien la tiene sin vencer ejecuta los jobs programados."""
+    name         = db.Column(db.String(50), primary_key=True)
+    holder       = db.Column(db.String(120), nullable=False)
+    expires_at   = db.Column(db.DateTime, nullable=False)   # UTC
+    heartbeat_at = db.Column(db.DateTime, nullable=False)   # UTC
+
+
+class ScheduledJob(db.Model):
+    """Última ejecución de cada job diario; de aquí salen los pendientes a recuperar."""
+    id               = db.Column(db.String(50), primary_key=True)
+    last_slot        = db.Column(db.DateTime)   # hora programada (local) de la última ejecución
+    last_started_at  = db.Column(db.DateTime)
+    last_finished_at = db.Column(db.DateTime)
+    last_status      = db.Column(db.String(10))  # running/done/failed/skipped
+    last_error       = db.Column(db.Text)
+    last_holder      = db.Column(db.String(120))
+
+
+# -----------------------
+# Tokens de la API JSON
+# -----------------------
+class ApiToken(db.Model):
+    """
+    Token para /api/v1 (cabecera "Authorization: Bearer <token>"). Solo se
+    guarda el SHA-256: el token se muestra una vez al crearlo (`flask api-token create`).
+    """
+    id           = db.Column(db.Integer, primary_key=True)
+    user_id      = db.Column(db.Integer, db.ForeignKey("user.id", ondelete="CASCADE"), nullable=False, index=True)
+    name         = db.Column(db.String(120))
+    token_hash   = db.Column(db.String(64), unique=True, nullable=False)
+    created_at   = db.Column(db.DateTime, default=datetime.utcnow)
+    last_used_at = db.Column(db.DateTime)
+    revoked_at   = db.Column(db.DateTime)
+
+    user = db.relationship("User")
+
+
+# -----------------------
+# Versión global de los datos (ETag / 304)
+# -----------------------
+class DataVersion(db.Model):
+    """
+    Una sola fila (id=1). Cada commit que toca Account, Client o Provider
+    incrementa `version` en la misma transacción (ver services/cache.py); es
+    común a todos los workers y máquinas, a diferencia del contador en proceso.
+    """
+    __tablename__ = "data_version"
+    id         = db.Column(db.Integer, primary_key=True)
+    version    = db.Column(db.BigInteger, nullable=False, default=0)
+    changed_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)   # UTC
+
+
+event.listen(DataVersion.__table__, "after_create", DDL(
+    "INSERT INTO data_version (id, version, changed_at) VALUES (1, 0, CURRENT_TIMESTAMP)"
+))
+
+
+__all__ = ["User", "Provider", "Client", "Account", "ImportJob", "NotificationLog", "SchedulerLease",
+           "ScheduledJob", "ApiToken", "DataVersion"]
@@ -1,7 +1,50 @@
+import hashlib
+import secrets
+import threading
+
+from flask import current_app, has_app_context
 from werkzeug.security import generate_password_hash, check_password_hash
 
+# Hashear/verificar contraseñas es CPU pura (y hashlib suelta el GIL): con
+# varios hilos por worker, una ráfaga de logins acapara la CPU compartida.
+# Se limita cuántos corren a la vez en cada proceso (PASSWORD_HASH_CONCURRENCY).
+_hash_slots = None
+_hash_slots_lock = threading.Lock()
+
+
+class PasswordHashBusy(RuntimeError):
+    """No hubo turno para verificar la contraseña en PASSWORD_HASH_WAIT_SECONDS."""
+
+
+def _slots():
+    global _hash_slots
+    if _hash_slots is None:
+        with _hash_slots_lock:
+            if _hash_slots is None:
+                size = current_app.config.get("PASSWORD_HASH_CONCURRENCY", 1) if has_app_context() else 1
+                _hash_slots = threading.BoundedSemaphore(max(int(size), 1))
+    return _hash_slots
+
+
+def _bounded(fn, *args):
+    timeout = current_app.config.get("PASSWORD_HASH_WAIT_SECONDS", 10) if has_app_context() else None
+    slots = _slots()
+    if not slots.acquire(timeout=timeout):
+        raise PasswordHashBusy("Demasiados inicios de sesión a la vez")
+    try:
+        return fn(*args)
+    finally:
+        slots.release()
+
 def hash_password(password:str) -> str:
-    return generate_password_hash(password)
+    return _bounded(generate_password_hash, password)
 
 def verify_password(hash_value:str, password:str) -> bool:
-    return check_password_hash(hash_value, password)
+    return _bounded(check_password_hash, hash_value, password)
+
+# Tokens de la API: aleatorios y largos, basta un SHA-256 (sin sal ni iteraciones)
+def generate_api_token() -> str:
+    return secrets.token_urlsafe(32)
+
+def hash_api_token(token:str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
@@ -0,0 +1,32 @@
+"""
+Dibuja el gráfico de resumen con matplotlib. Se ejecuta como script aparte
+(ver charts._render_matplotlib): lee JSON por stdin y escribe el PNG en stdout.
+No importa nada de la app para que el subproceso arranque rápido.
+"""
+import io
+import json
+import sys
+
+
+def main():
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    spec = json.load(sys.stdin)
+    cats, vals = spec["cats"], spec["vals"]
+
+    fig, ax = plt.subplots(figsize=(4, 2.2), dpi=200)
+    ax.bar(cats, vals)
+    ax.set_title(spec["title"])
+    for i, v in enumerate(vals):
+        ax.text(i, v, str(v), ha="center", va="bottom")
+    fig.tight_layout()
+    bio = io.BytesIO()
+    fig.savefig(bio, format="png")
+    plt.close(fig)
+    sys.stdout.buffer.write(bio.getvalue())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+"""
+Lectura y escritura de cuentas para la API JSON (/api/v1).
+
+- Lectura: solo las columnas pedidas (`fields`), con los mismos filtros de la
+  lista y su mismo orden/cursor (services/pagination.py).
+- Escritura por lotes: se valida todo el lote antes de tocar la BD; si un
+  elemento falla no se escribe ninguno. Altas con un INSERT multi-fila con
+  RETURNING y cambios con UPDATE por clave primaria agrupados; estado y
+  documento de búsqueda se calculan igual que en la importación.
+"""
+from datetime import date
+from types import SimpleNamespace
+
+from sqlalchemy import insert, select, update
+
+from ..extensions import db
+from ..models import Account, Client, Provider, compute_status_bucket, search_document
+from .filters import apply_account_filters, join_account_names
+from .importer import AccountImporter
+from .pagination import after_cursor, decode_cursor, encode_cursor, order_forward
+from .search import refresh_ids as refresh_search_ids
+from .status import refresh_ids as refresh_status_ids
+
+FIELDS = {
+    "id": Account.id,
+    "platform": Account.platform,
+    "username": Account.username,
+    "password": Account.password,
+    "notes": Account.notes,
+    "start_date": Account.start_date,
+    "end_date": Account.end_date,
+    "time_allocated": Account.time_allocated,
+    "status_manual": Account.status_manual,
+    "status": Account.status_bucket,
+    "client": Client.name,
+    "provider": Provider.name,
+    "client_id": Account.client_id,
+    "provider_id": Account.provider_id,
+    "created_at": Account.created_at,
+}
+# La contraseña solo sale si se pide explícitamente
+DEFAULT_FIELDS = [f for f in FIELDS if f != "password"]
+
+# Campos que se pueden escribir (cliente y proveedor por nombre, como en la plantilla)
+WRITABLE = ("platform", "username", "password", "notes", "start_date", "end_date",
+            "time_allocated", "status_manual", "client", "provider")
+STATUS_MANUAL = (None, "CAIDA")
+
+
+class BatchError(ValueError):
+    """Lote inválido; `errors` es [{"index": i, "error": "..."}]."""
+
+    def __init__(self, errors):
+        super().__init__(f"{len(errors)} elementos inválidos")
+        self.errors = errors
+
+
+# ---------- lectura ----------
+
+def parse_fields(text):
+    if not text:
+        return list(DEFAULT_FIELDS)
+    fields = [f.strip() for f in text.split(",") if f.strip()]
+    unknown = [f for f in fields if f not in FIELDS]
+    if unknown:
+        raise ValueError(f"Campos desconocidos: {', '.join(unknown)}")
+    return list(dict.fromkeys(fields))
+
+
+def select_accounts(fields, q="", status="all", platform="", after=None):
+    """SELECT de las columnas pedidas más las del cursor, en el orden de la lista.
+
+    ValueError si `after` viene pero no es un cursor válido.
+    """
+    columns = [FIELDS[f].label(f) for f in fields] + [
+        Account.end_date.label("cursor_end_date"),
+        Account.created_at.label("cursor_created_at"),
+        Account.id.label("cursor_id"),
+    ]
+    stmt = apply_account_filters(join_account_names(select(*columns).select_from(Account)),
+                                 q=q, status=status, platform=platform)
+    if after:
+        cursor = decode_cursor(after)
+        if cursor is None:
+            # Un cursor roto no puede volver a la primera página sin avisar
+            raise ValueError("'after' no es un cursor válido")
+        stmt = stmt.where(after_cursor(cursor))
+    return stmt.order_by(*order_forward())
+
+
+def row_cursor(row):
+    m = row._mapping
+    return encode_cursor(SimpleNamespace(
+        end_date=m["cursor_end_date"], created_at=m["cursor_created_at"], id=m["cursor_id"],
+    ))
+
+
+def row_to_dict(row, fields):
+    m = row._mapping
+    out = {}
+    for f in fields:
+        v = m[f]
+        out[f] = v.isoformat() if isinstance(v, date) else v
+    return out
+
+
+# ---------- validación ----------
+
+def _text(item, key, required=False):
+    v = item.get(key)
+    if v is None or (isinstance(v, str) and not v.strip()):
+        if required:
+            raise ValueError(f"'{key}' es obligatorio")
+        return None
+    if not isinstance(v, str):
+        raise ValueError(f"'{key}' debe ser texto")
+    return v.strip()
+
+
+def _date(item, key):
+    v = item.get(key)
+    if v in (None, ""):
+        return None
+    try:
+        return date.fromisoformat(v)
+    except (TypeError, ValueError):
+        raise ValueError(f"'{key}' debe ser una fecha AAAA-MM-DD")
+
+
+def _int(item, key):
+    v = item.get(key)
+    if v is None:
+        return None
+    if isinstance(v, bool) or not isinstance(v, int) or v < 0:
+        raise ValueError(f"'{key}' debe ser un entero >= 0")
+    return v
+
+
+def _clean(item, partial):
+    """Valores normalizados de `item` (solo las claves presentes si `partial`)."""
+    if not isinstance(item, dict):
+        raise ValueError("cada elemento debe ser un objeto")
+    unknown = set(item) - set(WRITABLE) - ({"id"} if partial else set())
+    if unknown:
+        raise ValueError(f"campos no permitidos: {', '.join(sorted(unknown))}")
+
+    parsers = {
+        "platform": lambda: _text(item, "platform", required=True),
+        "username": lambda: _text(item, "username", required=True),
+        "password": lambda: _text(item, "password"),
+        "notes": lambda: _text(item, "notes"),
+        "client": lambda: _text(item, "client"),
+        "provider": lambda: _text(item, "provider"),
+        "start_date": lambda: _date(item, "start_date"),
+        "end_date": lambda: _date(item, "end_date"),
+        "time_allocated": lambda: _int(item, "time_allocated"),
+        "status_manual": lambda: _text(item, "status_manual"),
+    }
+    keys = [k for k in WRITABLE if k in item] if partial else WRITABLE
+    values = {k: parsers[k]() for k in keys}
+    if values.get("status_manual") not in STATUS_MANUAL:
+        raise ValueError("'status_manual' debe ser null o 'CAIDA'")
+    if partial:
+        if isinstance(item.get("id"), bool) or not isinstance(item.get("id"), int):
+            raise ValueError("'id' es obligatorio y debe ser entero")
+        if len(values) == 0:
+            raise ValueError("no hay campos que cambiar")
+        values["id"] = item["id"]
+    return values
+
+
+def validate(items, partial=False, max_items=None):
+    if not isinstance(items, list) or not items:
+        raise BatchError([{"index": None, "error": "se espera una lista no vacía de cuentas"}])
+    if max_items and len(items) > max_items:
+        raise BatchError([{"index": None, "error": f"máximo {max_items} cuentas por lote"}])
+    records, errors = [], []
+    for i, item in enumerate(items):
+        try:
+            records.append(_clean(item, partial))
+        except ValueError as e:
+            errors.append({"index": i, "error": str(e)})
+    if errors:
+        raise BatchError(errors)
+    return records
+
+
+# ---------- escritura ----------
+
+def _catalog_ids(records):
+    """Resuelve (y crea si faltan) los clientes/proveedores nombrados en el lote."""
+    catalogs = AccountImporter()
+    catalogs.resolve_catalogs([
+        {"client": r.get("client"), "provider": r.get("provider")} for r in records
+    ])
+    return catalogs.client_ids, catalogs.provider_ids
+
+
+def create_many(items, max_items=None):
+    """Crea las cuentas y devuelve sus ids en el mismo orden. Sin commit."""
+    records = validate(items, max_items=max_items)
+    client_ids, provider_ids = _catalog_ids(records)
+    rows = []
+    for r in records:
+        values = {k: r[k] for k in WRITABLE if k not in ("client", "provider")}
+        values["client_id"] = client_ids.get(r["client"])
+        values["provider_id"] = provider_ids.get(r["provider"])
+        # El INSERT masivo no dispara eventos ORM: estado y búsqueda se calculan aquí
+        values["status_bucket"] = compute_status_bucket(r["status_manual"], r["end_date"])
+        values["search_text"] = search_document(r["platform"], r["username"], r["client"], r["provider"])
+        rows.append(values)
+    return db.session.scalars(
+        insert(Account).returning(Account.id, sort_by_parameter_order=True), rows
+    ).all()
+
+
+def update_many(items, max_items=None):
+    """Aplica los cambios (cada uno con su id). Devuelve los ids. Sin commit."""
+    records = validate(items, partial=True, max_items=max_items)
+    ids = [r["id"] for r in records]
+    existing = set()
+    for i in range(0, len(ids), 500):
+        existing.update(db.session.scalars(select(Account.id).where(Account.id.in_(ids[i:i + 500]))))
+    missing = [{"index": i, "error": f"la cuenta {r['id']} no existe"}
+               for i, r in enumerate(records) if r["id"] not in existing]
+    if missing:
+        raise BatchError(missing)
+
+    client_ids, provider_ids = _catalog_ids(records)
+    rows = []
+    for r in records:
+        values = {k: v for k, v in r.items() if k not in ("client", "provider")}
+        if "client" in r:
+            values["client_id"] = client_ids.get(r["client"])
+        if "provider" in r:
+            values["provider_id"] = provider_ids.get(r["provider"])
+        rows.append(values)
+    # UPDATE por clave primaria; SQLAlchemy agrupa las filas con las mismas columnas
+    db.session.execute(update(Account), rows)
+    # Ambos van por trozos de IN_CHUNK ids
+    refresh_status_ids(ids)
+    refresh_search_ids(ids)
+    return ids
@@ -0,0 +1,114 @@
+"""
+Acciones masivas sobre cuentas: cada una es un único UPDATE/DELETE.
+
+La selección es una lista de ids (checkboxes) o "todo lo que cumple el
+filtro actual", que reutiliza los mismos predicados q/status/platform de la
+lista y se resuelve como subconsulta en la BD (sin enviar ids al navegador).
+"""
+from datetime import date
+
+from sqlalchemy import delete, func, literal, select, update
+
+from ..extensions import db
+from ..models import Account, Client, NotificationLog, Provider, refresh_search_text, status_bucket_expr
+from .filters import join_account_names, apply_account_filters
+
+ACTIONS = ("delete", "mark_down", "clear_status", "extend_days", "extend_allocated", "reassign")
+MAX_EXTEND_DAYS = 3650
+
+
+def selection(ids=None, q="", status="all", platform=""):
+    """Criterio WHERE de la selección: ids explícitos o el resultado del filtro."""
+    if ids is not None:
+        return Account.id.in_(list(ids))
+    matching = apply_account_filters(
+        join_account_names(select(Account.id).select_from(Account)),
+        q=q, status=status, platform=platform,
+    )
+    return Account.id.in_(matching)
+
+
+def count(criterion):
+    return db.session.scalar(select(func.count(Account.id)).where(criterion))
+
+
+def _add_days(base, days):
+    """base + days (entero o columna) como fecha, según el motor."""
+    if db.engine.dialect.name == "sqlite":
+        return func.date(base, func.printf("%+d days", days))
+    # PostgreSQL: date + integer devuelve date
+    return base + days
+
+
+def _update(criterion, **values):
+    result = db.session.execute(
+        update(Account).where(criterion).values(**values)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
+
+
+def run(action, criterion, days=None, provider_id=None, client_id=None, today=None):
+    """
+    Aplica `action` a las cuentas que cumplen `criterion`. Devuelve cuántas
+    cambió. No hace commit. ValueError si faltan o no sirven los parámetros.
+    """
+    today = today or date.today()
+
+    if action == "delete":
+        db.session.execute(
+            delete(NotificationLog)
+            .where(NotificationLog.account_id.in_(select(Account.id).where(criterion)))
+            .execution_options(synchronize_session=False)
+        )
+        result = db.session.execute(
+            delete(Account).where(criterion).execution_options(synchronize_session=False)
+        )
+        return result.rowcount
+
+    if action == "mark_down":
+        return _update(criterion, status_manual="CAIDA", status_bucket="down")
+
+    if action == "clear_status":
+        # El estado vuelve a depender solo de la fecha
+        return _update(criterion, status_manual=None,
+                       status_bucket=status_bucket_expr(today, status_manual=literal("")))
+
+    if action == "extend_days":
+        try:
+            days = int(days)
+        except (TypeError, ValueError):
+            raise ValueError("Indica cuántos días extender.")
+        if not 1 <= days <= MAX_EXTEND_DAYS:
+            raise ValueError(f"Los días deben estar entre 1 y {MAX_EXTEND_DAYS}.")
+        # Sin fecha: se cuenta desde hoy
+        new_end = _add_days(func.coalesce(Account.end_date, today), days)
+        return _update(criterion, end_date=new_end,
+                       status_bucket=status_bucket_expr(today, end_date=new_end))
+
+    if action == "extend_allocated":
+        # Las cuentas sin time_allocated no se tocan
+        new_end = _add_days(func.coalesce(Account.end_date, today), Account.time_allocated)
+        return _update(criterion & Account.time_allocated.is_not(None) & (Account.time_allocated > 0),
+                       end_date=new_end,
+                       status_bucket=status_bucket_expr(today, end_date=new_end))
+
+    if action == "reassign":
+        values = {}
+        if provider_id:
+            if db.session.get(Provider, int(provider_id)) is None:
+                raise ValueError("Proveedor no encontrado.")
+            values["provider_id"] = int(provider_id)
+        if client_id:
+            if db.session.get(Client, int(client_id)) is None:
+                raise ValueError("Cliente no encontrado.")
+            values["client_id"] = int(client_id)
+        if not values:
+            raise ValueError("Elige un proveedor o un cliente.")
+        changed = _update(criterion, **values)
+        # El documento de búsqueda incluye los nombres: se rehace solo para las
+        # cuentas reasignadas (la búsqueda del criterio aún ve el documento viejo)
+        refresh_search_text(db.session.connection(), criterion)
+        return changed
+
+    raise ValueError("Acción no soportada.")
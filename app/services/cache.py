@@ -0,0 +1,136 @@
+"""
+Caché en proceso con TTL + contador de versión de datos.
+
+Cada commit que toca Account, Provider o Client incrementa la versión y eso
+invalida todas las entradas cacheadas. La versión en proceso solo ve los
+commits de este worker; además, el mismo commit incrementa la fila global
+`data_version` de la BD (ETag de las páginas, ver app/http_cache.py) y
+sync_global() vacía la caché cuando otro proceso la movió.
+
+La caché es LRU: pasadas MAX_ENTRIES claves se descartan las menos usadas
+(las búsquedas por prefijo generan muchas entre commit y commit).
+"""
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+
+from sqlalchemy import event, select, update
+from sqlalchemy.orm import Session
+
+from ..models import Account, Provider, Client, DataVersion
+
+TRACKED_MODELS = (Account, Provider, Client)
+MAX_ENTRIES = 2048
+
+_lock = threading.Lock()
+_version = 0
+_store = OrderedDict()
+_seen_global = None
+
+
+def data_version():
+    return _version
+
+
+def global_version(session):
+    """(versión, changed_at UTC) de la fila global; (0, None) si aún no existe."""
+    row = session.execute(select(DataVersion.version, DataVersion.changed_at).where(DataVersion.id == 1)).first()
+    return (row[0], row[1]) if row else (0, None)
+
+
+def sync_global(version):
+    """Vacía la caché si la versión global cambió desde la última vez que se vio."""
+    global _seen_global
+    if version != _seen_global:
+        with _lock:
+            if _seen_global is not None:
+                _store.clear()
+            _seen_global = version
+
+
+def mark_changed(session):
+    """Para escrituras que no pasan por el ORM (p. ej. insert(Account.__table__))."""
+    session.info["data_changed"] = True
+
+
+def bump_version():
+    global _version
+    with _lock:
+        _version += 1
+        _store.clear()
+
+
+def get_or_set(key, loader, ttl):
+    """Devuelve el valor cacheado para `key` o lo calcula con loader()."""
+    now = time.monotonic()
+    hit = _store.get(key)
+    if hit is not None:
+        version, expires, value = hit
+        if version == _version and expires > now:
+            with _lock:
+                if key in _store:
+                    _store.move_to_end(key)
+            return value
+    version = _version
+    value = loader()
+    with _lock:
+        # Si hubo un commit mientras calculábamos, no guardamos un valor viejo
+        if version == _version:
+            _store[key] = (version, now + ttl, value)
+            _store.move_to_end(key)
+            while len(_store) > MAX_ENTRIES:
+                _store.popitem(last=False)
+    return value
+
+
+def clear():
+    with _lock:
+        _store.clear()
+
+
+# ---------- invalidación por eventos de sesión ----------
+
+def _touches_tracked(objs):
+    return any(isinstance(o, TRACKED_MODELS) for o in objs)
+
+
+@event.listens_for(Session, "before_flush")
+def _mark_dirty_on_flush(session, flush_context, instances):
+    if (_touches_tracked(session.new) or _touches_tracked(session.dirty)
+            or _touches_tracked(session.deleted)):
+        session.info["data_changed"] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _mark_dirty_on_bulk(orm_execute_state):
+    # INSERT/UPDATE/DELETE masivos (session.execute(insert(Account), ...))
+    if not (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None and issubclass(mapper.class_, TRACKED_MODELS):
+        orm_execute_state.session.info["data_changed"] = True
+
+
+@event.listens_for(Session, "before_commit")
+def _bump_global_on_commit(session):
+    # El flush de commit() va después de este evento: se adelanta para saber si hubo cambios
+    session.flush()
+    if session.info.get("data_changed"):
+        session.execute(
+            update(DataVersion)
+            .where(DataVersion.id == 1)
+            .values(version=DataVersion.version + 1, changed_at=datetime.utcnow())
+            .execution_options(synchronize_session=False)
+        )
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_on_commit(session):
+    if session.info.pop("data_changed", False):
+        bump_version()
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _forget_on_rollback(session, previous_transaction):
+    session.info.pop("data_changed", None)
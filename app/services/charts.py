@@ -0,0 +1,121 @@
+"""
+Gráfico de resumen para el mensaje de Pushover.
+
+- "pillow" (por defecto): barras dibujadas con Pillow, rápido y liviano.
+- "matplotlib": se dibuja en un subproceso de vida corta (_mpl_chart.py), así
+  matplotlib no se importa ni ocupa memoria en los workers de gunicorn.
+
+Los PNG se cachean por (renderer, valores, fecha).
+"""
+import importlib.util
+import io
+import json
+import os
+import subprocess
+import sys
+import threading
+import unicodedata
+from collections import OrderedDict
+
+RENDERERS = ("pillow", "matplotlib")
+
+_CACHE_SIZE = 16
+_cache = OrderedDict()
+_lock = threading.Lock()
+
+_MPL_SCRIPT = os.path.join(os.path.dirname(__file__), "_mpl_chart.py")
+
+
+def summary_chart_png(counts, today, window_days=7, renderer="pillow"):
+    """PNG (bytes) con las barras hoy / mañana / ≤N días, o None si no se pudo."""
+    if renderer not in RENDERERS:
+        renderer = "pillow"
+    cats = ["Hoy", "Mañana", f"≤{window_days}d"]
+    vals = [counts["hoy"], counts["mañana"], counts["soon"]]
+    title = f"Vencimientos · {today.isoformat()}"
+
+    key = (renderer, tuple(vals), window_days, today)
+    with _lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+
+    render = _render_matplotlib if renderer == "matplotlib" else _render_pillow
+    png = render(cats, vals, title)
+    if png:
+        with _lock:
+            _cache[key] = png
+            while len(_cache) > _CACHE_SIZE:
+                _cache.popitem(last=False)
+    return png
+
+
+# ---------- pillow ----------
+
+def _font_path():
+    """DejaVuSans del sistema o la que trae matplotlib (sin importarlo)."""
+    candidates = ["/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf"]
+    spec = importlib.util.find_spec("matplotlib")
+    if spec and spec.submodule_search_locations:
+        for base in spec.submodule_search_locations:
+            candidates.append(os.path.join(base, "mpl-data", "fonts", "ttf", "DejaVuSans.ttf"))
+    return next((p for p in candidates if os.path.exists(p)), None)
+
+
+def _ascii(text):
+    # La fuente por defecto de Pillow no tiene ñ ni ≤
+    text = text.replace("≤", "<=")
+    return unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode()
+
+
+def _render_pillow(cats, vals, title):
+    try:
+        from PIL import Image, ImageDraw, ImageFont
+    except ImportError:
+        return None
+
+    w, h = 800, 440
+    pad_l, pad_r, pad_t, pad_b = 40, 40, 70, 60
+    img = Image.new("RGB", (w, h), "white")
+    draw = ImageDraw.Draw(img)
+
+    path = _font_path()
+    if path:
+        font, title_font, fix = ImageFont.truetype(path, 22), ImageFont.truetype(path, 26), str
+    else:
+        font, title_font, fix = ImageFont.load_default(size=22), ImageFont.load_default(size=26), _ascii
+
+    draw.text((w / 2, 20), fix(title), fill="black", font=title_font, anchor="mt")
+
+    base_y = h - pad_b
+    draw.line((pad_l, base_y, w - pad_r, base_y), fill="#444444", width=2)
+    slot = (w - pad_l - pad_r) / len(vals)
+    bar_w = slot * 0.6
+    top = max(vals) or 1
+    for i, (cat, v) in enumerate(zip(cats, vals)):
+        cx = pad_l + slot * (i + 0.5)
+        bar_h = (base_y - pad_t - 30) * v / top
+        draw.rectangle((cx - bar_w / 2, base_y - bar_h, cx + bar_w / 2, base_y), fill="#1f77b4")
+        draw.text((cx, base_y - bar_h - 6), str(v), fill="black", font=font, anchor="mb")
+        draw.text((cx, base_y + 8), fix(cat), fill="black", font=font, anchor="mt")
+
+    bio = io.BytesIO()
+    img.save(bio, format="PNG", optimize=True)
+    return bio.getvalue()
+
+
+# ---------- matplotlib (subproceso) ----------
+
+def _render_matplotlib(cats, vals, title, timeout=60):
+    payload = json.dumps({"cats": cats, "vals": vals, "title": title})
+    try:
+        proc = subprocess.run(
+            [sys.executable, _MPL_SCRIPT],
+            input=payload.encode("utf-8"),
+            capture_output=True,
+            timeout=timeout,
+            check=True,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return proc.stdout or None
@@ -1,12 +1,144 @@
-import pandas as pd
+import csv
+import io
+import tempfile
 
 COLUMNS = ['platform','username','password','provider','client','start_date','end_date','time_allocated','notes']
 
+EXPORT_COLUMNS = ['platform','username','password','client','provider','start_date','end_date','status_manual','notes']
+
+# Tamaño de los trozos que se envían al cliente
+STREAM_CHUNK = 64 * 1024
+
+
 def generate_template_bytes():
-    import io
-    df = pd.DataFrame(columns=COLUMNS)
+    from openpyxl import Workbook
+
+    wb = Workbook()
+    ws = wb.active
+    ws.title = 'Cuentas'
+    ws.append(COLUMNS)
     bio = io.BytesIO()
-    with pd.ExcelWriter(bio, engine='openpyxl') as writer:
-        df.to_excel(writer, index=False, sheet_name='Cuentas')
+    wb.save(bio)
     bio.seek(0)
     return bio
+
+
+def iter_csv(header, rows, flush_every=500):
+    """Genera el CSV en bytes por bloques, sin acumular todas las filas."""
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(header)
+    for i, row in enumerate(rows, 1):
+        writer.writerow(['' if v is None else v for v in row])
+        if i % flush_every == 0:
+            yield buf.getvalue().encode('utf-8')
+            buf.seek(0)
+            buf.truncate()
+    if buf.tell():
+        yield buf.getvalue().encode('utf-8')
+
+
+def iter_xlsx(header, rows, sheet_name='Cuentas'):
+    """
+    Escribe las filas con un workbook write-only de openpyxl (las filas van
+    a disco según llegan, no a memoria) y luego envía el .xlsx por trozos.
+    """
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(sheet_name)
+    ws.append(header)
+    for row in rows:
+        ws.append(list(row))
+
+    with tempfile.TemporaryFile() as tmp:
+        wb.save(tmp)
+        tmp.seek(0)
+        while True:
+            chunk = tmp.read(STREAM_CHUNK)
+            if not chunk:
+                break
+            yield chunk
+
+
+# ---------- lectura de subidas (sin pasar por disco) ----------
+
+UPLOAD_BATCH = 1000
+
+
+def _is_csv(filename, mimetype=None):
+    return (filename or '').lower().endswith('.csv') or (mimetype or '') in ('text/csv', 'application/csv')
+
+
+def _header(values):
+    return [str(v).strip().lower() if v is not None else '' for v in values]
+
+
+def _iter_xlsx_rows(stream):
+    from openpyxl import load_workbook
+
+    try:
+        wb = load_workbook(stream, read_only=True, data_only=True)
+    except Exception as e:
+        raise ValueError(f'Error leyendo Excel: {e}')
+    try:
+        rows = wb.active.iter_rows(values_only=True)
+        header = _header(next(rows, ()))
+        yield header
+        for values in rows:
+            if all(v is None or (isinstance(v, str) and not v.strip()) for v in values):
+                continue
+            yield {k: v for k, v in zip(header, values) if k}
+    finally:
+        wb.close()
+
+
+def _iter_csv_rows(stream):
+    text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+    sample = text.read(4096)
+    text.seek(0)
+    try:
+        dialect = csv.Sniffer().sniff(sample, delimiters=',;\t')
+    except csv.Error:
+        dialect = csv.excel
+    reader = csv.reader(text, dialect)
+    header = _header(next(reader, ()))
+    yield header
+    for values in reader:
+        if not any(v.strip() for v in values):
+            continue
+        yield {k: v for k, v in zip(header, values) if k}
+
+
+def open_upload(stream, filename, mimetype=None):
+    """
+    Abre un .xlsx o .csv desde un stream binario (la subida o su copia en
+    disco). Devuelve (columnas, iterador de filas como dict). Las filas se
+    leen de a una: la hoja nunca se carga entera en memoria.
+    """
+    if _is_csv(filename, mimetype):
+        rows = _iter_csv_rows(stream)
+    else:
+        rows = _iter_xlsx_rows(stream)
+    try:
+        columns = next(rows)
+    except UnicodeDecodeError:
+        raise ValueError('El CSV debe estar en UTF-8')
+    return columns, rows
+
+
+def read_upload(file):
+    """open_upload() para una subida (FileStorage), directo desde su stream."""
+    return open_upload(file.stream, file.filename, file.mimetype)
+
+
+def batched(rows, size=UPLOAD_BATCH):
+    """Agrupa un iterador en listas de tamaño fijo."""
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
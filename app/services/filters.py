@@ -1,7 +1,44 @@
-from sqlalchemy import or_
+from sqlalchemy import or_, func, String, cast
+from ..models import Account, Client, Provider
+from .search import match_clause
+
+BUCKETS = ('down', 'nodate', 'expired', 'expiring', 'active')
+
+
 def apply_search(query, model, term:str, columns):
     if not term:
         return query
     like = f"%{term.strip()}%"
     conditions = [getattr(model, col).ilike(like) for col in columns]
     return query.filter(or_(*conditions))
+
+
+def join_account_names(query):
+    """Outer join de Account con su Client y su Provider (los de la cuenta)."""
+    return (query
+            .outerjoin(Client, Account.client_id == Client.id)
+            .outerjoin(Provider, Account.provider_id == Provider.id))
+
+
+def apply_account_filters(query, q="", status="all", platform=""):
+    """
+    Aplica los filtros de la lista de cuentas (q, status, platform).
+    Sirve tanto para Account.query como para select(...): ambos tienen .filter().
+    La consulta debe venir ya unida con Client y Provider (ver join_account_names).
+    """
+    if platform:
+        query = query.filter(
+            func.lower(func.trim(Account.platform)) ==
+            func.lower(func.trim(cast(platform, String())))
+        )
+
+    # Búsqueda libre sobre el documento desnormalizado (FTS5 / pg_trgm)
+    match = match_clause(q)
+    if match is not None:
+        query = query.filter(match)
+
+    # Estado: columna persistida (ver services/status.py), igualdad sobre índice
+    if status in BUCKETS:
+        query = query.filter(Account.status_bucket == status)
+
+    return query
@@ -0,0 +1,81 @@
+"""
+Caché en proceso del usuario de la sesión (Flask-Login `load_user`).
+
+Cada petición autenticada pedía el usuario por id a la BD. Aquí se guarda una
+copia desacoplada durante USER_CACHE_TTL segundos y se adjunta a la sesión de
+la petición con merge(load=False), sin SQL. Los cambios a un User en este
+proceso la invalidan al hacer commit; los de otros procesos se ven al vencer
+el TTL (p. ej. quitar is_admin tarda como mucho eso en aplicarse).
+"""
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+from ..extensions import db
+from ..models import User
+
+MAX_ENTRIES = 1024
+
+_lock = threading.Lock()
+_store = {}   # user_id -> (expires, User desacoplado)
+_generation = 0
+
+
+def load(user_id, ttl):
+    """User con ese id (adjunto a db.session) o None."""
+    if ttl <= 0:
+        return db.session.get(User, user_id)
+    now = time.monotonic()
+    hit = _store.get(user_id)
+    if hit is not None and hit[0] > now:
+        return db.session.merge(hit[1], load=False)
+
+    generation = _generation
+    user = db.session.get(User, user_id)
+    if user is None:
+        return None
+    # Copia para la caché: la instancia de la petición sigue en su sesión
+    detached = User(**{c.key: getattr(user, c.key) for c in User.__mapper__.column_attrs})
+    make_transient_to_detached(detached)
+    with _lock:
+        # Si hubo una invalidación mientras se leía, no se guarda una fila vieja
+        if generation == _generation:
+            if len(_store) >= MAX_ENTRIES:
+                _store.clear()
+            _store[user_id] = (now + ttl, detached)
+    return user
+
+
+def invalidate(user_id):
+    global _generation
+    with _lock:
+        _generation += 1
+        _store.pop(user_id, None)
+
+
+def clear():
+    with _lock:
+        _store.clear()
+
+
+# ---------- invalidación ----------
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _user_changed(mapper, connection, target):
+    invalidate(target.id)
+    # Otra petición podría volver a cachear la fila vieja antes del commit
+    Session.object_session(target).info.setdefault("users_changed", set()).add(target.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_on_commit(session):
+    for user_id in session.info.pop("users_changed", ()):
+        invalidate(user_id)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _forget_on_rollback(session, previous_transaction):
+    session.info.pop("users_changed", None)
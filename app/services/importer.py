@@ -0,0 +1,251 @@
+from datetime import date, datetime
+import math
+import sys
+import time
+
+from sqlalchemy import select, insert, update
+
+from ..extensions import db
+from ..models import Account, Provider, Client, compute_status_bucket, search_document
+from .status import refresh_ids as refresh_status_ids
+from .search import refresh_ids as refresh_search_ids
+
+# Columnas de la cuenta que puede traer la plantilla (además de provider/client)
+ACCOUNT_FIELDS = ['platform', 'username', 'password', 'start_date', 'end_date', 'time_allocated', 'notes']
+
+CHUNK_SIZE = 1000
+# Tope de parámetros por IN (SQLite antiguo limita a 999 variables)
+IN_CHUNK = 500
+
+MODES = ('insert', 'upsert')
+
+
+# ---------- normalización de celdas ----------
+
+def _is_blank(v):
+    if v is None:
+        return True
+    if isinstance(v, float) and math.isnan(v):
+        return True
+    if isinstance(v, str) and not v.strip():
+        return True
+    # pandas.NaT por tipo (un texto "NaT" o "nan" es un valor real). Si pandas
+    # no está cargado no puede haber NaT, y no se paga su importación
+    pd = sys.modules.get('pandas')
+    return pd is not None and v is pd.NaT
+
+
+def _to_text(v):
+    if _is_blank(v):
+        return None
+    return str(v).strip()
+
+
+def _to_date(v):
+    if _is_blank(v):
+        return None
+    if isinstance(v, datetime):
+        return v.date()
+    if isinstance(v, date):
+        return v
+    s = str(v).strip()
+    for fmt in ("%Y-%m-%d", "%Y-%m-%d %H:%M:%S", "%d/%m/%Y"):
+        try:
+            return datetime.strptime(s, fmt).date()
+        except ValueError:
+            pass
+    return None
+
+
+def _to_int(v):
+    if _is_blank(v):
+        return None
+    try:
+        return int(float(v))
+    except (TypeError, ValueError):
+        return None
+
+
+def _chunks(seq, size):
+    seq = list(seq)
+    for i in range(0, len(seq), size):
+        yield seq[i:i + size]
+
+
+# ---------- motor ----------
+
+class AccountImporter:
+    """
+    Importa filas (dicts con claves en minúscula) de forma set-based:
+    - proveedores y clientes se resuelven con un IN por lote (y se cachean),
+    - los que faltan se crean en un único INSERT multi-fila,
+    - las cuentas se escriben con INSERT/UPDATE por lotes.
+
+    En modo 'upsert' la clave es (platform, username): si ya existe se actualiza.
+    No hace commit; eso lo decide quien lo llama.
+    """
+
+    def __init__(self, mode='insert', chunk_size=CHUNK_SIZE, columns=None):
+        if mode not in MODES:
+            raise ValueError(f"Modo de importación no soportado: {mode}")
+        self.mode = mode
+        self.chunk_size = chunk_size
+        # Columnas presentes en la hoja: en upsert solo se pisan esas
+        self.columns = set(columns) if columns is not None else None
+        self.provider_ids = {}
+        self.client_ids = {}
+        self.stats = {"rows": 0, "inserted": 0, "updated": 0, "skipped": 0}
+        self._started = time.perf_counter()
+
+    # --- catálogos ---
+
+    def _resolve(self, model, cache, wanted):
+        """Devuelve ids para los nombres `wanted` ({name: extra_values}) creando los que falten."""
+        missing = [n for n in wanted if n not in cache]
+        if not missing:
+            return
+        for part in _chunks(missing, IN_CHUNK):
+            rows = db.session.execute(select(model.id, model.name).where(model.name.in_(part)))
+            cache.update({name: id_ for id_, name in rows})
+
+        to_create = [n for n in missing if n not in cache]
+        if not to_create:
+            return
+        db.session.execute(insert(model), [dict(name=n, **wanted[n]) for n in to_create])
+        for part in _chunks(to_create, IN_CHUNK):
+            rows = db.session.execute(select(model.id, model.name).where(model.name.in_(part)))
+            cache.update({name: id_ for id_, name in rows})
+
+    def resolve_catalogs(self, records):
+        """Ids de los proveedores/clientes nombrados en `records` (crea los que falten)."""
+        providers = {}
+        for r in records:
+            if r['provider']:
+                providers.setdefault(r['provider'], {})
+        self._resolve(Provider, self.provider_ids, providers)
+
+        clients = {}
+        for r in records:
+            if r['client']:
+                # El cliente nuevo hereda el proveedor de la primera fila donde aparece
+                clients.setdefault(r['client'], {"provider_id": self.provider_ids.get(r['provider'])})
+        self._resolve(Client, self.client_ids, clients)
+
+    # --- filas ---
+
+    def _normalize(self, row):
+        platform = _to_text(row.get('platform'))
+        username = _to_text(row.get('username'))
+        if not platform or not username:
+            return None
+        return {
+            "platform": platform,
+            "username": username,
+            "password": _to_text(row.get('password')),
+            "provider": _to_text(row.get('provider')),
+            "client": _to_text(row.get('client')),
+            "start_date": _to_date(row.get('start_date')),
+            "end_date": _to_date(row.get('end_date')),
+            "time_allocated": _to_int(row.get('time_allocated')),
+            "notes": _to_text(row.get('notes')),
+        }
+
+    def _values(self, r):
+        values = {k: r[k] for k in ACCOUNT_FIELDS}
+        values["provider_id"] = self.provider_ids.get(r['provider'])
+        values["client_id"] = self.client_ids.get(r['client'])
+        return values
+
+    def _insert_values(self, r):
+        # El INSERT masivo no dispara eventos ORM: el estado se calcula aquí
+        values = self._values(r)
+        values["status_bucket"] = compute_status_bucket(None, values["end_date"])
+        values["search_text"] = search_document(r['platform'], r['username'], r['client'], r['provider'])
+        return values
+
+    def _update_values(self, account_id, r):
+        values = self._values(r)
+        if self.columns is not None:
+            keep = (self.columns & set(ACCOUNT_FIELDS)) | {"platform", "username"}
+            if "provider" in self.columns:
+                keep.add("provider_id")
+            if "client" in self.columns:
+                keep.add("client_id")
+            values = {k: v for k, v in values.items() if k in keep}
+        values["id"] = account_id
+        return values
+
+    def _existing_ids(self, records):
+        """(platform, username) -> id para las claves del lote."""
+        keys = {(r['platform'], r['username']) for r in records}
+        found = {}
+        for part in _chunks({u for _, u in keys}, IN_CHUNK):
+            rows = db.session.execute(
+                select(Account.id, Account.platform, Account.username)
+                .where(Account.username.in_(part))
+            )
+            for id_, platform, username in rows:
+                if (platform, username) in keys:
+                    found.setdefault((platform, username), id_)
+        return found
+
+    def add_rows(self, rows):
+        """Procesa un lote de filas crudas y acumula estadísticas."""
+        records = []
+        for row in rows:
+            self.stats["rows"] += 1
+            r = self._normalize(row)
+            if r is None:
+                self.stats["skipped"] += 1
+                continue
+            records.append(r)
+
+        for chunk in _chunks(records, self.chunk_size):
+            self._write_chunk(chunk)
+        return self.stats
+
+    def _write_chunk(self, records):
+        self.resolve_catalogs(records)
+
+        if self.mode == 'upsert':
+            # Dentro de la hoja, la última fila con la misma clave gana
+            by_key = {}
+            for r in records:
+                key = (r['platform'], r['username'])
+                if key in by_key:
+                    self.stats["skipped"] += 1
+                by_key[key] = r
+            existing = self._existing_ids(by_key.values())
+            to_insert, to_update = [], []
+            for key, r in by_key.items():
+                if key in existing:
+                    to_update.append(self._update_values(existing[key], r))
+                else:
+                    to_insert.append(self._insert_values(r))
+        else:
+            to_insert, to_update = [self._insert_values(r) for r in records], []
+
+        if to_insert:
+            db.session.execute(insert(Account), to_insert)
+            self.stats["inserted"] += len(to_insert)
+        if to_update:
+            db.session.execute(update(Account), to_update)
+            # status_manual no viene en la hoja: estado y documento de búsqueda se recalculan
+            ids = [v["id"] for v in to_update]
+            refresh_status_ids(ids)
+            refresh_search_ids(ids)
+            self.stats["updated"] += len(to_update)
+
+    def summary(self):
+        elapsed = time.perf_counter() - self._started
+        out = dict(self.stats)
+        out["seconds"] = elapsed
+        out["rows_per_second"] = (self.stats["rows"] / elapsed) if elapsed > 0 else 0.0
+        return out
+
+
+def import_rows(rows, mode='insert', chunk_size=CHUNK_SIZE, columns=None):
+    """Atajo: importa un iterable de dicts y devuelve el resumen (sin commit)."""
+    importer = AccountImporter(mode=mode, chunk_size=chunk_size, columns=columns)
+    importer.add_rows(rows)
+    return importer.summary()
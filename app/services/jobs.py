@@ -0,0 +1,205 @@
+"""
+Importaciones en segundo plano.
+
+La subida se copia a IMPORT_JOBS_FOLDER y se procesa en un pool acotado de
+hilos (IMPORT_WORKERS). Cada lote de cuentas se confirma junto con el
+progreso del job (rows_processed), así un job interrumpido por un reinicio
+se retoma saltando las filas ya confirmadas.
+
+Un job lo toma un solo proceso: `claim()` pasa queued -> running con un
+UPDATE condicional; un job 'running' sin latido en IMPORT_STALE_SECONDS se
+considera huérfano y otro proceso puede tomarlo.
+"""
+import os
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from itertools import islice
+
+from sqlalchemy import and_, func, or_, select, update
+
+from ..extensions import db
+from ..models import ImportJob
+from .excel_io import open_upload, batched
+from .importer import AccountImporter
+from . import metrics
+
+# Filas por lote confirmado
+BATCH = 1000
+ACTIVE = ("queued", "running")
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor(app):
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            workers = max(int(app.config.get("IMPORT_WORKERS", 1)), 1)
+            _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="import")
+        return _executor
+
+
+def _remove_file(path):
+    if path:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def active_count():
+    return db.session.scalar(
+        select(func.count(ImportJob.id)).where(ImportJob.status.in_(ACTIVE))
+    )
+
+
+def create_job(app, file, mode, user_id=None):
+    """
+    Copia la subida (FileStorage) a disco con un nombre generado, valida la
+    cabecera y registra el job. Devuelve (job, columnas); no hace commit.
+    Lanza ValueError si la hoja no se puede leer.
+    """
+    folder = app.config["IMPORT_JOBS_FOLDER"]
+    os.makedirs(folder, exist_ok=True)
+    path = os.path.join(folder, f"{uuid.uuid4().hex}.upload")
+    file.save(path)
+
+    try:
+        with open(path, "rb") as fh:
+            columns, rows = open_upload(fh, file.filename, file.mimetype)
+            rows.close()
+    except Exception:
+        _remove_file(path)
+        raise
+
+    job = ImportJob(status="queued", mode=mode, filename=file.filename, mimetype=file.mimetype,
+                    path=path, user_id=user_id)
+    db.session.add(job)
+    return job, columns
+
+
+def discard_job(job):
+    """Borra la copia de un job que no llegó a encolarse (sin commit)."""
+    _remove_file(job.path)
+    if job in db.session:
+        db.session.expunge(job)
+
+
+def claim(job_id, stale_seconds):
+    """Marca el job como 'running' para este proceso. True si lo consiguió."""
+    now = datetime.utcnow()
+    stale = now - timedelta(seconds=stale_seconds)
+    result = db.session.execute(
+        update(ImportJob)
+        .where(
+            ImportJob.id == job_id,
+            or_(
+                ImportJob.status == "queued",
+                and_(
+                    ImportJob.status == "running",
+                    or_(ImportJob.heartbeat_at.is_(None), ImportJob.heartbeat_at < stale),
+                ),
+            ),
+        )
+        .values(status="running", heartbeat_at=now,
+                started_at=func.coalesce(ImportJob.started_at, now))
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+    return result.rowcount == 1
+
+
+def _process(job):
+    """Importa desde la última fila confirmada hasta el final, un commit por lote."""
+    base = {k: getattr(job, k) for k in ("inserted", "updated", "skipped")}
+    with open(job.path, "rb") as fh:
+        columns, rows = open_upload(fh, job.filename, job.mimetype)
+        importer = AccountImporter(mode=job.mode, columns=columns)
+        for batch in batched(islice(rows, job.rows_processed, None), BATCH):
+            importer.add_rows(batch)
+            job.rows_processed += len(batch)
+            for k, v in base.items():
+                setattr(job, k, v + importer.stats[k])
+            job.heartbeat_at = datetime.utcnow()
+            # Cuentas y progreso en la misma transacción
+            db.session.commit()
+
+    job.status = "done"
+    job.finished_at = datetime.utcnow()
+    db.session.commit()
+
+    metrics.inc("app_import_jobs_total", status="done")
+    for k in ("inserted", "updated", "skipped"):
+        metrics.inc("app_import_rows_total", importer.stats[k], result=k)
+
+
+def _fail(job_id, message):
+    db.session.execute(
+        update(ImportJob)
+        .where(ImportJob.id == job_id)
+        .values(status="failed", error=message[:2000], finished_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+
+
+def run_job(app, job_id):
+    """Ejecuta (o retoma) un job. Seguro de llamar desde cualquier hilo."""
+    with app.app_context():
+        path = None
+        try:
+            if not claim(job_id, int(app.config.get("IMPORT_STALE_SECONDS", 300))):
+                return
+            job = db.session.get(ImportJob, job_id)
+            path = job.path
+            _process(job)
+            app.logger.info("Importación #%s terminada: %s filas", job_id, job.rows_processed)
+        except Exception as e:
+            db.session.rollback()
+            app.logger.exception("Importación #%s falló: %s", job_id, e)
+            metrics.inc("app_import_jobs_total", status="failed")
+            try:
+                _fail(job_id, str(e))
+            except Exception:
+                db.session.rollback()
+                path = None  # sin estado final: se conserva la copia para retomarlo
+        finally:
+            db.session.remove()
+        _remove_file(path)
+
+
+def submit(app, job_id):
+    """Encola el job en el pool (o lo ejecuta en línea si IMPORT_ASYNC=0)."""
+    if app.config.get("IMPORT_ASYNC", True):
+        _get_executor(app).submit(run_job, app, job_id)
+    else:
+        run_job(app, job_id)
+
+
+def resume_pending(app):
+    """Reencola los jobs pendientes o huérfanos (p. ej. tras un reinicio)."""
+    with app.app_context():
+        try:
+            stale = datetime.utcnow() - timedelta(seconds=int(app.config.get("IMPORT_STALE_SECONDS", 300)))
+            ids = db.session.scalars(
+                select(ImportJob.id)
+                .where(or_(
+                    ImportJob.status == "queued",
+                    and_(ImportJob.status == "running",
+                         or_(ImportJob.heartbeat_at.is_(None), ImportJob.heartbeat_at < stale)),
+                ))
+                .order_by(ImportJob.id)
+            ).all()
+        except Exception as e:
+            app.logger.warning("No se pudieron revisar importaciones pendientes: %s", e)
+            return []
+        finally:
+            db.session.remove()
+    for job_id in ids:
+        submit(app, job_id)
+    if ids:
+        app.logger.info("Importaciones retomadas: %s", ids)
+    return ids
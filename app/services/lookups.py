@@ -0,0 +1,53 @@
+"""
+Búsqueda por prefijo para los selectores de proveedor, cliente y plataforma.
+
+Los resultados se cachean por (tipo, prefijo, límite); cualquier commit que
+toque Account/Provider/Client sube la versión de datos y los invalida. Antes
+de leer la caché se consulta la fila global data_version, así los altas
+hechas en otro worker aparecen enseguida y no al vencer el TTL.
+"""
+from sqlalchemy import select, func
+
+from ..extensions import db
+from ..models import Account, Provider, Client
+from . import cache
+
+KINDS = ('providers', 'clients', 'platforms')
+MAX_LIMIT = 50
+CACHE_TTL = 300
+
+
+def _like_prefix(prefix):
+    escaped = prefix.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return f"{escaped.lower()}%"
+
+
+def _query(kind, prefix, limit):
+    if kind == 'platforms':
+        name = func.trim(Account.platform)
+        stmt = (select(name)
+                .where(Account.platform.isnot(None))
+                .distinct()
+                .order_by(func.lower(name)))
+        if prefix:
+            stmt = stmt.where(func.lower(name).like(_like_prefix(prefix), escape='\\'))
+        return [{"name": n} for (n,) in db.session.execute(stmt.limit(limit))]
+
+    model = Provider if kind == 'providers' else Client
+    stmt = select(model.id, model.name).order_by(model.name)
+    if prefix:
+        stmt = stmt.where(func.lower(model.name).like(_like_prefix(prefix), escape='\\'))
+    return [{"id": id_, "name": n} for id_, n in db.session.execute(stmt.limit(limit))]
+
+
+def search(kind, prefix="", limit=10):
+    if kind not in KINDS:
+        raise ValueError(f"Tipo de búsqueda no soportado: {kind}")
+    prefix = (prefix or "").strip()
+    limit = max(1, min(int(limit), MAX_LIMIT))
+    cache.sync_global(cache.global_version(db.session)[0])
+    return cache.get_or_set(
+        ("lookup", kind, prefix.lower(), limit),
+        lambda: _query(kind, prefix, limit),
+        CACHE_TTL,
+    )
@@ -0,0 +1,194 @@
+"""
+Métricas en formato de texto de Prometheus, sin dependencias extra.
+
+Cada proceso acumula contadores e histogramas en memoria. Como gunicorn
+corre varios workers y el scrape cae en uno cualquiera, cada proceso deja
+una foto de sus métricas en METRICS_DIR (como mucho cada FLUSH_SECONDS) y
+/metrics suma las fotos de todos los procesos.
+
+METRICS_DIR va por defecto a /dev/shm (tmpfs), que no sobrevive a un
+reinicio: las fotos de un arranque anterior no se suman a las vivas. Cada foto lleva el pid y un token del proceso, así un pid reutilizado
+no pisa la foto de un worker que ya terminó (sus contadores no bajan).
+
+    metrics.inc("app_exports_total", format="csv")
+    metrics.observe("http_request_duration_seconds", 0.12, endpoint="accounts.index", method="GET", status="200")
+"""
+import json
+import os
+import threading
+import time
+import uuid
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+FLUSH_SECONDS = 5
+STALE_SECONDS = 24 * 3600
+
+# nombre -> (tipo, ayuda, buckets)
+METRICS = {
+    "http_request_duration_seconds": ("histogram", "Latencia total por endpoint", LATENCY_BUCKETS),
+    "http_request_sql_seconds": ("histogram", "Tiempo en SQL por petición", LATENCY_BUCKETS),
+    "http_request_sql_statements_total": ("counter", "Sentencias SQL emitidas por endpoint", None),
+    "http_request_template_seconds_total": ("counter", "Tiempo de render de plantillas por endpoint", None),
+    "app_import_jobs_total": ("counter", "Importaciones terminadas por estado", None),
+    "app_import_rows_total": ("counter", "Filas importadas por resultado", None),
+    "app_exports_total": ("counter", "Exportaciones por formato", None),
+    "app_export_rows_total": ("counter", "Filas exportadas por formato", None),
+    "app_notify_runs_total": ("counter", "Ejecuciones de notify por modo y resultado", None),
+    "app_notify_messages_total": ("counter", "Mensajes de Pushover por resultado", None),
+}
+
+_lock = threading.Lock()
+_counters = {}     # (name, labels) -> float
+_histograms = {}   # (name, labels) -> [bucket counts..., sum, count]
+_last_flush = 0.0
+
+
+def _key(name, labels):
+    if name not in METRICS:
+        raise KeyError(f"Métrica no declarada: {name}")
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def inc(name, value=1, **labels):
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def observe(name, value, **labels):
+    key = _key(name, labels)
+    buckets = METRICS[name][2]
+    with _lock:
+        h = _histograms.get(key)
+        if h is None:
+            h = _histograms[key] = [0] * (len(buckets) + 2)
+        for i, bound in enumerate(buckets):
+            if value <= bound:
+                h[i] += 1
+        h[-2] += value
+        h[-1] += 1
+
+
+def snapshot():
+    with _lock:
+        return {
+            "counters": [[n, list(map(list, l)), v] for (n, l), v in _counters.items()],
+            "histograms": [[n, list(map(list, l)), list(h)] for (n, l), h in _histograms.items()],
+        }
+
+
+def reset():
+    global _last_flush
+    with _lock:
+        _counters.clear()
+        _histograms.clear()
+        _last_flush = 0.0
+
+
+# ---------- fotos por proceso ----------
+
+_process = (None, None)   # (pid, token) de este proceso; se renueva tras un fork
+
+
+def _process_id():
+    global _process
+    pid = os.getpid()
+    if _process[0] != pid:
+        _process = (pid, uuid.uuid4().hex[:8])
+    return f"{pid}-{_process[1]}"
+
+
+def _snapshot_path(directory):
+    return os.path.join(directory, f"{_process_id()}.json")
+
+
+def flush(directory, force=False):
+    """Escribe la foto de este proceso (como mucho cada FLUSH_SECONDS)."""
+    global _last_flush
+    if not directory:
+        return
+    now = time.monotonic()
+    if not force and now - _last_flush < FLUSH_SECONDS:
+        return
+    _last_flush = now
+    try:
+        os.makedirs(directory, exist_ok=True)
+        path = _snapshot_path(directory)
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(snapshot(), f)
+        os.replace(tmp, path)
+    except OSError:
+        pass
+
+
+def _load_snapshots(directory):
+    """Fotos de los demás procesos (descarta las de procesos que ya no escriben)."""
+    own = _snapshot_path(directory) if directory else None
+    if not directory or not os.path.isdir(directory):
+        return []
+    out = []
+    now = time.time()
+    for name in os.listdir(directory):
+        path = os.path.join(directory, name)
+        if not name.endswith(".json") or path == own:
+            continue
+        try:
+            if now - os.path.getmtime(path) > STALE_SECONDS:
+                os.remove(path)
+                continue
+            with open(path) as f:
+                out.append(json.load(f))
+        except (OSError, ValueError):
+            continue
+    return out
+
+
+# ---------- exposición ----------
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _fmt_labels(labels, extra=()):
+    items = list(labels) + list(extra)
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in items) + "}"
+
+
+def _fmt_value(v):
+    return repr(float(v)) if isinstance(v, float) and not float(v).is_integer() else str(int(v))
+
+
+def render(directory=None):
+    """Texto de exposición (text/plain; version=0.0.4) sumando todos los procesos."""
+    counters, histograms = {}, {}
+    for snap in [snapshot()] + _load_snapshots(directory):
+        for name, labels, value in snap["counters"]:
+            key = (name, tuple(map(tuple, labels)))
+            counters[key] = counters.get(key, 0) + value
+        for name, labels, values in snap["histograms"]:
+            key = (name, tuple(map(tuple, labels)))
+            acc = histograms.setdefault(key, [0] * len(values))
+            for i, v in enumerate(values):
+                acc[i] += v
+
+    lines = []
+    for name, (kind, help_text, buckets) in METRICS.items():
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        if kind == "counter":
+            for (n, labels), value in sorted(counters.items()):
+                if n == name:
+                    lines.append(f"{name}{_fmt_labels(labels)} {_fmt_value(value)}")
+        else:
+            for (n, labels), h in sorted(histograms.items()):
+                if n != name:
+                    continue
+                for bound, count in zip(buckets, h):
+                    lines.append(f"{name}_bucket{_fmt_labels(labels, [('le', bound)])} {int(count)}")
+                lines.append(f"{name}_bucket{_fmt_labels(labels, [('le', '+Inf')])} {int(h[-1])}")
+                lines.append(f"{name}_sum{_fmt_labels(labels)} {_fmt_value(h[-2])}")
+                lines.append(f"{name}_count{_fmt_labels(labels)} {int(h[-1])}")
+    return "\n".join(lines) + "\n"
@@ -1,14 +1,12 @@
-from datetime import date, timedelta
-import io
-import requests
+from datetime import date, datetime, timedelta
 from flask import current_app
-from ..models import Account
+from sqlalchemy import select, func, cast, Integer, and_, or_, case, insert, update, delete
+from ..extensions import db
+from ..models import Account, Client, Provider, NotificationLog
+from .pushover import PushoverDispatcher
+from .charts import summary_chart_png
+from . import metrics
 
-# (opcional) para gráfico
-try:
-    import matplotlib.pyplot as plt
-except Exception:  # si no está instalado, no pasa nada
-    plt = None
 
 
 # ---------- helpers visuales ----------
@@ -22,10 +20,8 @@ def _days_text(d):
 def _pushover_enabled(cfg):
     return bool(cfg.get("PUSHOVER_USER_KEY") and cfg.get("PUSHOVER_API_TOKEN"))
 
-def _send_pushover(message, title, cfg, *, priority=0, sound=None, html=False, url=None, url_title=None, attachment_bytes=None):
-    if not _pushover_enabled(cfg):
-        return False, "Pushover no configurado"
-
+def _pushover_payload(message, title, cfg, *, priority=0, sound=None, html=False, url=None, url_title=None, attachment_bytes=None):
+    """(data, files) listos para POST a la API de Pushover."""
     data = {
         "token": cfg.get("PUSHOVER_API_TOKEN"),
         "user": cfg.get("PUSHOVER_USER_KEY"),
@@ -48,13 +44,7 @@ def _send_pushover(message, title, cfg, *, priority=0, sound=None, html=False, u
     files = None
     if attachment_bytes is not None:
         files = {"attachment": ("resumen.png", attachment_bytes, "image/png")}
-
-    resp = requests.post("https://api.pushover.net/1/messages.json", data=data, files=files, timeout=15)
-    try:
-        resp.raise_for_status()
-        return True, "OK"
-    except Exception as e:
-        return False, str(e)
+    return data, files
 
 def _chunk_lines(lines, char_limit):
     pages, cur, cur_len = [], [], 0
@@ -72,38 +62,122 @@ def _chunk_lines(lines, char_limit):
 
 # ---------- consultas ----------
 
-def _query_sections(today, window_days):
-    soon_limit = today + timedelta(days=window_days)
+def _days_until(today, dialect=None):
+    """Días hasta end_date calculados en SQL."""
+    if (dialect or db.engine.dialect.name) == "sqlite":
+        return cast(func.julianday(Account.end_date) - func.julianday(today), Integer)
+    # PostgreSQL: date - date devuelve un entero
+    return cast(Account.end_date - today, Integer)
+
+
+MODES = ("full", "delta")
 
-    q_today = Account.query.filter(Account.end_date == today).all()
-    q_tomorrow = Account.query.filter(Account.end_date == today + timedelta(days=1)).all()
-    q_soon = Account.query.filter(
-        Account.end_date >= today + timedelta(days=2),
-        Account.end_date <= soon_limit
-    ).all()
-
-    def rows(qs):
-        out = []
-        for a in qs:
-            d = (a.end_date - today).days if a.end_date else None
-            out.append({
-                "id": a.id,
-                "platform": a.platform,
-                "username": a.username,
-                "password": a.password or "",
-                "client": a.client.name if a.client else "",
-                "provider": a.provider.name if a.provider else "",
-                "end_date": a.end_date.isoformat() if a.end_date else "",
-                "d": d
-            })
-        return out
 
-    return {"hoy": rows(q_today), "mañana": rows(q_tomorrow), "soon": rows(q_soon)}
+def _section_key(d):
+    return "hoy" if d == 0 else "mañana" if d == 1 else "soon"
+
+
+def _sections_stmt(today, window_days, delta=False, dialect=None):
+    """
+    Una sola consulta proyectada para toda la ventana (en orden end_date, id).
+    Con delta=True solo trae lo que no se avisó para esa fecha de vencimiento
+    (más las que llegan a "hoy" y solo se habían avisado antes).
+    """
+    soon_limit = today + timedelta(days=window_days)
+
+    stmt = (
+        select(
+            Account.id,
+            Account.platform,
+            Account.username,
+            Account.password,
+            Client.name,
+            Provider.name,
+            Account.end_date,
+            _days_until(today, dialect),
+            NotificationLog.id,
+        )
+        .select_from(Account)
+        .outerjoin(Client, Account.client_id == Client.id)
+        .outerjoin(Provider, Account.provider_id == Provider.id)
+        # También en modo full: las ya anotadas se actualizan en vez de insertarse otra vez
+        .outerjoin(NotificationLog, and_(
+            NotificationLog.account_id == Account.id,
+            NotificationLog.end_date == Account.end_date,
+        ))
+        .where(Account.end_date >= today, Account.end_date <= soon_limit)
+        .order_by(Account.end_date, Account.id)
+    )
+    if delta:
+        stmt = stmt.where(or_(
+            NotificationLog.id.is_(None),
+            and_(Account.end_date == today, NotificationLog.section != "hoy"),
+        ))
+    return stmt
+
+
+def _query_sections(today, window_days, delta=False):
+    """Las filas de _sections_stmt() repartidas en hoy/mañana/pronto."""
+    stmt = _sections_stmt(today, window_days, delta=delta)
+    sections = {"hoy": [], "mañana": [], "soon": []}
+    for id_, platform, username, password, client, provider, end_date, d, log_id in db.session.execute(stmt):
+        sections[_section_key(d)].append({
+            "id": id_,
+            "platform": platform,
+            "username": username,
+            "password": password or "",
+            "client": client or "",
+            "provider": provider or "",
+            "end_date": end_date.isoformat() if end_date else "",
+            "d": d,
+            "log_id": log_id,
+        })
+    return sections
 
 def _summary_counts(sections):
     return {k: len(v) for k, v in sections.items()}
 
 
+def _window_counts(today, window_days):
+    """Totales de la ventana con un solo agregado (sin traer las filas)."""
+    tomorrow = today + timedelta(days=1)
+    soon_limit = today + timedelta(days=window_days)
+    hoy, manana, soon = db.session.execute(
+        select(
+            func.coalesce(func.sum(case((Account.end_date == today, 1), else_=0)), 0),
+            func.coalesce(func.sum(case((Account.end_date == tomorrow, 1), else_=0)), 0),
+            func.coalesce(func.sum(case((Account.end_date > tomorrow, 1), else_=0)), 0),
+        ).where(Account.end_date >= today, Account.end_date <= soon_limit)
+    ).one()
+    return {"hoy": int(hoy), "mañana": int(manana), "soon": int(soon)}
+
+
+def _record_notified(items, today):
+    """Anota en notification_log las cuentas avisadas (sin commit)."""
+    now = datetime.utcnow()
+    new_rows, changed = [], []
+    for r in items:
+        section = _section_key(r["d"])
+        if r.get("log_id"):
+            changed.append({"id": r["log_id"], "section": section, "notified_at": now})
+        else:
+            new_rows.append({
+                "account_id": r["id"],
+                "end_date": date.fromisoformat(r["end_date"]),
+                "section": section,
+                "notified_at": now,
+            })
+    if new_rows:
+        db.session.execute(insert(NotificationLog), new_rows)
+    if changed:
+        db.session.execute(update(NotificationLog), changed)
+    # Lo ya vencido no vuelve a entrar en la ventana
+    db.session.execute(
+        delete(NotificationLog).where(NotificationLog.end_date < today)
+        .execution_options(synchronize_session=False)
+    )
+
+
 # ---------- render con HTML + emojis ----------
 
 def _group_if_needed(items, group_by_provider: bool):
@@ -117,12 +191,13 @@ def _group_if_needed(items, group_by_provider: bool):
 
 def _render_detail_html(title, items, cfg, include_passwords, max_items, group_by_provider):
     """
-    Devuelve (title, [pages]) usando HTML (negritas, links).
+    Devuelve (líneas, items mostrados) usando HTML (negritas, links).
     Cada item incluye un link Editar si APP_BASE_URL está configurado.
     """
     base = cfg.get("APP_BASE_URL", "")
     lines = [f"<b>— {title} —</b>"]
     shown = 0
+    shown_items = []
 
     grouped = _group_if_needed(items, group_by_provider)
     for prov, rows in grouped.items():
@@ -143,6 +218,7 @@ def _render_detail_html(title, items, cfg, include_passwords, max_items, group_b
                 extra += f" &nbsp;|&nbsp; 🔑 <code>{r['password']}</code>"
             lines.append(extra)
             shown += 1
+            shown_items.append(r)
         if prov and shown < max_items:
             lines.append("")  # separación entre grupos
 
@@ -151,29 +227,22 @@ def _render_detail_html(title, items, cfg, include_passwords, max_items, group_b
 
     if len(items) > shown:
         lines.append(f"<i>+ {len(items) - shown} más…</i>")
-    return lines
-
-def _build_summary_chart_bytes(counts, today):
-    if plt is None:
-        return None
-    fig, ax = plt.subplots(figsize=(4, 2.2), dpi=200)
-    cats = ["Hoy", "Mañana", "≤7d"]
-    vals = [counts["hoy"], counts["mañana"], counts["soon"]]
-    ax.bar(cats, vals)
-    ax.set_title(f"Vencimientos · {today.isoformat()}")
-    for i, v in enumerate(vals):
-        ax.text(i, v, str(v), ha="center", va="bottom")
-    fig.tight_layout()
-    bio = io.BytesIO()
-    fig.savefig(bio, format="png")
-    plt.close(fig)
-    bio.seek(0)
-    return bio.read()
+    return lines, shown_items
+
+def _build_summary_chart_bytes(counts, today, cfg=None, window_days=7):
+    # El render vive en services/charts.py; matplotlib solo se usa en un subproceso
+    renderer = (cfg or {}).get("NOTIFY_CHART_RENDERER", "pillow")
+    return summary_chart_png(counts, today, window_days=window_days, renderer=renderer)
 
 
 # ---------- API pública ----------
 
-def build_pushover_messages(today, window_days, cfg):
+def _notify_mode(mode, cfg):
+    mode = (mode or cfg.get("NOTIFY_MODE", "delta") or "delta").strip().lower()
+    return mode if mode in MODES else "full"
+
+
+def build_pushover_messages(today, window_days, cfg, mode="full"):
     """
     Devuelve lista de dicts con:
     {
@@ -183,31 +252,44 @@ def build_pushover_messages(today, window_days, cfg):
       "sound": str,
       "html": True/False,
       "attachment": bytes|None,
+      "section": "resumen"|"hoy"|"mañana"|"soon",
+      "items": [cuentas mostradas en el detalle],
     }
     Paginado automáticamente respetando NOTIFY_MESSAGE_CHAR_LIMIT.
+
+    mode="full": todas las cuentas de la ventana.
+    mode="delta": solo las que no se avisaron para su fecha actual (o que
+    llegan a "hoy"); el resumen lleva los totales de la ventana y las nuevas.
     """
     char_limit = int(cfg.get("NOTIFY_MESSAGE_CHAR_LIMIT", 1000))
     include_pass = bool(cfg.get("NOTIFY_INCLUDE_PASSWORDS", False))
     max_items = int(cfg.get("NOTIFY_MAX_ITEMS_PER_SECTION", 8))
     group_by_provider = bool(cfg.get("NOTIFY_GROUP_BY_PROVIDER", True))
     attach_chart = bool(cfg.get("NOTIFY_ATTACH_CHART", False))
+    delta = mode == "delta"
 
-    sections = _query_sections(today, window_days)
-    counts = _summary_counts(sections)
+    sections = _query_sections(today, window_days, delta=delta)
+    new_counts = _summary_counts(sections)
+    counts = _window_counts(today, window_days) if delta else new_counts
+
+    def _new(key):
+        return f" <i>(+{new_counts[key]} nuevas)</i>" if delta and new_counts[key] else ""
 
     # 1) Resumen (HTML + posible gráfico)
     resume_lines = [
         f"📣 <b>Andriux</b> &nbsp;·&nbsp; <i>{today.isoformat()}</i>",
         f"<small>(Por vencer ≤{window_days} días)</small>",
         "",
-        f"✅ Vence <b>HOY</b>: {counts['hoy']}",
-        f"🕘 Vence <b>MAÑANA</b>: {counts['mañana']}",
-        f"⏳ Vence <b>≤{window_days}d</b>: {counts['soon']}",
+        f"✅ Vence <b>HOY</b>: {counts['hoy']}{_new('hoy')}",
+        f"🕘 Vence <b>MAÑANA</b>: {counts['mañana']}{_new('mañana')}",
+        f"⏳ Vence <b>≤{window_days}d</b>: {counts['soon']}{_new('soon')}",
     ]
+    if delta:
+        resume_lines += ["", "<small>Solo se detallan las cuentas nuevas o que vencen hoy.</small>"]
     pages = _chunk_lines(resume_lines, char_limit)
     attachment = None
     if attach_chart:
-        png = _build_summary_chart_bytes(counts, today)
+        png = _build_summary_chart_bytes(counts, today, cfg, window_days)
         if png:
             attachment = png  # solo en la primera página del resumen
 
@@ -220,18 +302,21 @@ def build_pushover_messages(today, window_days, cfg):
             "sound": cfg.get("PUSH_SUMMARY_SOUND", "magic"),
             "html": True,
             "attachment": (attachment if i == 0 else None),
+            "section": "resumen",
+            "items": [],
         })
 
     # 2) Detalles por sección
     detail_specs = [
-        ("VENCE HOY", sections["hoy"], int(cfg.get("PUSH_TODAY_PRIORITY", 1)), cfg.get("PUSH_TODAY_SOUND", "siren")),
-        ("VENCE MAÑANA (1 día)", sections["mañana"], int(cfg.get("PUSH_OTHER_PRIORITY", 0)), cfg.get("PUSH_OTHER_PRIORITY", "echo")),
-        (f"POR VENCER (≤ {window_days} días)", sections["soon"], int(cfg.get("PUSH_OTHER_PRIORITY", 0)), cfg.get("PUSH_SOON_SOUND", "echo")),
+        ("hoy", "VENCE HOY", int(cfg.get("PUSH_TODAY_PRIORITY", 1)), cfg.get("PUSH_TODAY_SOUND", "siren")),
+        ("mañana", "VENCE MAÑANA (1 día)", int(cfg.get("PUSH_OTHER_PRIORITY", 0)), cfg.get("PUSH_OTHER_PRIORITY", "echo")),
+        ("soon", f"POR VENCER (≤ {window_days} días)", int(cfg.get("PUSH_OTHER_PRIORITY", 0)), cfg.get("PUSH_SOON_SOUND", "echo")),
     ]
-    for sec_title, items, prio, sound in detail_specs:
+    for key, sec_title, prio, sound in detail_specs:
+        items = sections[key]
         if not items:
             continue
-        lines = _render_detail_html(sec_title, items, cfg, include_pass, max_items, group_by_provider)
+        lines, shown = _render_detail_html(sec_title, items, cfg, include_pass, max_items, group_by_provider)
         pages = _chunk_lines(lines, char_limit)
         for i, page in enumerate(pages):
             messages.append({
@@ -241,14 +326,19 @@ def build_pushover_messages(today, window_days, cfg):
                 "sound": sound,
                 "html": True,
                 "attachment": None,
+                "section": key,
+                # Las cuentas se anotan una vez por sección (en su primera página)
+                "items": shown if i == 0 else [],
             })
 
     return messages
 
 
-def send_pushover_now():
+def send_pushover_now(mode=None):
     """
     Construye y envía mensajes con formato HTML + emojis y (opcional) imagen adjunta.
+    mode: "full" o "delta" (por defecto NOTIFY_MODE). Las cuentas detalladas
+    quedan en notification_log cuando todas las páginas de su sección se enviaron.
     Retorna [(title, ok, info), ...]
     """
     cfg = current_app.config
@@ -257,13 +347,33 @@ def send_pushover_now():
 
     today = date.today()
     window = int(cfg.get("NOTIFY_WINDOW_DAYS", 7))
-    batches = build_pushover_messages(today, window, cfg)
+    mode = _notify_mode(mode, cfg)
+    batches = build_pushover_messages(today, window, cfg, mode=mode)
+
+    if mode == "delta" and not any(b["items"] for b in batches) and not cfg.get("NOTIFY_DELTA_SEND_EMPTY", False):
+        metrics.inc("app_notify_runs_total", mode=mode, result="empty")
+        return [("Pushover", True, "Sin novedades")]
 
-    results = []
-    for b in batches:
-        ok, info = _send_pushover(
+    jobs = [
+        _pushover_payload(
             b["message"], b["title"], cfg,
             priority=b["priority"], sound=b["sound"], html=b["html"], attachment_bytes=b["attachment"]
         )
-        results.append((b["title"], ok, info))
-    return results
+        for b in batches
+    ]
+    sent = PushoverDispatcher(cfg).send_all(jobs)
+    ok_count = sum(1 for ok, _ in sent if ok)
+    metrics.inc("app_notify_messages_total", ok_count, result="ok")
+    metrics.inc("app_notify_messages_total", len(sent) - ok_count, result="fail")
+    metrics.inc("app_notify_runs_total", mode=mode, result="ok" if ok_count == len(sent) else "partial" if ok_count else "fail")
+
+    failed_sections = {b["section"] for b, (ok, _) in zip(batches, sent) if not ok}
+    notified = [r for b in batches if b["section"] not in failed_sections for r in b["items"]]
+    try:
+        _record_notified(notified, today)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.warning("No se pudo actualizar notification_log: %s", e)
+
+    return [(b["title"], ok, info) for b, (ok, info) in zip(batches, sent)]
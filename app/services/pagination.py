@@ -0,0 +1,129 @@
+"""
+Paginación por cursor (keyset) para la lista de cuentas.
+
+Orden fijo (models.LIST_ORDER): end_date ASC con las cuentas sin fecha al
+final, created_at DESC con los NULL al final, id DESC. Lo sirve el índice
+ix_account_list_order (ix_account_status_list_order con filtro de estado)
+sin ordenar en memoria.
+
+El cursor guarda (end_date, created_at, id) de la fila frontera. El predicado
+empieza con un rango sobre la clave de fecha (coalesce(end_date, 9999-12-31)),
+así la BD salta directo a la fecha del cursor y cada página cuesta lo mismo
+que la primera; dentro de esa fecha se filtra por (created_at, id).
+"""
+import base64
+import json
+from datetime import date, datetime
+
+from sqlalchemy import and_, or_
+
+from ..models import LIST_ORDER, NO_END_DATE, Account, account_end_key
+
+
+def encode_cursor(a):
+    raw = json.dumps([
+        a.end_date.isoformat() if a.end_date else None,
+        a.created_at.isoformat() if a.created_at else None,
+        a.id,
+    ])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token):
+    """Devuelve (end_date, created_at, id) o None si el cursor no es válido."""
+    if not token:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        end_date, created_at, id_ = json.loads(raw)
+        return (
+            date.fromisoformat(end_date) if end_date else None,
+            datetime.fromisoformat(created_at) if created_at else None,
+            int(id_),
+        )
+    except (ValueError, TypeError):
+        return None
+
+
+def order_forward():
+    return LIST_ORDER
+
+
+def order_backward():
+    return (account_end_key.desc(), Account.created_at.is_(None).desc(),
+            Account.created_at.asc(), Account.id.asc())
+
+
+def _tail_after(created_at, id_):
+    # Dentro de la misma fecha: created_at DESC (NULL al final), id DESC
+    if created_at is None:
+        return and_(Account.created_at.is_(None), Account.id < id_)
+    return or_(
+        Account.created_at.is_(None),
+        Account.created_at < created_at,
+        and_(Account.created_at == created_at, Account.id < id_),
+    )
+
+
+def _tail_before(created_at, id_):
+    if created_at is None:
+        return or_(
+            Account.created_at.is_not(None),
+            and_(Account.created_at.is_(None), Account.id > id_),
+        )
+    return and_(
+        Account.created_at.is_not(None),
+        or_(Account.created_at > created_at,
+            and_(Account.created_at == created_at, Account.id > id_)),
+    )
+
+
+def after_cursor(cursor):
+    """Filas que van después del cursor en el orden de la lista."""
+    end_date, created_at, id_ = cursor
+    end_key = end_date or NO_END_DATE
+    return and_(
+        account_end_key >= end_key,
+        or_(account_end_key > end_key, _tail_after(created_at, id_)),
+    )
+
+
+def before_cursor(cursor):
+    """Filas que van antes del cursor en el orden de la lista."""
+    end_date, created_at, id_ = cursor
+    end_key = end_date or NO_END_DATE
+    return and_(
+        account_end_key <= end_key,
+        or_(account_end_key < end_key, _tail_before(created_at, id_)),
+    )
+
+
+class KeysetPage:
+    def __init__(self, items, has_next, has_prev):
+        self.items = items
+        self.has_next = has_next
+        self.has_prev = has_prev
+        self.next_cursor = encode_cursor(items[-1]) if items and has_next else None
+        self.prev_cursor = encode_cursor(items[0]) if items and has_prev else None
+
+
+def keyset_paginate(query, per_page, after=None, before=None):
+    """
+    Pagina `query` (sin order_by) por cursor. `after`/`before` son los tokens
+    de la URL; si ninguno es válido, devuelve la primera página.
+    """
+    after_c = decode_cursor(after)
+    before_c = decode_cursor(before) if after_c is None else None
+
+    if before_c is not None:
+        rows = (query.filter(before_cursor(before_c))
+                .order_by(*order_backward())
+                .limit(per_page + 1).all())
+        has_prev = len(rows) > per_page
+        items = list(reversed(rows[:per_page]))
+        return KeysetPage(items, has_next=True, has_prev=has_prev)
+
+    if after_c is not None:
+        query = query.filter(after_cursor(after_c))
+    rows = query.order_by(*order_forward()).limit(per_page + 1).all()
+    return KeysetPage(rows[:per_page], has_next=len(rows) > per_page, has_prev=after_c is not None)
@@ -0,0 +1,141 @@
+"""
+Transporte HTTP para Pushover: sesión con pool de conexiones, envío
+concurrente acotado, límite de ritmo y reintentos con backoff.
+
+Pushover responde 429 cuando se supera el límite y 5xx ante fallos
+temporales; ambos se reintentan. Otros 4xx (token o usuario inválidos)
+no tienen arreglo y se devuelven tal cual. De los errores de red solo se
+reintentan los de conexión (el mensaje no salió): un timeout de lectura o
+una conexión cortada con la petición ya enviada puede ser un mensaje que
+Pushover aceptó, y reintentarlo lo duplicaría.
+"""
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import ConnectTimeoutError, NewConnectionError
+
+DEFAULT_API_URL = "https://api.pushover.net/1/messages.json"
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def _get_session(pool_size):
+    """Una sesión por proceso: reutiliza conexiones TLS entre mensajes y envíos."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            s = requests.Session()
+            # Sin reintentos en urllib3: los decide post() (ver _not_sent)
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(pool_size, 1), max_retries=0)
+            s.mount("https://", adapter)
+            s.mount("http://", adapter)
+            _session = s
+        return _session
+
+
+def _not_sent(exc):
+    """True si el error fue al abrir la conexión, antes de enviar la petición."""
+    if isinstance(exc, requests.ConnectTimeout):
+        return True
+    if isinstance(exc, requests.Timeout):
+        return False
+    # requests envuelve el error de urllib3 (MaxRetryError) y este guarda la causa
+    reason = getattr(exc.args[0], "reason", None) if exc.args else None
+    return isinstance(reason, (NewConnectionError, ConnectTimeoutError))
+
+
+class RateLimiter:
+    """Espacia el inicio de las peticiones a como mucho `per_second` por segundo."""
+
+    def __init__(self, per_second):
+        self.interval = 1.0 / per_second if per_second and per_second > 0 else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + self.interval
+        delay = start - now
+        if delay > 0:
+            time.sleep(delay)
+
+
+class PushoverDispatcher:
+    def __init__(self, cfg):
+        self.url = cfg.get("PUSHOVER_API_URL") or DEFAULT_API_URL
+        self.timeout = float(cfg.get("PUSHOVER_TIMEOUT", 15))
+        self.concurrency = max(int(cfg.get("PUSHOVER_CONCURRENCY", 2)), 1)
+        self.max_retries = max(int(cfg.get("PUSHOVER_MAX_RETRIES", 3)), 0)
+        self.backoff = float(cfg.get("PUSHOVER_BACKOFF_SECONDS", 0.5))
+        self.limiter = RateLimiter(float(cfg.get("PUSHOVER_MAX_PER_SECOND", 2)))
+        self.session = _get_session(self.concurrency)
+        # Si Pushover avisa que no queda cuota, no seguimos intentando
+        self._quota_exhausted = threading.Event()
+
+    def _sleep_before_retry(self, attempt, resp=None):
+        retry_after = resp.headers.get("Retry-After") if resp is not None else None
+        if retry_after:
+            try:
+                time.sleep(min(float(retry_after), 60))
+                return
+            except ValueError:
+                pass
+        delay = self.backoff * (2 ** attempt)
+        time.sleep(delay + random.uniform(0, delay / 2))
+
+    def post(self, data, files=None):
+        """Envía un mensaje. Retorna (ok, info)."""
+        last_error = "sin respuesta"
+        for attempt in range(self.max_retries + 1):
+            if self._quota_exhausted.is_set():
+                return False, "Cuota de Pushover agotada"
+            self.limiter.wait()
+            try:
+                resp = self.session.post(self.url, data=data, files=files, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if not _not_sent(e):
+                    return False, str(e)
+                last_error = str(e)
+                if attempt < self.max_retries:
+                    self._sleep_before_retry(attempt)
+                continue
+
+            if resp.headers.get("X-Limit-App-Remaining") == "0":
+                self._quota_exhausted.set()
+
+            if resp.status_code == 429 or resp.status_code >= 500:
+                last_error = f"HTTP {resp.status_code}"
+                if attempt < self.max_retries:
+                    self._sleep_before_retry(attempt, resp)
+                continue
+
+            try:
+                resp.raise_for_status()
+                return True, "OK"
+            except Exception as e:
+                return False, str(e)
+        return False, last_error
+
+    def send_all(self, jobs):
+        """
+        jobs: lista de (data, files). Devuelve [(ok, info), ...] en el mismo orden.
+        El primero (el resumen) sale solo, para que llegue antes que los detalles.
+        """
+        if not jobs:
+            return []
+        results = [self.post(*jobs[0])]
+        rest = jobs[1:]
+        if not rest:
+            return results
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="pushover") as pool:
+            results.extend(pool.map(lambda job: self.post(*job), rest))
+        return results
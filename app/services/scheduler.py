@@ -0,0 +1,214 @@
+"""
+Scheduler con un solo líder entre todos los workers y máquinas.
+
+Cada proceso corre un BackgroundScheduler con un único job de "latido"
+(SCHEDULER_HEARTBEAT_SECONDS). En cada latido intenta tomar o renovar la
+fila `scheduler_lease`; solo quien la tiene revisa los jobs diarios. Si el
+líder muere, su lease vence (SCHEDULER_LEASE_SECONDS) y otro proceso la toma
+en su siguiente latido.
+
+Los jobs diarios no viven en memoria: `scheduled_job` guarda la hora
+programada de la última ejecución. Un job se ejecuta cuando su última hora
+programada (hoy o ayer) es posterior a la guardada, así las ejecuciones que
+se perdieron con la máquina parada se recuperan una vez (coalescidas). Si el
+retraso supera SCHEDULER_MISFIRE_GRACE_SECONDS se marca como omitida.
+La hora se reserva con un UPDATE condicional: aunque dos procesos se crean
+líderes a la vez, cada hora programada corre una sola vez.
+"""
+import atexit
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import or_, update
+from sqlalchemy.exc import IntegrityError
+
+from ..extensions import db
+from ..models import SchedulerLease, ScheduledJob
+
+LEASE_NAME = "scheduler"
+
+
+def make_holder_id():
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+
+# ---------- lease ----------
+
+def acquire_lease(holder, ttl_seconds, name=LEASE_NAME, now=None):
+    """Toma o renueva el lease. True si `holder` es el líder hasta now + ttl."""
+    now = now or datetime.utcnow()
+    result = db.session.execute(
+        update(SchedulerLease)
+        .where(SchedulerLease.name == name,
+               or_(SchedulerLease.holder == holder, SchedulerLease.expires_at < now))
+        .values(holder=holder, expires_at=now + timedelta(seconds=ttl_seconds), heartbeat_at=now)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount == 1:
+        db.session.commit()
+        return True
+    if db.session.get(SchedulerLease, name) is not None:
+        db.session.commit()
+        return False
+    # Primera vez: nadie tiene la fila todavía
+    try:
+        db.session.add(SchedulerLease(
+            name=name, holder=holder,
+            expires_at=now + timedelta(seconds=ttl_seconds), heartbeat_at=now,
+        ))
+        db.session.commit()
+        return True
+    except IntegrityError:
+        db.session.rollback()
+        return False
+
+
+def release_lease(holder, name=LEASE_NAME):
+    """Cede el lease al apagarse, para que otro proceso lo tome sin esperar a que venza."""
+    db.session.execute(
+        update(SchedulerLease)
+        .where(SchedulerLease.name == name, SchedulerLease.holder == holder)
+        .values(expires_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+
+
+# ---------- jobs diarios ----------
+
+class DailyJob:
+    def __init__(self, id, hour, minute, func):
+        self.id = id
+        self.hour = hour
+        self.minute = minute
+        self.func = func    # func(app)
+
+    def last_slot(self, now):
+        """Hora programada más reciente que ya pasó (hoy o ayer)."""
+        slot = now.replace(hour=self.hour, minute=self.minute, second=0, microsecond=0)
+        if slot > now:
+            slot -= timedelta(days=1)
+        return slot
+
+
+def claim_slot(job_id, slot, holder, now=None):
+    """Reserva la ejecución de `slot` para este proceso. True si nadie la había tomado."""
+    now = now or datetime.now()
+    if db.session.get(ScheduledJob, job_id) is None:
+        try:
+            db.session.add(ScheduledJob(id=job_id))
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+    result = db.session.execute(
+        update(ScheduledJob)
+        .where(ScheduledJob.id == job_id,
+               or_(ScheduledJob.last_slot.is_(None), ScheduledJob.last_slot < slot))
+        .values(last_slot=slot, last_started_at=now, last_finished_at=None,
+                last_status="running", last_error=None, last_holder=holder)
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+    return result.rowcount == 1
+
+
+def _finish(job_id, status, error=None):
+    db.session.execute(
+        update(ScheduledJob)
+        .where(ScheduledJob.id == job_id)
+        .values(last_status=status, last_error=error, last_finished_at=datetime.now())
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+
+
+def run_due_jobs(app, jobs, holder, now=None, grace_seconds=None):
+    """Ejecuta los jobs con una hora programada pendiente. Devuelve los ids ejecutados."""
+    now = now or datetime.now()
+    if grace_seconds is None:
+        grace_seconds = int(app.config.get("SCHEDULER_MISFIRE_GRACE_SECONDS", 6 * 3600))
+    ran = []
+    for job in jobs:
+        slot = job.last_slot(now)
+        if not claim_slot(job.id, slot, holder, now):
+            continue
+        if (now - slot).total_seconds() > grace_seconds:
+            app.logger.warning("Job %s de %s omitido: demasiado tarde para recuperarlo", job.id, slot)
+            _finish(job.id, "skipped")
+            continue
+        try:
+            job.func(app)
+        except Exception as e:
+            db.session.rollback()
+            app.logger.exception("Job %s falló: %s", job.id, e)
+            _finish(job.id, "failed", str(e)[:2000])
+            continue
+        _finish(job.id, "done")
+        ran.append(job.id)
+    return ran
+
+
+# ---------- proceso ----------
+
+class LeaderScheduler:
+    """Latido periódico: renueva el lease y, si este proceso es el líder, corre los jobs."""
+
+    def __init__(self, app, jobs):
+        self.app = app
+        self.jobs = list(jobs)
+        self.holder = make_holder_id()
+        self.ttl = int(app.config.get("SCHEDULER_LEASE_SECONDS", 90))
+        self.interval = int(app.config.get("SCHEDULER_HEARTBEAT_SECONDS", 30))
+        self.is_leader = False
+        self._scheduler = None
+
+    def tick(self):
+        with self.app.app_context():
+            try:
+                leader = acquire_lease(self.holder, self.ttl)
+                if leader != self.is_leader:
+                    self.app.logger.info(
+                        "Scheduler: %s %s el liderazgo", self.holder, "toma" if leader else "pierde"
+                    )
+                self.is_leader = leader
+                if leader:
+                    run_due_jobs(self.app, self.jobs, self.holder)
+            except Exception as e:
+                db.session.rollback()
+                self.app.logger.exception("Scheduler tick error: %s", e)
+            finally:
+                db.session.remove()
+
+    def shutdown(self):
+        if self._scheduler is not None:
+            self._scheduler.shutdown(wait=False)
+            self._scheduler = None
+        if self.is_leader:
+            with self.app.app_context():
+                try:
+                    release_lease(self.holder)
+                except Exception:
+                    db.session.rollback()
+                finally:
+                    db.session.remove()
+            self.is_leader = False
+
+    def start(self):
+        from apscheduler.schedulers.background import BackgroundScheduler
+
+        self._scheduler = BackgroundScheduler(daemon=True)
+        self._scheduler.add_job(
+            func=self.tick,
+            trigger="interval",
+            seconds=self.interval,
+            id="scheduler_tick",
+            next_run_time=datetime.now() + timedelta(seconds=1),
+            max_instances=1,
+            coalesce=True,
+            replace_existing=True,
+        )
+        self._scheduler.start()
+        atexit.register(self.shutdown)
+        return self
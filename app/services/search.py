@@ -0,0 +1,67 @@
+"""
+Búsqueda libre (`q`) sobre Account.search_text.
+
+- SQLite: tabla virtual FTS5 `account_fts` con tokenizador trigram; un
+  MATCH de frase equivale a un LIKE '%term%' pero recorre solo las filas
+  que contienen los trigramas del término.
+- PostgreSQL: índice GIN pg_trgm sobre search_text, que sirve el LIKE directo.
+- Términos de menos de 3 caracteres (sin trigramas) o motores sin índice:
+  LIKE sobre la columna, ya sin JOIN con cliente/proveedor.
+
+La tabla y los triggers se crean con el esquema (ver models.py) y en la
+migración correspondiente.
+"""
+import threading
+
+from sqlalchemy import select, text
+
+from ..extensions import db
+from ..models import Account, refresh_search_text
+from .status import IN_CHUNK
+
+MIN_FTS_TERM = 3
+
+_fts_checked = {}
+_fts_lock = threading.Lock()
+
+
+def fts_enabled(engine=None):
+    """True si la BD tiene la tabla account_fts (se consulta una vez por engine)."""
+    engine = engine or db.engine
+    if engine.dialect.name != "sqlite":
+        return False
+    key = id(engine)
+    with _fts_lock:
+        if key not in _fts_checked:
+            with engine.connect() as conn:
+                _fts_checked[key] = conn.execute(text(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'account_fts'"
+                )).first() is not None
+        return _fts_checked[key]
+
+
+def normalize_term(q):
+    return " ".join((q or "").replace("%", "").replace("_", "").split()).lower()
+
+
+def match_clause(q):
+    """Predicado sobre Account para el término libre `q` (None si no hay término)."""
+    term = normalize_term(q)
+    if not term:
+        return None
+    if len(term) >= MIN_FTS_TERM and fts_enabled():
+        phrase = '"' + term.replace('"', '""') + '"'
+        return Account.id.in_(
+            select(text("rowid")).select_from(text("account_fts"))
+            .where(text("account_fts MATCH :phrase").bindparams(phrase=phrase))
+        )
+    return Account.search_text.like(f"%{term}%")
+
+
+def refresh_ids(ids):
+    """Recalcula search_text para esas cuentas (tras UPDATE masivos), de IN_CHUNK en IN_CHUNK ids. Sin commit."""
+    ids = list(ids)
+    changed = 0
+    for i in range(0, len(ids), IN_CHUNK):
+        changed += refresh_search_text(db.session.connection(), Account.id.in_(ids[i:i + IN_CHUNK]))
+    return changed
@@ -0,0 +1,71 @@
+"""
+Mantenimiento de Account.status_bucket.
+
+Los eventos ORM lo calculan al escribir; lo que cambia solo con el paso de
+los días (active -> expiring -> expired) lo corrige refresh_status_buckets(),
+que corre en el scheduler diario y, por si la máquina estaba parada a esa
+hora, una vez al día por proceso antes de la primera consulta que filtra.
+"""
+import threading
+from datetime import date, timedelta
+
+from sqlalchemy import update, or_, and_
+
+from ..extensions import db
+from ..models import Account, SOON_DAYS, status_bucket_expr
+
+# Tope de ids por IN (SQLite antiguo limita a 999 variables)
+IN_CHUNK = 500
+
+_lock = threading.Lock()
+_fresh_for = None
+
+
+def refresh_status_buckets(today=None):
+    """Recalcula solo las filas que cruzaron un límite. Devuelve cuántas cambió (sin commit)."""
+    today = today or date.today()
+    soon_limit = today + timedelta(days=SOON_DAYS)
+    stale = or_(
+        Account.status_bucket.is_(None),
+        and_(Account.status_bucket == "expiring", Account.end_date < today),
+        and_(Account.status_bucket == "active", Account.end_date <= soon_limit),
+    )
+    result = db.session.execute(
+        update(Account)
+        .where(stale)
+        .values(status_bucket=status_bucket_expr(today))
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
+
+
+def refresh_ids(ids, today=None):
+    """Recalcula el estado de las cuentas `ids` (para UPDATE masivos sin eventos ORM).
+
+    Va de IN_CHUNK en IN_CHUNK ids, así que acepta listas de cualquier tamaño.
+    """
+    ids = list(ids)
+    changed = 0
+    for i in range(0, len(ids), IN_CHUNK):
+        result = db.session.execute(
+            update(Account)
+            .where(Account.id.in_(ids[i:i + IN_CHUNK]))
+            .values(status_bucket=status_bucket_expr(today))
+            .execution_options(synchronize_session=False)
+        )
+        changed += result.rowcount
+    return changed
+
+
+def ensure_fresh(today=None):
+    """Corre refresh_status_buckets() como mucho una vez al día en este proceso."""
+    global _fresh_for
+    today = today or date.today()
+    if _fresh_for == today:
+        return
+    with _lock:
+        if _fresh_for == today:
+            return
+        refresh_status_buckets(today)
+        db.session.commit()
+        _fresh_for = today
@@ -0,0 +1,163 @@
+"""
+Datos sintéticos para pruebas de carga y benchmarks (`flask seed`).
+
+La forma imita la producción: pocas plataformas concentran casi todas las
+cuentas, unos pocos clientes y proveedores tienen la mayoría (distribución
+de Zipf) y los vencimientos se amontonan cerca de hoy (vencidas recientes,
+la ventana de "por vencer" y renovaciones mensuales), con una cola larga.
+
+Las cuentas se insertan con executemany por lotes, sin pasar por los eventos
+ORM: status_bucket y search_text se calculan aquí con las mismas funciones.
+"""
+import bisect
+import itertools
+import random
+from datetime import date, timedelta
+
+from sqlalchemy import func, insert, select
+
+from ..extensions import db
+from ..models import Account, Client, Provider, compute_status_bucket, search_document
+from . import cache
+
+BATCH = 5000
+
+# (plataforma, peso)
+PLATFORMS = [
+    ("Netflix", 30), ("Disney+", 16), ("Max", 12), ("Prime Video", 12), ("Spotify", 9),
+    ("YouTube Premium", 6), ("Crunchyroll", 5), ("Paramount+", 4), ("Apple TV+", 3),
+    ("Star+", 2), ("Vix", 1),
+]
+DOMAINS = ["gmail.com", "hotmail.com", "outlook.com", "yahoo.com", "icloud.com"]
+# Días contratados: casi todo mensual
+ALLOCATED = [30] * 6 + [60, 90, 180, 365]
+
+
+class _Picker:
+    """Elección ponderada en O(log n) con pesos acumulados."""
+
+    def __init__(self, values, weights, rng):
+        self.values = values
+        self.cum = list(itertools.accumulate(weights))
+        self.rng = rng
+
+    def __call__(self):
+        i = bisect.bisect_left(self.cum, self.rng.random() * self.cum[-1])
+        return self.values[i]
+
+
+def _zipf_weights(n, s=1.1):
+    return [1.0 / (k ** s) for k in range(1, n + 1)]
+
+
+def _end_offset(rng):
+    """Días de hoy al vencimiento, con el sesgo de una cartera real."""
+    r = rng.random()
+    if r < 0.20:
+        return -int(rng.expovariate(1 / 20)) - 1      # vencidas, sobre todo recientes
+    if r < 0.32:
+        return rng.randint(0, 7)                      # ventana de "por vencer"
+    if r < 0.80:
+        return rng.randint(8, 31)                     # ciclo mensual
+    return min(int(rng.expovariate(1 / 90)) + 32, 730)
+
+
+def _ensure_named(model, names, extra=None):
+    """Devuelve {nombre: id}, insertando los que falten (sin commit)."""
+    ids = dict(db.session.execute(select(model.name, model.id).where(model.name.in_(names))).all())
+    missing = [n for n in names if n not in ids]
+    if missing:
+        db.session.execute(insert(model), [dict(name=n, **(extra(n) if extra else {})) for n in missing])
+        ids.update(db.session.execute(select(model.name, model.id).where(model.name.in_(missing))).all())
+    return ids
+
+
+def seed(accounts=100_000, clients=5_000, providers=300, rng_seed=42, today=None, batch=BATCH, progress=None):
+    """
+    Crea `providers` proveedores, `clients` clientes y `accounts` cuentas.
+    Los catálogos se reutilizan si ya existen (mismos nombres); las cuentas
+    se añaden. Hace commit por lote y devuelve los totales creados.
+    """
+    rng = random.Random(rng_seed)
+    today = today or date.today()
+
+    provider_names = [f"Proveedor {i:03d}" for i in range(1, providers + 1)]
+    provider_ids = _ensure_named(Provider, provider_names)
+    pick_provider = _Picker(provider_names, _zipf_weights(providers), rng)
+
+    client_names = [f"Cliente {i:05d}" for i in range(1, clients + 1)]
+    client_provider = {n: pick_provider() for n in client_names}
+    client_ids = _ensure_named(Client, client_names,
+                               extra=lambda n: {"provider_id": provider_ids[client_provider[n]]})
+    db.session.commit()
+
+    pick_client = _Picker(client_names, _zipf_weights(clients, 0.9), rng)
+    pick_platform = _Picker([p for p, _ in PLATFORMS], [w for _, w in PLATFORMS], rng)
+
+    start = db.session.scalar(select(func.count(Account.id))) or 0
+    rows = []
+    created = 0
+    for n in range(start, start + accounts):
+        platform = pick_platform()
+        username = f"user{n:06d}@{DOMAINS[n % len(DOMAINS)]}"
+        client = pick_client() if rng.random() < 0.9 else None
+        # La mayoría comparte proveedor con su cliente
+        provider = client_provider[client] if client and rng.random() < 0.85 else pick_provider()
+
+        allocated = rng.choice(ALLOCATED)
+        end_date = None if rng.random() < 0.03 else today + timedelta(days=_end_offset(rng))
+        start_date = end_date - timedelta(days=allocated) if end_date else None
+        status_manual = "CAIDA" if rng.random() < 0.02 else None
+
+        rows.append({
+            "platform": platform,
+            "username": username,
+            "password": f"pw{rng.getrandbits(32):08x}",
+            "notes": None,
+            "start_date": start_date,
+            "end_date": end_date,
+            "time_allocated": allocated,
+            "provider_id": provider_ids[provider],
+            "client_id": client_ids[client] if client else None,
+            "status_manual": status_manual,
+            "status_bucket": compute_status_bucket(status_manual, end_date, today),
+            "search_text": search_document(platform, username, client, provider),
+        })
+        if len(rows) >= batch:
+            created += _flush(rows, progress, created)
+    if rows:
+        created += _flush(rows, progress, created)
+
+    return {"providers": len(provider_ids), "clients": len(client_ids), "accounts": created}
+
+
+def _flush(rows, progress, done):
+    db.session.execute(insert(Account.__table__), rows)
+    cache.mark_changed(db.session)
+    db.session.commit()
+    n = len(rows)
+    rows.clear()
+    if progress:
+        progress(done + n)
+    return n
+
+
+def sheet_rows(n, prefix="bulk", providers=300, clients=5_000, rng_seed=7, today=None):
+    """Filas para una hoja de importación (columnas de excel_io.COLUMNS)."""
+    rng = random.Random(rng_seed)
+    today = today or date.today()
+    pick_platform = _Picker([p for p, _ in PLATFORMS], [w for _, w in PLATFORMS], rng)
+    for i in range(n):
+        end_date = today + timedelta(days=_end_offset(rng))
+        allocated = rng.choice(ALLOCATED)
+        yield [
+            pick_platform(),
+            f"{prefix}{i:06d}@{DOMAINS[i % len(DOMAINS)]}",
+            f"pw{rng.getrandbits(32):08x}",
+            f"Proveedor {rng.randint(1, providers):03d}",
+            f"Cliente {rng.randint(1, clients):05d}",
+            (end_date - timedelta(days=allocated)).isoformat(),
+            end_date.isoformat(),
+            allocated,
+            None,
+        ]
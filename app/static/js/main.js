@@ -1 +1,100 @@
 // JS personalizado si lo necesitas
+
+// Autocompletado de selectores (proveedor, cliente, plataforma).
+// <input list="dl-x" data-lookup="/accounts/lookup/providers" data-target="provider_id">
+// Rellena el <datalist> con /lookup?q=prefijo y, si hay data-target, copia el id
+// de la opción elegida al input oculto con ese name.
+(function () {
+  function setup(input) {
+    const url = input.dataset.lookup;
+    const list = document.getElementById(input.getAttribute('list'));
+    const hidden = input.dataset.target && input.form
+      ? input.form.querySelector('input[name="' + input.dataset.target + '"]')
+      : null;
+    let timer = null;
+    let seq = 0;
+
+    function sync() {
+      if (!hidden) return;
+      const value = input.value.trim();
+      const match = Array.from(list.options).find(o => o.value === value);
+      hidden.value = match ? match.dataset.id : '';
+      input.classList.toggle('is-invalid', value !== '' && !match);
+    }
+
+    function load() {
+      const mine = ++seq;
+      const qs = new URLSearchParams({ q: input.value.trim(), limit: input.dataset.limit || 10 });
+      fetch(url + '?' + qs.toString(), { credentials: 'same-origin' })
+        .then(r => r.ok ? r.json() : [])
+        .then(items => {
+          if (mine !== seq) return;  // llegó tarde: hay una búsqueda más nueva
+          list.innerHTML = '';
+          items.forEach(it => {
+            const opt = document.createElement('option');
+            opt.value = it.name;
+            if (it.id !== undefined) opt.dataset.id = it.id;
+            list.appendChild(opt);
+          });
+          sync();
+        })
+        .catch(() => {});
+    }
+
+    input.addEventListener('input', () => {
+      if (hidden) hidden.value = '';
+      clearTimeout(timer);
+      timer = setTimeout(load, 200);
+    });
+    input.addEventListener('focus', () => { if (!list.options.length) load(); });
+  }
+
+  document.addEventListener('DOMContentLoaded', () => {
+    document.querySelectorAll('input[data-lookup]').forEach(setup);
+  });
+})();
+
+// Progreso de importaciones en segundo plano.
+// <div data-import-job="/accounts/import-jobs/7"> con [data-import-text],
+// [data-import-spinner] y [data-import-reload] dentro.
+(function () {
+  const LABELS = { queued: 'en cola', running: 'procesando', done: 'terminada', failed: 'falló' };
+
+  function describe(job) {
+    let text = LABELS[job.status] || job.status;
+    text += ' · ' + job.rows_processed + ' filas (' + job.inserted + ' nuevas, ' +
+      job.updated + ' actualizadas, ' + job.skipped + ' omitidas)';
+    if (job.rows_per_second) text += ' · ' + Math.round(job.rows_per_second) + ' filas/s';
+    if (job.error) text += ' · ' + job.error;
+    return text;
+  }
+
+  function watch(box) {
+    const url = box.dataset.importJob;
+    const text = box.querySelector('[data-import-text]');
+    const spinner = box.querySelector('[data-import-spinner]');
+    const reload = box.querySelector('[data-import-reload]');
+
+    function poll() {
+      fetch(url, { credentials: 'same-origin' })
+        .then(r => r.ok ? r.json() : Promise.reject(r.status))
+        .then(job => {
+          text.textContent = describe(job);
+          if (!job.finished) {
+            setTimeout(poll, 1500);
+            return;
+          }
+          if (spinner) spinner.remove();
+          if (reload) reload.classList.remove('d-none');
+          box.classList.remove('alert-info');
+          box.classList.add(job.status === 'done' ? 'alert-success' : 'alert-danger');
+        })
+        .catch(() => setTimeout(poll, 5000));
+    }
+    poll();
+  }
+
+  document.addEventListener('DOMContentLoaded', () => {
+    document.querySelectorAll('[data-import-job]').forEach(watch);
+  });
+})();
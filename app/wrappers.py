@@ -0,0 +1,21 @@
+from tempfile import SpooledTemporaryFile
+
+from flask import Request, current_app
+
+DEFAULT_SPOOL_MAX = 2 * 1024 * 1024
+
+
+class UploadRequest(Request):
+    """
+    Request que guarda los archivos subidos en memoria solo hasta
+    UPLOAD_SPOOL_MAX (2 MB por defecto) y a partir de ahí los pasa a un
+    temporal anónimo, nunca al volumen de datos. Con varios workers e hilos
+    en una VM pequeña, varias subidas a la vez no pueden llenar la RAM.
+    """
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        # max_size=0 en SpooledTemporaryFile significa "nunca pasar a disco"
+        max_size = current_app.config.get("UPLOAD_SPOOL_MAX") or 0
+        if max_size <= 0:
+            max_size = DEFAULT_SPOOL_MAX
+        return SpooledTemporaryFile(max_size=max_size, mode="rb+")
@@ -1,12 +1,33 @@
 import os
+import tempfile
 
 basedir = os.path.abspath(os.path.dirname(__file__))
 
 def _bool(key, default="0"):
     return os.environ.get(key, default) == "1"
 
+def _engine_options(uri):
+    """
+    Opciones del engine según el motor. Los PRAGMA de SQLite se aplican en
+    cada conexión nueva (app/engine.py); aquí va lo que acepta create_engine.
+    """
+    if uri.startswith("sqlite"):
+        # timeout de sqlite3 = espera ante "database is locked" (igual a busy_timeout)
+        return {"connect_args": {"timeout": int(os.environ.get("SQLITE_BUSY_TIMEOUT_MS", "5000")) / 1000}}
+    return {
+        "pool_size": int(os.environ.get("DB_POOL_SIZE", "5")),
+        "max_overflow": int(os.environ.get("DB_MAX_OVERFLOW", "5")),
+        "pool_timeout": int(os.environ.get("DB_POOL_TIMEOUT", "30")),
+        "pool_recycle": int(os.environ.get("DB_POOL_RECYCLE", "1800")),
+        "pool_pre_ping": _bool("DB_POOL_PRE_PING", "1"),
+    }
+
 class Config:
     SECRET_KEY = os.environ.get("SECRET_KEY", "dev-key-change-this")
+    # Las cookies de sesión no viajan en peticiones cruzadas de otros sitios
+    # (CSRF y sondeos tipo BREACH contra páginas comprimidas)
+    SESSION_COOKIE_SAMESITE = "Lax"
+    REMEMBER_COOKIE_SAMESITE = "Lax"
 
     # Dir persistente en Fly
     DATA_DIR = os.environ.get("DATA_DIR", os.path.join(basedir, "instance"))
@@ -20,22 +41,105 @@ class Config:
         SQLALCHEMY_DATABASE_URI = f"sqlite:///{os.path.join(DATA_DIR, 'app.sqlite')}"
 
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    SQLALCHEMY_ENGINE_OPTIONS = _engine_options(SQLALCHEMY_DATABASE_URI)
+
+    # Perfil SQLite (PRAGMA por conexión): WAL para que lectores y escritor no
+    # se bloqueen, fsync solo en checkpoints, espera ante bloqueos y caché/mmap.
+    SQLITE_PRAGMAS = _bool("SQLITE_PRAGMAS", "1")
+    SQLITE_JOURNAL_MODE = os.environ.get("SQLITE_JOURNAL_MODE", "WAL")
+    SQLITE_SYNCHRONOUS = os.environ.get("SQLITE_SYNCHRONOUS", "NORMAL")
+    SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+    SQLITE_MMAP_SIZE = int(os.environ.get("SQLITE_MMAP_SIZE_MB", "64")) * 1024 * 1024
+    SQLITE_CACHE_SIZE_KB = int(os.environ.get("SQLITE_CACHE_SIZE_KB", "16384"))
+
+    # Calentar BD y plantillas en segundo plano al arrancar (útil con scale-to-zero)
+    WARMUP_ON_BOOT = _bool("WARMUP_ON_BOOT", "1")
 
     ALLOW_REGISTRATION = _bool("ALLOW_REGISTRATION", "1")
     # Cargas subidas: en DATA_DIR para ser persistentes
     UPLOAD_FOLDER = os.path.join(DATA_DIR, "uploads")
     os.makedirs(UPLOAD_FOLDER, exist_ok=True)
-    MAX_CONTENT_LENGTH = 16 * 1024 * 1024
+    # Tamaño máximo de subida (MB); súbelo para hojas grandes o subidas chunked
+    MAX_CONTENT_LENGTH = int(os.environ.get("MAX_UPLOAD_MB", "16")) * 1024 * 1024
+    # Hasta cuántos bytes se mantiene una subida en memoria; el resto va a un temporal
+    UPLOAD_SPOOL_MAX = int(float(os.environ.get("UPLOAD_SPOOL_MAX_MB", "2")) * 1024 * 1024)
+
+    # Importaciones en segundo plano (services/jobs.py)
+    IMPORT_ASYNC = _bool("IMPORT_ASYNC", "1")            # 0 = se importa dentro de la petición
+    IMPORT_WORKERS = int(os.environ.get("IMPORT_WORKERS", "1"))
+    IMPORT_MAX_ACTIVE = int(os.environ.get("IMPORT_MAX_ACTIVE", "5"))
+    IMPORT_STALE_SECONDS = int(os.environ.get("IMPORT_STALE_SECONDS", "300"))
+    IMPORT_RESUME_ON_BOOT = _bool("IMPORT_RESUME_ON_BOOT", "1")
+    # Copia de la hoja mientras dura el job (se borra al terminar)
+    IMPORT_JOBS_FOLDER = os.path.join(DATA_DIR, "import_jobs")
+
+    # Instrumentación: Server-Timing, log de peticiones lentas y /metrics
+    REQUEST_TIMING = _bool("REQUEST_TIMING", "1")
+    SLOW_REQUEST_MS = int(os.environ.get("SLOW_REQUEST_MS", "1000"))  # 0 = sin log
+    # Fotos por worker para sumar en /metrics: en memoria (/dev/shm es tmpfs) y no
+    # en el volumen, para que un reinicio empiece de cero y no se mezclen arranques
+    METRICS_DIR = os.environ.get("METRICS_DIR", os.path.join(
+        "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir(), "accounts-manager-metrics"))
+    # /metrics exige "Authorization: Bearer <token>"; sin token la ruta responde 404
+    METRICS_TOKEN = os.environ.get("METRICS_TOKEN")
+
+    # Caché HTTP: ETag/304 en lista y dashboard, compresión y estáticos con huella
+    CONDITIONAL_GET = _bool("CONDITIONAL_GET", "1")
+    COMPRESS = _bool("COMPRESS", "1")
+    COMPRESS_MIN_SIZE = int(os.environ.get("COMPRESS_MIN_SIZE", "500"))   # bytes
+    COMPRESS_LEVEL = int(os.environ.get("COMPRESS_LEVEL", "6"))           # gzip 1-9
+    COMPRESS_BR_QUALITY = int(os.environ.get("COMPRESS_BR_QUALITY", "4")) # brotli 0-11 (si está instalado)
+    STATIC_MAX_AGE = int(os.environ.get("STATIC_MAX_AGE", str(365 * 24 * 3600)))
+    # Huella del despliegue para los ETag; por defecto, hash de plantillas y estáticos
+    BUILD_ID = os.environ.get("BUILD_ID")
+
+    # Usuario de la sesión cacheado en cada proceso (segundos; 0 = sin caché)
+    USER_CACHE_TTL = int(os.environ.get("USER_CACHE_TTL", "60"))
+    # Hashes de contraseña simultáneos por proceso y cuánto espera un login su turno
+    PASSWORD_HASH_CONCURRENCY = int(os.environ.get("PASSWORD_HASH_CONCURRENCY", "1"))
+    PASSWORD_HASH_WAIT_SECONDS = float(os.environ.get("PASSWORD_HASH_WAIT_SECONDS", "10"))
+
+    # API JSON (/api/v1): tamaño de página por defecto y máximo, y tope por lote
+    API_PAGE_SIZE = int(os.environ.get("API_PAGE_SIZE", "100"))
+    API_MAX_PAGE = int(os.environ.get("API_MAX_PAGE", "1000"))
+    API_MAX_BATCH = int(os.environ.get("API_MAX_BATCH", "5000"))
+    API_STREAM_BATCH = int(os.environ.get("API_STREAM_BATCH", "1000"))
+
+    # Segundos que se cachea el dashboard en cada proceso
+    DASHBOARD_CACHE_TTL = int(os.environ.get("DASHBOARD_CACHE_TTL", "30"))
+    # Mostrar el total de la lista de cuentas (COUNT cacheado por filtro)
+    ACCOUNTS_LIST_COUNT = _bool("ACCOUNTS_LIST_COUNT", "1")
 
     # --- Notificaciones (Pushover) ---
     ENABLE_SCHEDULER = _bool("ENABLE_SCHEDULER", "1")
     NOTIFY_WINDOW_DAYS = int(os.environ.get("NOTIFY_WINDOW_DAYS", "7"))
     NOTIFY_RUN_HOUR = int(os.environ.get("NOTIFY_RUN_HOUR", "9"))
+    # Liderazgo del scheduler en la BD: latido, vencimiento del lease y
+    # hasta cuánto tarde se recupera una ejecución perdida
+    SCHEDULER_HEARTBEAT_SECONDS = int(os.environ.get("SCHEDULER_HEARTBEAT_SECONDS", "30"))
+    SCHEDULER_LEASE_SECONDS = int(os.environ.get("SCHEDULER_LEASE_SECONDS", "90"))
+    SCHEDULER_MISFIRE_GRACE_SECONDS = int(os.environ.get("SCHEDULER_MISFIRE_GRACE_SECONDS", str(6 * 3600)))
 
     PUSHOVER_USER_KEY = os.environ.get("PUSHOVER_USER_KEY")
     PUSHOVER_API_TOKEN = os.environ.get("PUSHOVER_API_TOKEN")
+    # Transporte: endpoint (configurable para pruebas), concurrencia, ritmo y reintentos
+    PUSHOVER_API_URL = os.environ.get("PUSHOVER_API_URL", "https://api.pushover.net/1/messages.json")
+    PUSHOVER_TIMEOUT = float(os.environ.get("PUSHOVER_TIMEOUT", "15"))
+    PUSHOVER_CONCURRENCY = int(os.environ.get("PUSHOVER_CONCURRENCY", "2"))
+    PUSHOVER_MAX_PER_SECOND = float(os.environ.get("PUSHOVER_MAX_PER_SECOND", "2"))
+    PUSHOVER_MAX_RETRIES = int(os.environ.get("PUSHOVER_MAX_RETRIES", "3"))
+    PUSHOVER_BACKOFF_SECONDS = float(os.environ.get("PUSHOVER_BACKOFF_SECONDS", "0.5"))
+
+    # Resumen completo ("full") o solo cuentas nuevas/que vencen hoy ("delta", usa notification_log)
+    NOTIFY_MODE = os.environ.get("NOTIFY_MODE", "delta")
+    # En modo delta, enviar el resumen aunque no haya cuentas nuevas
+    NOTIFY_DELTA_SEND_EMPTY = _bool("NOTIFY_DELTA_SEND_EMPTY", "0")
 
     # Formato / límites
     NOTIFY_INCLUDE_PASSWORDS = _bool("NOTIFY_INCLUDE_PASSWORDS", "0")
     NOTIFY_MAX_ITEMS_PER_SECTION = int(os.environ.get("NOTIFY_MAX_ITEMS_PER_SECTION", "8"))
     NOTIFY_MESSAGE_CHAR_LIMIT = int(os.environ.get("NOTIFY_MESSAGE_CHAR_LIMIT", "1000"))
+
+    # Gráfico de resumen adjunto: "pillow" (liviano) o "matplotlib" (en subproceso)
+    NOTIFY_ATTACH_CHART = _bool("NOTIFY_ATTACH_CHART", "0")
+    NOTIFY_CHART_RENDERER = os.environ.get("NOTIFY_CHART_RENDERER", "pillow")
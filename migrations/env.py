@@ -51,6 +51,21 @@ def get_metadata():
     return target_db.metadata
 
 
+# Objetos creados con SQL crudo en e7a3c5b19f40 (tabla FTS5 y sus tablas
+# internas en SQLite, índice trigram en PostgreSQL). No están en los modelos:
+# sin este filtro el autogenerate propondría borrarlos.
+RAW_SQL_TABLES = ('account_fts',)
+RAW_SQL_INDEXES = ('ix_account_search_text_trgm',)
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    if type_ == 'table' and name and name.startswith(RAW_SQL_TABLES):
+        return False
+    if type_ == 'index' and name in RAW_SQL_INDEXES:
+        return False
+    return True
+
+
 def run_migrations_offline():
     """Run migrations in 'offline' mode.
 
@@ -65,7 +80,8 @@ def run_migrations_offline():
     """
     url = config.get_main_option("sqlalchemy.url")
     context.configure(
-        url=url, target_metadata=get_metadata(), literal_binds=True
+        url=url, target_metadata=get_metadata(), literal_binds=True,
+        include_object=include_object
     )
 
     with context.begin_transaction():
@@ -93,6 +109,7 @@ def run_migrations_online():
     conf_args = current_app.extensions['migrate'].configure_args
     if conf_args.get("process_revision_directives") is None:
         conf_args["process_revision_directives"] = process_revision_directives
+    conf_args.setdefault("include_object", include_object)
 
     connectable = get_engine()
 
@@ -0,0 +1,24 @@
+"""import_job mimetype column
+
+Revision ID: 2d5f8b1c9e07
+Revises: 0c6e9a4d8b21
+Create Date: 2026-10-18 22:05:13.401276
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2d5f8b1c9e07'
+down_revision = '0c6e9a4d8b21'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('import_job', sa.Column('mimetype', sa.String(length=100), nullable=True))
+
+
+def downgrade():
+    op.drop_column('import_job', 'mimetype')
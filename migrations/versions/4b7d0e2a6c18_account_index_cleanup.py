@@ -0,0 +1,31 @@
+"""account index cleanup
+
+Revision ID: 4b7d0e2a6c18
+Revises: 9c1e4f7a2b30
+Create Date: 2026-10-19 11:03:27.845190
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4b7d0e2a6c18'
+down_revision = '9c1e4f7a2b30'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # notify: ventana por end_date en orden (end_date, id), sin ordenar en memoria
+    op.create_index('ix_account_end_date_id', 'account', ['end_date', 'id'], unique=False)
+    # Sin uso: los filtros de estado van por status_bucket (8a52e7e2f081) y el
+    # orden de la lista/export por ix_account_list_order (9c1e4f7a2b30)
+    op.drop_index('ix_account_end_date_created_at', table_name='account')
+    op.drop_index('ix_account_status_manual_end_date', table_name='account')
+
+
+def downgrade():
+    op.create_index('ix_account_status_manual_end_date', 'account', ['status_manual', 'end_date'], unique=False)
+    op.create_index('ix_account_end_date_created_at', 'account', ['end_date', 'created_at'], unique=False)
+    op.drop_index('ix_account_end_date_id', table_name='account')
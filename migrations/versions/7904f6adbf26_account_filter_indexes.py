@@ -0,0 +1,35 @@
+"""account filter and sort indexes
+
+Revision ID: 7904f6adbf26
+Revises: 967cefbfcf70
+Create Date: 2026-10-18 11:20:04.512331
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7904f6adbf26'
+down_revision = '967cefbfcf70'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Filtros por estado: status_manual IS NULL / = 'CAIDA' + rango de end_date
+    op.create_index('ix_account_status_manual_end_date', 'account', ['status_manual', 'end_date'], unique=False)
+    # Orden de la lista (end_date, created_at) y ventanas de notify por end_date
+    op.create_index('ix_account_end_date_created_at', 'account', ['end_date', 'created_at'], unique=False)
+    # FKs (joins y borrados de cliente/proveedor)
+    op.create_index('ix_account_client_id', 'account', ['client_id'], unique=False)
+    op.create_index('ix_account_provider_id', 'account', ['provider_id'], unique=False)
+    op.create_index('ix_client_provider_id', 'client', ['provider_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_client_provider_id', table_name='client')
+    op.drop_index('ix_account_provider_id', table_name='account')
+    op.drop_index('ix_account_client_id', table_name='account')
+    op.drop_index('ix_account_end_date_created_at', table_name='account')
+    op.drop_index('ix_account_status_manual_end_date', table_name='account')
@@ -0,0 +1,46 @@
+"""account status_bucket column
+
+Revision ID: 8a52e7e2f081
+Revises: 7904f6adbf26
+Create Date: 2026-10-18 11:52:40.118207
+
+"""
+from datetime import date, timedelta
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8a52e7e2f081'
+down_revision = '7904f6adbf26'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('account', sa.Column('status_bucket', sa.String(length=10), nullable=True))
+    op.create_index('ix_account_status_bucket_end_date', 'account', ['status_bucket', 'end_date'], unique=False)
+
+    # Backfill con el mismo criterio que models.compute_status_bucket
+    account = sa.table(
+        'account',
+        sa.column('status_manual', sa.String),
+        sa.column('end_date', sa.Date),
+        sa.column('status_bucket', sa.String),
+    )
+    today = date.today()
+    op.execute(
+        account.update().values(status_bucket=sa.case(
+            (account.c.status_manual == 'CAIDA', 'down'),
+            (account.c.end_date.is_(None), 'nodate'),
+            (account.c.end_date < today, 'expired'),
+            (account.c.end_date <= today + timedelta(days=7), 'expiring'),
+            else_='active',
+        ))
+    )
+
+
+def downgrade():
+    op.drop_index('ix_account_status_bucket_end_date', table_name='account')
+    op.drop_column('account', 'status_bucket')
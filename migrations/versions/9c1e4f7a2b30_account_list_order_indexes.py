@@ -0,0 +1,34 @@
+"""account list order indexes
+
+Revision ID: 9c1e4f7a2b30
+Revises: 2d5f8b1c9e07
+Create Date: 2026-10-19 10:12:41.220517
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9c1e4f7a2b30'
+down_revision = '2d5f8b1c9e07'
+branch_labels = None
+depends_on = None
+
+# Mismo orden que models.LIST_ORDER (services/pagination.py), en SQLite y PostgreSQL
+LIST_ORDER = [
+    sa.text("coalesce(end_date, '9999-12-31')"),
+    sa.text("(created_at IS NULL)"),
+    sa.text("created_at DESC"),
+    sa.text("id DESC"),
+]
+
+
+def upgrade():
+    op.create_index('ix_account_list_order', 'account', LIST_ORDER, unique=False)
+    op.create_index('ix_account_status_list_order', 'account', [sa.text('status_bucket')] + LIST_ORDER, unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_account_status_list_order', table_name='account')
+    op.drop_index('ix_account_list_order', table_name='account')
@@ -0,0 +1,41 @@
+"""scheduler lease and scheduled job tables
+
+Revision ID: b41c07e9d3a2
+Revises: 5223ddde8955
+Create Date: 2026-10-18 15:21:47.903316
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b41c07e9d3a2'
+down_revision = '5223ddde8955'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('scheduler_lease',
+    sa.Column('name', sa.String(length=50), nullable=False),
+    sa.Column('holder', sa.String(length=120), nullable=False),
+    sa.Column('expires_at', sa.DateTime(), nullable=False),
+    sa.Column('heartbeat_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+    op.create_table('scheduled_job',
+    sa.Column('id', sa.String(length=50), nullable=False),
+    sa.Column('last_slot', sa.DateTime(), nullable=True),
+    sa.Column('last_started_at', sa.DateTime(), nullable=True),
+    sa.Column('last_finished_at', sa.DateTime(), nullable=True),
+    sa.Column('last_status', sa.String(length=10), nullable=True),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('last_holder', sa.String(length=120), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade():
+    op.drop_table('scheduled_job')
+    op.drop_table('scheduler_lease')
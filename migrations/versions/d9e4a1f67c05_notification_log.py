@@ -0,0 +1,33 @@
+"""notification_log table
+
+Revision ID: d9e4a1f67c05
+Revises: b41c07e9d3a2
+Create Date: 2026-10-18 16:02:33.571840
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd9e4a1f67c05'
+down_revision = 'b41c07e9d3a2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('notification_log',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('account_id', sa.Integer(), nullable=False),
+    sa.Column('end_date', sa.Date(), nullable=False),
+    sa.Column('section', sa.String(length=10), nullable=False),
+    sa.Column('notified_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['account_id'], ['account.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('account_id', 'end_date', name='uq_notification_log_account_end_date')
+    )
+
+
+def downgrade():
+    op.drop_table('notification_log')
@@ -0,0 +1,69 @@
+"""account search_text with FTS5 / pg_trgm index
+
+Revision ID: e7a3c5b19f40
+Revises: d9e4a1f67c05
+Create Date: 2026-10-18 16:48:09.226714
+
+"""
+import sqlite3
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e7a3c5b19f40'
+down_revision = 'd9e4a1f67c05'
+branch_labels = None
+depends_on = None
+
+
+FTS5_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS account_fts USING fts5("
+    "search_text, content='account', content_rowid='id', tokenize='trigram')",
+    "CREATE TRIGGER IF NOT EXISTS account_fts_ai AFTER INSERT ON account BEGIN "
+    "INSERT INTO account_fts(rowid, search_text) VALUES (new.id, new.search_text); END",
+    "CREATE TRIGGER IF NOT EXISTS account_fts_ad AFTER DELETE ON account BEGIN "
+    "INSERT INTO account_fts(account_fts, rowid, search_text) VALUES ('delete', old.id, old.search_text); END",
+    "CREATE TRIGGER IF NOT EXISTS account_fts_au AFTER UPDATE OF search_text ON account BEGIN "
+    "INSERT INTO account_fts(account_fts, rowid, search_text) VALUES ('delete', old.id, old.search_text); "
+    "INSERT INTO account_fts(rowid, search_text) VALUES (new.id, new.search_text); END",
+)
+
+
+def upgrade():
+    op.add_column('account', sa.Column('search_text', sa.Text(), nullable=True))
+
+    # Backfill con el mismo documento que models.search_document
+    bind = op.get_bind()
+    rows = bind.execute(sa.text(
+        "SELECT a.id, a.platform, a.username, c.name, p.name FROM account a "
+        "LEFT JOIN client c ON c.id = a.client_id LEFT JOIN provider p ON p.id = a.provider_id"
+    )).all()
+    docs = [
+        {"_id": id_, "_doc": " ".join(x.strip() for x in parts if x and x.strip()).lower() or None}
+        for id_, *parts in rows
+    ]
+    for i in range(0, len(docs), 1000):
+        bind.execute(sa.text("UPDATE account SET search_text = :_doc WHERE id = :_id"), docs[i:i + 1000])
+
+    dialect = bind.dialect.name
+    if dialect == 'sqlite' and sqlite3.sqlite_version_info >= (3, 34):
+        for stmt in FTS5_DDL:
+            op.execute(stmt)
+        op.execute("INSERT INTO account_fts(account_fts) VALUES ('rebuild')")
+    elif dialect == 'postgresql':
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        op.execute("CREATE INDEX IF NOT EXISTS ix_account_search_text_trgm ON account USING gin (search_text gin_trgm_ops)")
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        for name in ('account_fts_ai', 'account_fts_ad', 'account_fts_au'):
+            op.execute(f"DROP TRIGGER IF EXISTS {name}")
+        op.execute("DROP TABLE IF EXISTS account_fts")
+    elif dialect == 'postgresql':
+        op.execute("DROP INDEX IF EXISTS ix_account_search_text_trgm")
+    with op.batch_alter_table('account', schema=None) as batch_op:
+        batch_op.drop_column('search_text')
@@ -0,0 +1,32 @@
+"""data_version table
+
+Revision ID: f3b8d2c6a715
+Revises: e7a3c5b19f40
+Create Date: 2026-10-18 19:41:07.204518
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3b8d2c6a715'
+down_revision = 'e7a3c5b19f40'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    data_version = op.create_table('data_version',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('version', sa.BigInteger(), nullable=False),
+    sa.Column('changed_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.execute(
+        data_version.insert().values(id=1, version=0, changed_at=sa.func.current_timestamp())
+    )
+
+
+def downgrade():
+    op.drop_table('data_version')
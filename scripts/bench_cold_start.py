@@ -0,0 +1,100 @@
+"""
+Mide el arranque en frío de wsgi:app: importación en un intérprete nuevo y
+tiempo hasta la primera respuesta HTTP bajo gunicorn.
+
+    python scripts/bench_cold_start.py --runs 5 --out cold_start.json
+
+Usa un DATA_DIR temporal (SQLite vacía) salvo que se pase --data-dir.
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def measure_import(env):
+    code = "import time; t = time.perf_counter(); import wsgi; print(time.perf_counter() - t)"
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env,
+                         capture_output=True, text=True, check=True)
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def measure_first_response(env, path, timeout):
+    port = _free_port()
+    cmd = [sys.executable, "-m", "gunicorn", "wsgi:app", "--workers", "1",
+           "--bind", f"127.0.0.1:{port}", "--log-level", "warning"]
+    started = time.perf_counter()
+    proc = subprocess.Popen(cmd, cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    try:
+        url = f"http://127.0.0.1:{port}{path}"
+        while time.perf_counter() - started < timeout:
+            if proc.poll() is not None:
+                raise RuntimeError("gunicorn terminó antes de responder:\n" + proc.stderr.read().decode())
+            try:
+                with urllib.request.urlopen(url, timeout=2) as resp:
+                    resp.read()
+                return time.perf_counter() - started
+            except (urllib.error.URLError, ConnectionError):
+                time.sleep(0.01)
+        raise TimeoutError(f"Sin respuesta en {timeout}s")
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+
+
+def _summary(values):
+    return {
+        "runs": [round(v, 4) for v in values],
+        "min": round(min(values), 4),
+        "median": round(statistics.median(values), 4),
+        "max": round(max(values), 4),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--path", default="/login", help="ruta a pedir (sin login)")
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument("--data-dir", default=None)
+    parser.add_argument("--out", default=None, help="archivo JSON de salida (por defecto stdout)")
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    env["DATA_DIR"] = args.data_dir or tempfile.mkdtemp(prefix="cold-start-")
+    env.setdefault("ENABLE_SCHEDULER", "0")
+
+    imports = [measure_import(env) for _ in range(args.runs)]
+    first = [measure_first_response(env, args.path, args.timeout) for _ in range(args.runs)]
+
+    result = {
+        "benchmark": "cold_start",
+        "python": sys.version.split()[0],
+        "path": args.path,
+        "import_seconds": _summary(imports),
+        "first_response_seconds": _summary(first),
+    }
+    text = json.dumps(result, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text + "\n")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+"""
+Mide el rendimiento de escritura concurrente sobre SQLite con y sin el
+perfil de conexión (WAL, synchronous=NORMAL, busy_timeout, mmap, cache).
+
+Cada escritor es un proceso aparte (como los workers de gunicorn) que crea
+cuentas por el ORM en transacciones cortas; en paralelo, lectores consultan
+la primera página de la lista.
+
+    python scripts/bench_sqlite_writers.py --writers 1,2,4,8 --seconds 5 --out writers.json
+
+Perfiles: "tuned" (config por defecto) y "default" (SQLITE_PRAGMAS=0, el
+comportamiento de SQLite sin tocar).
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROFILES = {
+    "tuned": {"SQLITE_PRAGMAS": "1"},
+    "default": {"SQLITE_PRAGMAS": "0"},
+}
+
+
+def _boot(env):
+    os.environ.update(env)
+    sys.path.insert(0, ROOT)
+    from app import create_app
+    return create_app()
+
+
+def _setup(env):
+    app = _boot(env)
+    from sqlalchemy import text
+    from app.extensions import db
+
+    with app.app_context():
+        db.create_all()
+        mode = db.session.execute(text("PRAGMA journal_mode")).scalar()
+        db.session.remove()
+    return mode
+
+
+def _wait(start_at):
+    delay = start_at - time.time()
+    if delay > 0:
+        time.sleep(delay)
+
+
+def _writer(env, start_at, deadline, rows_per_tx, wid, out):
+    app = _boot(env)
+    from app.extensions import db
+    from app.models import Account
+
+    commits = errors = 0
+    latencies = []
+    _wait(start_at)
+    with app.app_context():
+        i = 0
+        while time.time() < deadline:
+            started = time.perf_counter()
+            try:
+                for _ in range(rows_per_tx):
+                    db.session.add(Account(platform="Bench", username=f"w{wid}-{i}@bench.local"))
+                    i += 1
+                db.session.commit()
+                commits += 1
+                latencies.append(time.perf_counter() - started)
+            except Exception:
+                db.session.rollback()
+                errors += 1
+        db.session.remove()
+    out.put({"kind": "writer", "commits": commits, "errors": errors, "latencies": latencies})
+
+
+def _reader(env, start_at, deadline, out):
+    app = _boot(env)
+    from app.extensions import db
+    from app.models import Account
+    from app.services.pagination import order_forward
+
+    reads = errors = 0
+    _wait(start_at)
+    with app.app_context():
+        while time.time() < deadline:
+            try:
+                Account.query.order_by(*order_forward()).limit(10).all()
+                db.session.commit()
+                reads += 1
+            except Exception:
+                db.session.rollback()
+                errors += 1
+        db.session.remove()
+    out.put({"kind": "reader", "reads": reads, "errors": errors})
+
+
+def _pct(values, p):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(int(len(values) * p), len(values) - 1)]
+
+
+def run(profile, writers, readers, seconds, rows_per_tx):
+    ctx = multiprocessing.get_context("spawn")
+    env = {
+        "DATA_DIR": tempfile.mkdtemp(prefix="bench-writers-"),
+        "ENABLE_SCHEDULER": "0",
+        "WARMUP_ON_BOOT": "0",
+        "IMPORT_RESUME_ON_BOOT": "0",
+        **PROFILES[profile],
+    }
+    env.pop("DATABASE_URL", None)
+    os.environ.pop("DATABASE_URL", None)
+
+    with ctx.Pool(1) as pool:
+        journal_mode = pool.apply(_setup, (env,))
+
+    out = ctx.Queue()
+    # Todos empiezan a la vez, con margen para que los procesos arranquen
+    start_at = time.time() + 3
+    deadline = start_at + seconds
+    procs = [ctx.Process(target=_writer, args=(env, start_at, deadline, rows_per_tx, w, out))
+             for w in range(writers)]
+    procs += [ctx.Process(target=_reader, args=(env, start_at, deadline, out)) for _ in range(readers)]
+    for p in procs:
+        p.start()
+    results = [out.get() for _ in procs]
+    for p in procs:
+        p.join()
+
+    w = [r for r in results if r["kind"] == "writer"]
+    r = [r for r in results if r["kind"] == "reader"]
+    latencies = [x for item in w for x in item["latencies"]]
+    commits = sum(item["commits"] for item in w)
+    return {
+        "profile": profile,
+        "journal_mode": journal_mode,
+        "writers": writers,
+        "readers": readers,
+        "rows_per_tx": rows_per_tx,
+        "commits": commits,
+        "commits_per_second": round(commits / seconds, 1),
+        "rows_per_second": round(commits * rows_per_tx / seconds, 1),
+        "write_errors": sum(item["errors"] for item in w),
+        "commit_p50_ms": round(_pct(latencies, 0.50) * 1000, 2) if latencies else None,
+        "commit_p95_ms": round(_pct(latencies, 0.95) * 1000, 2) if latencies else None,
+        "reads_per_second": round(sum(item["reads"] for item in r) / seconds, 1),
+        "read_errors": sum(item["errors"] for item in r),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--writers", default="1,2,4,8", help="cantidades de escritores, separadas por coma")
+    parser.add_argument("--readers", type=int, default=2)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--rows-per-tx", type=int, default=1)
+    parser.add_argument("--profiles", default="default,tuned")
+    parser.add_argument("--out", default=None, help="archivo JSON de salida (por defecto stdout)")
+    args = parser.parse_args()
+
+    results = []
+    for profile in args.profiles.split(","):
+        for writers in (int(n) for n in args.writers.split(",")):
+            results.append(run(profile.strip(), writers, args.readers, args.seconds, args.rows_per_tx))
+            print(json.dumps(results[-1]), file=sys.stderr)
+
+    text = json.dumps({
+        "benchmark": "sqlite_writers",
+        "python": sys.version.split()[0],
+        "seconds": args.seconds,
+        "results": results,
+    }, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text + "\n")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+"""
+Benchmarks de las rutas y servicios que más pesan, sobre un dataset
+sintético (services/synthetic.py) en una SQLite temporal:
+
+- accounts.index con cada filtro de estado, de plataforma y de búsqueda
+- export_accounts (csv y xlsx, leyendo el cuerpo entero)
+- upload_excel con una hoja generada (importación en línea)
+- core.dashboard
+- build_pushover_messages (full y delta, sin enviar nada)
+
+    python scripts/bench_suite.py --accounts 100000 --repeat 5 --out bench.json
+    python scripts/bench_suite.py --data-dir /tmp/bench --skip-seed   # reutiliza la BD
+
+Las cachés por proceso se vacían antes de cada repetición, así que se mide
+el trabajo de la ruta y no un acierto de caché. Cada caso guarda min, mediana,
+p95 y media en ms, y las sentencias SQL de la cabecera Server-Timing.
+"""
+import argparse
+import io
+import json
+import os
+import platform as _platform
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ADMIN = {"email": "bench@bench.local", "name": "Bench", "password": "bench"}
+
+
+def _boot(data_dir):
+    os.environ.update({
+        "DATA_DIR": data_dir,
+        "ENABLE_SCHEDULER": "0",
+        "WARMUP_ON_BOOT": "0",
+        "IMPORT_RESUME_ON_BOOT": "0",
+        "IMPORT_ASYNC": "0",
+        "SLOW_REQUEST_MS": "0",
+    })
+    os.environ.pop("DATABASE_URL", None)
+    sys.path.insert(0, ROOT)
+    from app import create_app
+    app = create_app()
+    app.config.update(WTF_CSRF_ENABLED=False)
+    return app
+
+
+def _git_rev():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _pct(values, p):
+    values = sorted(values)
+    return values[min(int(len(values) * p), len(values) - 1)]
+
+
+def _sql_count(resp):
+    m = re.search(r'desc="(\d+) queries"', resp.headers.get("Server-Timing", ""))
+    return int(m.group(1)) if m else None
+
+
+class Suite:
+    def __init__(self, app, repeat, warmup):
+        self.app = app
+        self.repeat = repeat
+        self.warmup = warmup
+        self.results = []
+
+    def _reset_caches(self):
+        from app.services import cache
+        cache.clear()
+
+    def measure(self, name, fn, **params):
+        """fn() hace una corrida y devuelve (respuesta|None, extras)."""
+        for _ in range(self.warmup):
+            self._reset_caches()
+            fn()
+        times, sql = [], None
+        extra = {}
+        for _ in range(self.repeat):
+            self._reset_caches()
+            started = time.perf_counter()
+            resp, extra = fn()
+            times.append(time.perf_counter() - started)
+            if resp is not None:
+                if resp.status_code >= 400:
+                    raise RuntimeError(f"{name}: HTTP {resp.status_code}")
+                sql = _sql_count(resp)
+        ms = [t * 1000 for t in times]
+        result = {
+            "name": name,
+            "params": params,
+            "runs": len(ms),
+            "min_ms": round(min(ms), 2),
+            "median_ms": round(statistics.median(ms), 2),
+            "p95_ms": round(_pct(ms, 0.95), 2),
+            "mean_ms": round(statistics.fmean(ms), 2),
+            "sql_statements": sql,
+            **extra,
+        }
+        self.results.append(result)
+        print(f"{name:<34} {json.dumps(params, ensure_ascii=False):<40} "
+              f"median {result['median_ms']:>9.2f} ms  p95 {result['p95_ms']:>9.2f} ms", file=sys.stderr)
+        return result
+
+
+def _get(client, url):
+    def run():
+        resp = client.get(url)
+        resp.get_data()
+        return resp, {}
+    return run
+
+
+def run_suite(app, args):
+    from app.extensions import db
+    from app.models import SOON_DAYS, User
+    from app.security import hash_password
+    from app.services import excel_io, synthetic
+    from app.services.filters import BUCKETS
+    from app.services.notify import build_pushover_messages
+
+    client = app.test_client()
+    with app.app_context():
+        if not db.session.scalar(db.select(User.id).where(User.email == ADMIN["email"])):
+            db.session.add(User(email=ADMIN["email"], name=ADMIN["name"], is_admin=True,
+                                password_hash=hash_password(ADMIN["password"])))
+            db.session.commit()
+        db.session.remove()
+    client.post("/login", data={"email": ADMIN["email"], "password": ADMIN["password"]})
+
+    suite = Suite(app, args.repeat, args.warmup)
+
+    # --- accounts.index ---
+    suite.measure("accounts.index", _get(client, "/accounts/"), status="all")
+    for status in BUCKETS:
+        suite.measure("accounts.index", _get(client, f"/accounts/?status={status}"), status=status)
+    for name, _ in synthetic.PLATFORMS[:1] + synthetic.PLATFORMS[-1:]:
+        suite.measure("accounts.index", _get(client, f"/accounts/?platform={name}"), platform=name)
+    for q in ("cliente 00001", "user0001", "proveedor 2", "zz-no-match", "ne"):
+        suite.measure("accounts.index", _get(client, f"/accounts/?q={q}"), q=q)
+    suite.measure("accounts.index", _get(client, "/accounts/?status=expiring&platform=Netflix&q=gmail"),
+                  status="expiring", platform="Netflix", q="gmail")
+
+    # --- core.dashboard ---
+    suite.measure("core.dashboard", _get(client, "/"))
+
+    # --- export_accounts ---
+    for fmt in ("csv", "xlsx"):
+        def export(fmt=fmt):
+            resp = client.get(f"/accounts/export?format={fmt}")
+            body = resp.get_data()
+            return resp, {"bytes": len(body)}
+        suite.measure("accounts.export_accounts", export, format=fmt)
+    suite.measure("accounts.export_accounts", _get(client, "/accounts/export?format=csv&status=expiring"),
+                  format="csv", status="expiring")
+
+    # --- build_pushover_messages ---
+    for mode in ("full", "delta"):
+        def build(mode=mode):
+            with app.app_context():
+                messages = build_pushover_messages(date.today(), SOON_DAYS, app.config, mode=mode)
+                db.session.remove()
+            return None, {"messages": len(messages)}
+        suite.measure("notify.build_pushover_messages", build, mode=mode)
+
+    # --- upload_excel (al final: agrega cuentas) ---
+    # Una hoja por corrida (usuarios distintos), generada fuera del tiempo medido
+    sheets = iter([
+        b"".join(excel_io.iter_xlsx(excel_io.COLUMNS, synthetic.sheet_rows(
+            args.upload_rows, prefix=f"bench{i}-", providers=args.providers, clients=args.clients)))
+        for i in range(args.warmup + args.repeat)
+    ])
+
+    def upload():
+        sheet = next(sheets)
+        resp = client.post("/accounts/upload-excel", data={
+            "mode": "insert",
+            "file": (io.BytesIO(sheet), "bench.xlsx"),
+        }, content_type="multipart/form-data")
+        return resp, {"rows": args.upload_rows}
+    suite.measure("accounts.upload_excel", upload, rows=args.upload_rows, mode="insert")
+
+    return suite.results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--accounts", type=int, default=100_000)
+    parser.add_argument("--clients", type=int, default=5_000)
+    parser.add_argument("--providers", type=int, default=300)
+    parser.add_argument("--upload-rows", type=int, default=5_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--data-dir", default=None, help="DATA_DIR de la BD (por defecto, uno temporal)")
+    parser.add_argument("--skip-seed", action="store_true", help="usar la BD de --data-dir tal cual")
+    parser.add_argument("--out", default=None, help="archivo JSON de salida (por defecto stdout)")
+    args = parser.parse_args()
+
+    app = _boot(args.data_dir or tempfile.mkdtemp(prefix="bench-suite-"))
+
+    from sqlalchemy import func, select
+    from app.extensions import db
+    from app.models import Account
+    from app.services import synthetic
+
+    seed_seconds = None
+    with app.app_context():
+        db.create_all()
+        if not args.skip_seed:
+            started = time.perf_counter()
+            synthetic.seed(accounts=args.accounts, clients=args.clients, providers=args.providers)
+            seed_seconds = round(time.perf_counter() - started, 2)
+            print(f"Dataset sembrado en {seed_seconds} s", file=sys.stderr)
+        total_accounts = db.session.scalar(select(func.count(Account.id)))
+        db.session.remove()
+
+    results = run_suite(app, args)
+
+    import sqlite3
+    text = json.dumps({
+        "benchmark": "suite",
+        "git_rev": _git_rev(),
+        "python": sys.version.split()[0],
+        "sqlite": sqlite3.sqlite_version,
+        "machine": _platform.machine(),
+        "cpus": os.cpu_count(),
+        "dataset": {
+            "accounts": total_accounts,
+            "clients": args.clients,
+            "providers": args.providers,
+            "seed_seconds": seed_seconds,
+        },
+        "repeat": args.repeat,
+        "results": results,
+    }, indent=2, ensure_ascii=False)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text + "\n")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
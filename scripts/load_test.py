@@ -0,0 +1,389 @@
+"""
+Prueba de carga de punta a punta: arranca wsgi:app bajo gunicorn (por
+defecto con la configuración del Dockerfile, --workers 2 --threads 4) sobre
+una SQLite sembrada con `services/synthetic.py`, inicia sesión desde N
+clientes concurrentes y reproduce una mezcla de peticiones:
+
+    list      /accounts/ con estado/plataforma al azar
+    search    /accounts/?q=...
+    edit      POST /accounts/<id>/edit
+    bulk      POST /accounts/bulk-action (extend_days / clear_status sobre ~20 ids)
+    export    /accounts/export?format=csv de un estado
+    dashboard /
+
+    python scripts/load_test.py --clients 32 --duration 60 --mix list=50,search=25,edit=10,bulk=5,export=5,dashboard=5
+    python scripts/load_test.py --workers 4 --threads 2 --accounts 100000 --out load.json
+    python scripts/load_test.py --url https://staging.example --email ... --password ...   # servidor existente
+
+Informa, por ruta y en total: peticiones, peticiones/s, latencia p50/p95/p99
+y tasa de errores (HTTP >= 400, redirección al login o fallo de conexión),
+además de cuántos "database is locked" y tracebacks dejó el log de gunicorn.
+
+Los clientes son hilos de este proceso: con muchas conexiones o poca CPU,
+lanza la prueba desde otra máquina (--url) para no competir con el servidor.
+"""
+import argparse
+import json
+import os
+import random
+import re
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from datetime import date, timedelta
+
+import requests
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+USER = {"email": "load@load.local", "name": "Load", "password": "load"}
+DEFAULT_MIX = "list=50,search=25,edit=10,bulk=5,export=5,dashboard=5"
+SEARCH_TERMS = ["netflix", "gmail", "cliente 000", "proveedor 01", "user00", "hotmail", "disney", "zz", "max"]
+STATUSES = ["all", "active", "expiring", "expired", "nodate", "down"]
+
+
+# ---------- servidor ----------
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _server_env(args, data_dir):
+    env = dict(os.environ)
+    env.update({
+        "DATA_DIR": data_dir,
+        "METRICS_DIR": os.path.join(data_dir, "metrics"),
+        "ENABLE_SCHEDULER": "1" if args.scheduler else "0",
+        "PYTHONUNBUFFERED": "1",
+    })
+    env.pop("DATABASE_URL", None)
+    return env
+
+
+def prepare_database(args, data_dir):
+    """Crea el esquema, siembra (salvo --skip-seed) y el usuario de la prueba."""
+    os.environ.update(_server_env(args, data_dir), ENABLE_SCHEDULER="0", WARMUP_ON_BOOT="0",
+                      IMPORT_RESUME_ON_BOOT="0")
+    sys.path.insert(0, ROOT)
+    from sqlalchemy import func, select
+    from app import create_app
+    from app.extensions import db
+    from app.models import Account, Client, Provider, User
+    from app.security import hash_password
+    from app.services import synthetic
+
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        if not args.skip_seed:
+            started = time.perf_counter()
+            synthetic.seed(accounts=args.accounts, clients=args.clients_catalog, providers=args.providers)
+            print(f"Dataset sembrado en {time.perf_counter() - started:.1f} s", file=sys.stderr)
+        if not db.session.scalar(select(User.id).where(User.email == USER["email"])):
+            db.session.add(User(email=USER["email"], name=USER["name"], is_admin=True,
+                                password_hash=hash_password(USER["password"])))
+            db.session.commit()
+        ids = {
+            "account": db.session.execute(select(func.min(Account.id), func.max(Account.id))).one(),
+            "client": db.session.execute(select(func.min(Client.id), func.max(Client.id))).one(),
+            "provider": db.session.execute(select(func.min(Provider.id), func.max(Provider.id))).one(),
+        }
+        db.session.remove()
+        db.engine.dispose()
+    return ids
+
+
+def start_gunicorn(args, data_dir):
+    port = _free_port()
+    log_path = os.path.join(data_dir, "gunicorn.log")
+    cmd = [sys.executable, "-m", "gunicorn", "wsgi:app",
+           "--workers", str(args.workers), "--threads", str(args.threads),
+           "--timeout", "120", "--bind", f"127.0.0.1:{port}"]
+    log = open(log_path, "w")
+    proc = subprocess.Popen(cmd, cwd=ROOT, env=_server_env(args, data_dir), stdout=log, stderr=subprocess.STDOUT)
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            log.close()
+            with open(log_path) as f:
+                raise RuntimeError("gunicorn terminó al arrancar:\n" + f.read())
+        try:
+            if requests.get(f"{url}/login", timeout=2).status_code == 200:
+                return proc, url, log, log_path
+        except requests.RequestException:
+            time.sleep(0.1)
+    proc.terminate()
+    raise TimeoutError("gunicorn no respondió en 60 s")
+
+
+def stop_gunicorn(proc, log):
+    proc.terminate()
+    try:
+        proc.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+    log.close()
+
+
+def scan_log(path):
+    with open(path, errors="replace") as f:
+        text = f.read()
+    return {
+        "database_locked": len(re.findall(r"database is locked", text)),
+        "tracebacks": text.count("Traceback (most recent call last)"),
+        "slow_requests": text.count("Petición lenta"),
+        "worker_timeouts": text.count("WORKER TIMEOUT"),
+    }
+
+
+# ---------- clientes ----------
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in ACTIONS:
+            raise SystemExit(f"Acción desconocida en --mix: {name} (válidas: {', '.join(ACTIONS)})")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def _rand_id(rng, bounds):
+    lo, hi = bounds
+    return rng.randint(lo, hi) if lo is not None else None
+
+
+def act_list(s, url, rng, ids):
+    params = {"status": rng.choice(STATUSES)}
+    if rng.random() < 0.3:
+        params["platform"] = rng.choice(["Netflix", "Disney+", "Max", "Spotify"])
+    return s.get(f"{url}/accounts/", params=params)
+
+
+def act_search(s, url, rng, ids):
+    return s.get(f"{url}/accounts/", params={"q": rng.choice(SEARCH_TERMS)})
+
+
+def act_edit(s, url, rng, ids):
+    account_id = _rand_id(rng, ids["account"])
+    end = date.today() + timedelta(days=rng.randint(-10, 60))
+    return s.post(f"{url}/accounts/{account_id}/edit", data={
+        "platform": rng.choice(["Netflix", "Disney+", "Max", "Spotify"]),
+        "username": f"user{account_id:06d}@load.test",
+        "password": f"pw{rng.getrandbits(24):06x}",
+        "client_id": _rand_id(rng, ids["client"]) or "",
+        "provider_id": _rand_id(rng, ids["provider"]) or "",
+        "start_date": (end - timedelta(days=30)).isoformat(),
+        "end_date": end.isoformat(),
+        "time_allocated": "30",
+        "notes": "",
+        "status_manual": "",
+    }, allow_redirects=False)
+
+
+def act_bulk(s, url, rng, ids):
+    selected = [str(_rand_id(rng, ids["account"])) for _ in range(20)]
+    action = rng.choice(["extend_days", "clear_status"])
+    return s.post(f"{url}/accounts/bulk-action", data={
+        "action": action, "scope": "selected", "selected": selected, "days": "1",
+    }, allow_redirects=False)
+
+
+def act_export(s, url, rng, ids):
+    return s.get(f"{url}/accounts/export", params={
+        "format": "csv", "status": rng.choice(["expiring", "expired", "down", "nodate"]),
+    }, stream=True)
+
+
+def act_dashboard(s, url, rng, ids):
+    return s.get(f"{url}/")
+
+
+ACTIONS = {
+    "list": act_list,
+    "search": act_search,
+    "edit": act_edit,
+    "bulk": act_bulk,
+    "export": act_export,
+    "dashboard": act_dashboard,
+}
+
+
+def login(url, email, password):
+    s = requests.Session()
+    resp = s.post(f"{url}/login", data={"email": email, "password": password}, allow_redirects=False)
+    if resp.status_code != 302 or "/login" in resp.headers.get("Location", ""):
+        raise RuntimeError(f"No se pudo iniciar sesión como {email} (HTTP {resp.status_code})")
+    return s
+
+
+def _is_error(resp):
+    if resp.status_code >= 400:
+        return True
+    # Sesión perdida: Flask-Login redirige al login
+    return resp.is_redirect and "/login" in resp.headers.get("Location", "")
+
+
+def client_loop(cid, url, args, ids, mix, measure_from, deadline, samples, lock):
+    rng = random.Random(args.seed + cid)
+    names, weights = list(mix), list(mix.values())
+    local = []
+    try:
+        s = login(url, args.email, args.password)
+    except (RuntimeError, requests.RequestException) as e:
+        print(f"cliente {cid}: {e}", file=sys.stderr)
+        with lock:
+            samples.append(("login", 0.0, type(e).__name__))
+        return
+    while time.time() < deadline:
+        name = rng.choices(names, weights)[0]
+        started = time.perf_counter()
+        error = None
+        try:
+            resp = ACTIONS[name](s, url, rng, ids)
+            for _ in resp.iter_content(64 * 1024):
+                pass
+            if _is_error(resp):
+                error = f"HTTP {resp.status_code}"
+        except requests.RequestException as e:
+            error = type(e).__name__
+        elapsed = time.perf_counter() - started
+        if time.time() >= measure_from:
+            local.append((name, elapsed, error))
+        if args.think_ms:
+            time.sleep(rng.uniform(0, 2 * args.think_ms) / 1000)
+    with lock:
+        samples.extend(local)
+
+
+def _pct(values, p):
+    values = sorted(values)
+    return values[min(int(len(values) * p), len(values) - 1)]
+
+
+def _summary(rows, seconds):
+    lat = [e * 1000 for _, e, _ in rows]
+    errors = defaultdict(int)
+    for _, _, err in rows:
+        if err:
+            errors[err] += 1
+    n = len(rows)
+    return {
+        "requests": n,
+        "rps": round(n / seconds, 2),
+        "p50_ms": round(_pct(lat, 0.50), 2) if lat else None,
+        "p95_ms": round(_pct(lat, 0.95), 2) if lat else None,
+        "p99_ms": round(_pct(lat, 0.99), 2) if lat else None,
+        "mean_ms": round(statistics.fmean(lat), 2) if lat else None,
+        "max_ms": round(max(lat), 2) if lat else None,
+        "error_rate": round(sum(errors.values()) / n, 4) if n else 0.0,
+        "errors": dict(errors),
+    }
+
+
+def run_load(url, args, ids, mix):
+    samples, lock = [], threading.Lock()
+    start = time.time()
+    measure_from = start + args.warmup
+    deadline = measure_from + args.duration
+    threads = []
+    for cid in range(args.clients):
+        t = threading.Thread(target=client_loop, name=f"client-{cid}",
+                             args=(cid, url, args, ids, mix, measure_from, deadline, samples, lock))
+        t.start()
+        threads.append(t)
+        if args.ramp:
+            time.sleep(args.ramp / args.clients)
+    for t in threads:
+        t.join()
+
+    by_route = defaultdict(list)
+    for row in samples:
+        by_route[row[0]].append(row)
+    return {
+        "total": _summary(samples, args.duration),
+        "routes": {name: _summary(rows, args.duration) for name, rows in sorted(by_route.items())},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default=None, help="servidor ya levantado (no arranca gunicorn ni siembra)")
+    parser.add_argument("--email", default=USER["email"])
+    parser.add_argument("--password", default=USER["password"])
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--no-scheduler", dest="scheduler", action="store_false",
+                        help="arranca gunicorn con ENABLE_SCHEDULER=0")
+    parser.add_argument("--clients", type=int, default=16, help="clientes concurrentes")
+    parser.add_argument("--duration", type=float, default=30, help="segundos medidos")
+    parser.add_argument("--warmup", type=float, default=5, help="segundos iniciales que no cuentan")
+    parser.add_argument("--ramp", type=float, default=2, help="segundos para arrancar todos los clientes")
+    parser.add_argument("--think-ms", type=float, default=0, help="pausa media entre peticiones de un cliente")
+    parser.add_argument("--mix", default=DEFAULT_MIX)
+    parser.add_argument("--accounts", type=int, default=20_000)
+    parser.add_argument("--clients-catalog", type=int, default=1_000, help="clientes del dataset")
+    parser.add_argument("--providers", type=int, default=100)
+    parser.add_argument("--data-dir", default=None)
+    parser.add_argument("--skip-seed", action="store_true")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--account-ids", default=None, help="rango min:max de ids para edit/bulk con --url")
+    parser.add_argument("--out", default=None, help="archivo JSON de salida (por defecto stdout)")
+    args = parser.parse_args()
+    mix = parse_mix(args.mix)
+
+    proc = log = log_path = None
+    if args.url:
+        url = args.url.rstrip("/")
+        lo, _, hi = (args.account_ids or "1:1000").partition(":")
+        ids = {"account": (int(lo), int(hi)), "client": (None, None), "provider": (None, None)}
+    else:
+        data_dir = args.data_dir or tempfile.mkdtemp(prefix="load-test-")
+        ids = prepare_database(args, data_dir)
+        if ids["account"][0] is None:
+            raise SystemExit("La BD no tiene cuentas: quita --skip-seed")
+        proc, url, log, log_path = start_gunicorn(args, data_dir)
+        print(f"gunicorn en {url} (workers={args.workers}, threads={args.threads})", file=sys.stderr)
+
+    try:
+        result = run_load(url, args, ids, mix)
+    finally:
+        if proc is not None:
+            stop_gunicorn(proc, log)
+
+    report = {
+        "benchmark": "load",
+        "python": sys.version.split()[0],
+        "cpus": os.cpu_count(),
+        "server": None if args.url else {
+            "workers": args.workers, "threads": args.threads, "scheduler": args.scheduler,
+            "account_ids": list(ids["account"]), "log": scan_log(log_path),
+        },
+        "url": args.url,
+        "clients": args.clients,
+        "duration": args.duration,
+        "think_ms": args.think_ms,
+        "mix": mix,
+        **result,
+    }
+    t = result["total"]
+    print(f"total: {t['requests']} peticiones, {t['rps']} req/s, p95 {t['p95_ms']} ms, "
+          f"errores {t['error_rate']:.2%}", file=sys.stderr)
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text + "\n")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
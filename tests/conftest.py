@@ -0,0 +1,48 @@
+import os
+import tempfile
+
+# La configuración se lee al importar `config`, así que va antes de importar la app
+os.environ.setdefault("DATA_DIR", tempfile.mkdtemp(prefix="andriux-test-"))
+os.environ.setdefault("METRICS_DIR", os.path.join(os.environ["DATA_DIR"], "metrics"))
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("ENABLE_SCHEDULER", "0")
+os.environ.setdefault("WARMUP_ON_BOOT", "0")
+os.environ.setdefault("IMPORT_RESUME_ON_BOOT", "0")
+# Las importaciones corren dentro de la petición salvo que el test use el pool
+os.environ.setdefault("IMPORT_ASYNC", "0")
+
+import pytest
+
+from app import create_app
+from app.extensions import db as _db
+from app.services import cache, identity
+
+
+@pytest.fixture(scope="session")
+def app():
+    app = create_app()
+    app.config.update(TESTING=True, WTF_CSRF_ENABLED=False)
+    return app
+
+
+@pytest.fixture
+def db(app):
+    with app.app_context():
+        _db.create_all()
+        yield _db
+        _db.session.remove()
+        _db.drop_all()
+        cache.clear()
+        identity.clear()
+
+
+@pytest.fixture
+def client(app, db):
+    return app.test_client()
+
+
+@pytest.fixture
+def logged_client(client):
+    client.post("/register", data={"email": "admin@test.local", "name": "Admin", "password": "secret"})
+    client.post("/login", data={"email": "admin@test.local", "password": "secret"})
+    return client
@@ -0,0 +1,42 @@
+"""
+Contador de sentencias SQL para tests, basado en before_cursor_execute.
+
+    with assert_max_queries(db.engine, 5):
+        client.get("/accounts/")
+"""
+from contextlib import contextmanager
+
+from sqlalchemy import event
+
+
+class QueryCounter:
+    def __init__(self):
+        self.statements = []
+        self.parameters = []
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+        self.parameters.append(parameters)
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+
+@contextmanager
+def count_queries(engine):
+    counter = QueryCounter()
+    event.listen(engine, "before_cursor_execute", counter)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, "before_cursor_execute", counter)
+
+
+@contextmanager
+def assert_max_queries(engine, limit):
+    with count_queries(engine) as counter:
+        yield counter
+    assert counter.count <= limit, (
+        f"{counter.count} consultas SQL (máximo {limit}):\n" + "\n".join(counter.statements)
+    )
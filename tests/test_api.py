@@ -0,0 +1,139 @@
+import json
+from datetime import date, timedelta
+
+import pytest
+
+from app.models import Account, ApiToken, Client, User
+from app.security import generate_api_token, hash_api_token
+from tests.query_budget import assert_max_queries
+
+
+@pytest.fixture
+def token(db):
+    user = User(email="api@test.local", password_hash="x")
+    db.session.add(user)
+    db.session.flush()
+    raw = generate_api_token()
+    db.session.add(ApiToken(user_id=user.id, name="tests", token_hash=hash_api_token(raw)))
+    db.session.commit()
+    return raw
+
+
+@pytest.fixture
+def api(client, token):
+    headers = {"Authorization": f"Bearer {token}"}
+
+    class Api:
+        def get(self, url, **kw):
+            return client.get(url, headers={**headers, **kw.pop("headers", {})}, **kw)
+
+        def post(self, url, payload):
+            return client.post(url, json=payload, headers=headers)
+
+        def patch(self, url, payload):
+            return client.patch(url, json=payload, headers=headers)
+    return Api()
+
+
+def _seed(n=25):
+    today = date.today()
+    return [{"platform": "Netflix", "username": f"u{i:02d}@x.com", "client": f"C{i % 3}",
+             "provider": "P1", "end_date": (today + timedelta(days=i)).isoformat()} for i in range(n)]
+
+
+def test_requires_token(client, db):
+    assert client.get("/api/v1/accounts").status_code == 401
+    bad = client.get("/api/v1/accounts", headers={"Authorization": "Bearer nope"})
+    assert bad.status_code == 401 and "error" in bad.get_json()
+
+
+def test_revoked_token(api, db):
+    t = ApiToken.query.one()
+    t.revoked_at = t.created_at
+    db.session.commit()
+    assert api.get("/api/v1/accounts").status_code == 401
+
+
+def test_batch_create_and_cursor_pages(api, db):
+    resp = api.post("/api/v1/accounts", _seed())
+    assert resp.status_code == 201
+    body = resp.get_json()
+    assert body["count"] == 25 and len(set(body["ids"])) == 25
+    assert Client.query.count() == 3
+
+    seen, after = [], None
+    while True:
+        url = "/api/v1/accounts?limit=10&fields=id,username,client,status"
+        page = api.get(url + (f"&after={after}" if after else "")).get_json()
+        assert all(set(item) == {"id", "username", "client", "status"} for item in page["items"])
+        seen += [item["username"] for item in page["items"]]
+        after = page["next_cursor"]
+        if not after:
+            break
+    # Mismo orden que la lista: por vencimiento
+    assert seen == [f"u{i:02d}@x.com" for i in range(25)]
+
+    one = api.get("/api/v1/accounts?q=u03@").get_json()["items"]
+    assert [a["username"] for a in one] == ["u03@x.com"]
+    assert "password" not in one[0]
+    expiring = api.get("/api/v1/accounts?status=expiring").get_json()["items"]
+    assert len(expiring) == 8  # hoy + 7 días
+
+    # Un cursor roto no reinicia la paginación en silencio
+    bad = api.get("/api/v1/accounts?limit=10&after=no-es-un-cursor")
+    assert bad.status_code == 400 and "after" in bad.get_json()["error"]
+
+
+def test_batch_is_all_or_nothing(api, db):
+    items = _seed(3)
+    items[1]["end_date"] = "31/12/2030"
+    items[2]["color"] = "rojo"
+    resp = api.post("/api/v1/accounts", items)
+    assert resp.status_code == 422
+    assert [e["index"] for e in resp.get_json()["errors"]] == [1, 2]
+    assert Account.query.count() == 0
+
+
+def test_batch_patch(api, db):
+    ids = api.post("/api/v1/accounts", _seed(4)).get_json()["ids"]
+    with assert_max_queries(db.engine, 15):
+        resp = api.patch("/api/v1/accounts", [
+            {"id": ids[0], "status_manual": "CAIDA"},
+            {"id": ids[1], "client": "Nuevo", "end_date": None},
+            {"id": ids[2], "username": "renombrada@x.com"},
+        ])
+    assert resp.status_code == 200 and resp.get_json()["count"] == 3
+
+    by_id = {a.id: a for a in Account.query}
+    assert by_id[ids[0]].status_bucket == "down"
+    assert by_id[ids[1]].client.name == "Nuevo" and by_id[ids[1]].status_bucket == "nodate"
+    assert "nuevo" in by_id[ids[1]].search_text
+    assert by_id[ids[2]].username == "renombrada@x.com" and by_id[ids[2]].client.name == "C2"
+
+    missing = api.patch("/api/v1/accounts", [{"id": ids[3], "notes": "x"}, {"id": 999999, "notes": "y"}])
+    assert missing.status_code == 422
+    assert db.session.get(Account, ids[3]).notes is None
+
+
+def test_ndjson_stream(api, db):
+    api.post("/api/v1/accounts", _seed(12))
+    resp = api.get("/api/v1/accounts?fields=username", headers={"Accept": "application/x-ndjson"})
+    assert resp.mimetype == "application/x-ndjson"
+    lines = [json.loads(line) for line in resp.get_data(as_text=True).splitlines()]
+    assert len(lines) == 12 and lines[0] == {"username": "u00@x.com"}
+
+    cut = api.get("/api/v1/accounts?format=ndjson&fields=username&limit=5").get_data(as_text=True).splitlines()
+    assert len(cut) == 6 and "next_cursor" in json.loads(cut[-1])
+    rest = api.get(f"/api/v1/accounts?format=ndjson&fields=username&after={json.loads(cut[-1])['next_cursor']}")
+    assert len(rest.get_data(as_text=True).splitlines()) == 7
+
+
+def test_api_token_cli(app, db):
+    db.session.add(User(email="cli@test.local", password_hash="x"))
+    db.session.commit()
+    runner = app.test_cli_runner()
+    out = runner.invoke(args=["api-token", "create", "--email", "cli@test.local", "--name", "sync"])
+    assert out.exit_code == 0, out.output
+    raw = out.output.strip().rsplit(" ", 1)[-1]
+    assert ApiToken.query.filter_by(token_hash=hash_api_token(raw)).count() == 1
+    assert runner.invoke(args=["api-token", "revoke", "1"]).exit_code == 0
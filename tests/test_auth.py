@@ -0,0 +1,82 @@
+import threading
+
+from app import security
+from app.blueprints.auth.routes import load_user
+from app.models import User
+from app.services import identity
+from tests.query_budget import count_queries
+
+
+def _user_selects(counter):
+    return [s for s in counter.statements if 'FROM "user"' in s or "FROM user" in s]
+
+
+def _user(db, email="x@test.local"):
+    u = User(email=email, name="X", password_hash="x")
+    db.session.add(u)
+    db.session.commit()
+    return u.id
+
+
+def test_load_user_is_cached(app, db):
+    user_id = _user(db)
+    db.session.remove()
+    with count_queries(db.engine) as counter:
+        load_user(str(user_id))
+        db.session.remove()   # fin de la petición
+        second = load_user(str(user_id))
+    assert len(_user_selects(counter)) == 1
+    assert second.email == "x@test.local" and second in db.session
+
+
+def test_user_change_invalidates_cache(app, db):
+    user_id = _user(db)
+    identity.load(user_id, 60)
+    user = db.session.get(User, user_id)
+    user.name = "Renombrado"
+    db.session.commit()
+    db.session.remove()
+
+    with count_queries(db.engine) as counter:
+        assert identity.load(user_id, 60).name == "Renombrado"
+    assert len(_user_selects(counter)) == 1
+
+
+def test_cache_disabled_with_zero_ttl(app, db):
+    db.session.add(User(email="x@test.local", password_hash="x"))
+    db.session.commit()
+    with count_queries(db.engine) as counter:
+        identity.load(1, 0)
+        identity.load(1, 0)
+    assert len(_user_selects(counter)) == 2
+
+
+def test_register_first_user_is_admin_without_counts(client, db):
+    with count_queries(db.engine) as counter:
+        client.post("/register", data={"email": "a@test.local", "name": "A", "password": "x"})
+    assert not [s for s in counter.statements if "count(" in s.lower()]
+    client.post("/register", data={"email": "b@test.local", "name": "B", "password": "x"})
+    admins = {u.email: u.is_admin for u in User.query}
+    assert admins == {"a@test.local": True, "b@test.local": False}
+
+
+def test_login_busy_when_no_hash_slot(app, client, db, monkeypatch):
+    client.post("/register", data={"email": "a@test.local", "name": "A", "password": "x"})
+    slots = threading.BoundedSemaphore(1)
+    monkeypatch.setattr(security, "_hash_slots", slots)
+    monkeypatch.setitem(app.config, "PASSWORD_HASH_WAIT_SECONDS", 0.01)
+
+    slots.acquire()
+    try:
+        busy = client.post("/login", data={"email": "a@test.local", "password": "x"})
+    finally:
+        slots.release()
+    assert busy.status_code == 503
+
+    ok = client.post("/login", data={"email": "a@test.local", "password": "x"})
+    assert ok.status_code == 302
+
+
+def test_session_cookie_samesite_lax(client, db):
+    resp = client.post("/register", data={"email": "lax@x.com", "name": "L", "password": "x"})
+    assert "SameSite=Lax" in resp.headers["Set-Cookie"]
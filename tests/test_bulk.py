@@ -0,0 +1,110 @@
+from datetime import date, timedelta
+
+from app.models import Account, NotificationLog, Provider
+from app.services import bulk
+from tests.query_budget import count_queries
+
+TODAY = date.today()
+
+
+def _seed(db):
+    p1, p2 = Provider(name="P1"), Provider(name="P2")
+    db.session.add_all([
+        Account(platform="Netflix", username="a@x.com", provider=p1, end_date=TODAY + timedelta(days=2), time_allocated=30),
+        Account(platform="Netflix", username="b@x.com", provider=p1, end_date=None),
+        Account(platform="Max", username="c@x.com", provider=p1, end_date=TODAY - timedelta(days=1), status_manual="CAIDA"),
+        p2,
+    ])
+    db.session.commit()
+
+
+def _get(username):
+    return Account.query.filter_by(username=username).one()
+
+
+def _post(client, **data):
+    data.setdefault("q", "")
+    data.setdefault("status", "all")
+    data.setdefault("platform", "")
+    return client.post("/accounts/bulk-action", data=data)
+
+
+def test_extend_days_is_one_statement_and_recomputes_status(db):
+    _seed(db)
+    ids = [_get("a@x.com").id, _get("b@x.com").id]
+    with count_queries(db.engine) as stmts:
+        n = bulk.run("extend_days", bulk.selection(ids=ids), days=10)
+    db.session.commit()
+    assert n == 2 and stmts.count == 1
+
+    a, b = _get("a@x.com"), _get("b@x.com")
+    assert a.end_date == TODAY + timedelta(days=12) and a.status_bucket == "active"
+    # Sin fecha: se extiende desde hoy
+    assert b.end_date == TODAY + timedelta(days=10) and b.status_bucket == "active"
+
+
+def test_extend_by_time_allocated_skips_rows_without_it(db):
+    _seed(db)
+    n = bulk.run("extend_allocated", bulk.selection(q="netflix"))
+    db.session.commit()
+    assert n == 1
+    assert _get("a@x.com").end_date == TODAY + timedelta(days=32)
+    assert _get("b@x.com").end_date is None
+
+
+def test_status_actions(db):
+    _seed(db)
+    bulk.run("clear_status", bulk.selection(status="down"))
+    bulk.run("mark_down", bulk.selection(ids=[_get("b@x.com").id]))
+    db.session.commit()
+    c, b = _get("c@x.com"), _get("b@x.com")
+    assert (c.status_manual, c.status_bucket) == (None, "expired")
+    assert (b.status_manual, b.status_bucket) == ("CAIDA", "down")
+
+
+def test_filter_scope_route_reassigns_and_refreshes_search(logged_client, db):
+    _seed(db)
+    p2 = Provider.query.filter_by(name="P2").one()
+    r = _post(logged_client, action="reassign", scope="filter", q="netflix", provider_id=p2.id)
+    assert r.status_code == 302
+    assert {a.username for a in Account.query.filter_by(provider_id=p2.id)} == {"a@x.com", "b@x.com"}
+    assert _get("a@x.com").search_text.endswith(" p2")
+
+
+def test_reassign_only_refreshes_selected_accounts(db):
+    from sqlalchemy import update
+
+    _seed(db)
+    p2 = Provider.query.filter_by(name="P2").one()
+    db.session.add(Account(platform="Max", username="d@x.com", provider=p2))
+    db.session.commit()
+    # Documento marcado por fuera: si se recalculara, cambiaría
+    db.session.execute(update(Account).where(Account.username == "d@x.com").values(search_text="intacto"))
+    db.session.commit()
+
+    bulk.run("reassign", bulk.selection(ids=[_get("a@x.com").id]), provider_id=p2.id)
+    db.session.commit()
+    assert _get("a@x.com").search_text.endswith(" p2")
+    assert _get("d@x.com").search_text == "intacto"
+
+
+def test_delete_selected_and_filter(logged_client, db):
+    _seed(db)
+    a = _get("a@x.com")
+    db.session.add(NotificationLog(account_id=a.id, end_date=a.end_date, section="soon"))
+    db.session.commit()
+
+    _post(logged_client, action="delete", selected=[a.id])
+    assert Account.query.count() == 2
+    assert NotificationLog.query.count() == 0
+
+    _post(logged_client, action="delete", scope="filter", platform="max")
+    assert [x.username for x in Account.query] == ["b@x.com"]
+
+
+def test_invalid_params_are_reported(logged_client, db):
+    _seed(db)
+    _post(logged_client, action="extend_days", scope="filter", days="0")
+    with logged_client.session_transaction() as s:
+        assert any("días" in m for _, m in s["_flashes"])
+    assert _get("a@x.com").end_date == TODAY + timedelta(days=2)
@@ -0,0 +1,64 @@
+from datetime import date, timedelta
+
+from sqlalchemy import event
+
+from app.blueprints.core.routes import _dashboard_counts
+from app.models import Account, Provider
+from app.services import cache
+
+
+def test_counts_in_one_query(db):
+    today = date.today()
+    db.session.add_all([
+        Provider(name="P1"),
+        Account(platform="N", username="a", end_date=None),
+        Account(platform="N", username="b", end_date=today - timedelta(days=3)),
+        Account(platform="N", username="c", end_date=today),
+        Account(platform="N", username="d", end_date=today + timedelta(days=30)),
+        Account(platform="N", username="e", end_date=today, status_manual="CAIDA"),
+    ])
+    db.session.commit()
+
+    statements = []
+    listener = lambda *args: statements.append(args[2])  # noqa: E731
+    event.listen(db.engine, "before_cursor_execute", listener)
+    try:
+        counts = _dashboard_counts(7)
+    finally:
+        event.remove(db.engine, "before_cursor_execute", listener)
+
+    assert len(statements) == 1
+    assert counts["total_accounts"] == 5
+    assert counts["total_providers"] == 1
+    assert (counts["no_date"], counts["expired"], counts["expiring"], counts["active"]) == (1, 1, 1, 1)
+    assert counts["down"] == 1
+
+
+def test_cache_invalidated_on_commit(db):
+    calls = []
+
+    def loader():
+        calls.append(1)
+        return Account.query.count()
+
+    assert cache.get_or_set("k", loader, ttl=60) == 0
+    assert cache.get_or_set("k", loader, ttl=60) == 0
+    assert len(calls) == 1
+
+    version = cache.data_version()
+    db.session.add(Account(platform="N", username="x"))
+    db.session.commit()
+    assert cache.data_version() == version + 1
+
+    assert cache.get_or_set("k", loader, ttl=60) == 1
+    assert len(calls) == 2
+
+
+def test_cache_is_bounded_lru(monkeypatch):
+    monkeypatch.setattr(cache, "MAX_ENTRIES", 3)
+    cache.clear()
+    for k in ("a", "b", "c"):
+        cache.get_or_set(k, lambda k=k: k, ttl=60)
+    cache.get_or_set("a", lambda: "otra", ttl=60)   # "a" pasa a ser la más reciente
+    cache.get_or_set("d", lambda: "d", ttl=60)
+    assert list(cache._store) == ["c", "a", "d"]
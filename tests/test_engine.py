@@ -0,0 +1,44 @@
+import os
+
+from sqlalchemy import create_engine, text
+
+from app.engine import apply_engine_profile
+
+CFG = {
+    "SQLITE_PRAGMAS": True,
+    "SQLITE_JOURNAL_MODE": "WAL",
+    "SQLITE_SYNCHRONOUS": "NORMAL",
+    "SQLITE_BUSY_TIMEOUT_MS": 4000,
+    "SQLITE_MMAP_SIZE": 8 * 1024 * 1024,
+    "SQLITE_CACHE_SIZE_KB": 4096,
+}
+
+
+def test_sqlite_pragmas_applied_on_connect(tmp_path):
+    engine = create_engine(f"sqlite:///{os.path.join(tmp_path, 'x.sqlite')}")
+    apply_engine_profile(engine, CFG)
+    with engine.connect() as conn:
+        pragma = lambda name: conn.execute(text(f"PRAGMA {name}")).scalar()
+        assert pragma("journal_mode") == "wal"
+        assert pragma("synchronous") == 1  # NORMAL
+        assert pragma("busy_timeout") == 4000
+        assert pragma("mmap_size") == 8 * 1024 * 1024
+        assert pragma("cache_size") == -4096
+    engine.dispose()
+
+
+def test_profile_can_be_disabled(tmp_path):
+    engine = create_engine(f"sqlite:///{os.path.join(tmp_path, 'x.sqlite')}")
+    assert apply_engine_profile(engine, dict(CFG, SQLITE_PRAGMAS=False)) == []
+    with engine.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "delete"
+    engine.dispose()
+
+
+def test_postgres_pool_options():
+    from config import _engine_options
+
+    opts = _engine_options("postgresql+psycopg2://u:p@db/app")
+    assert opts["pool_pre_ping"] is True
+    assert {"pool_size", "max_overflow", "pool_recycle", "pool_timeout"} <= set(opts)
+    assert "connect_args" in _engine_options("sqlite:///x.sqlite")
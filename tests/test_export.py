@@ -0,0 +1,42 @@
+import csv
+import io
+from datetime import date, timedelta
+
+from openpyxl import load_workbook
+
+from app.models import Account, Provider, Client
+
+
+def _seed(db):
+    p = Provider(name="P1")
+    c = Client(name="C1", provider=p)
+    today = date.today()
+    db.session.add_all([
+        Account(platform="Netflix", username="a@x.com", provider=p, client=c, end_date=today - timedelta(days=1)),
+        Account(platform="Netflix", username="b@x.com", end_date=today + timedelta(days=30)),
+        Account(platform="Disney+", username="c@x.com", status_manual="CAIDA"),
+    ])
+    db.session.commit()
+
+
+def test_export_csv_respects_filters(logged_client, db):
+    _seed(db)
+    r = logged_client.get("/accounts/export?format=csv&platform=netflix&status=expired")
+    assert r.status_code == 200
+    assert r.mimetype == "text/csv"
+
+    rows = list(csv.reader(io.StringIO(r.get_data(as_text=True))))
+    assert rows[0][:5] == ["platform", "username", "password", "client", "provider"]
+    assert [row[1] for row in rows[1:]] == ["a@x.com"]
+    assert rows[1][3:5] == ["C1", "P1"]
+
+
+def test_export_xlsx_streams_workbook(logged_client, db):
+    _seed(db)
+    r = logged_client.get("/accounts/export")
+    assert r.status_code == 200
+
+    ws = load_workbook(io.BytesIO(r.get_data()), read_only=True).active
+    values = list(ws.iter_rows(values_only=True))
+    assert len(values) == 4
+    assert values[-1][7] == "CAIDA"
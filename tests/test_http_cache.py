@@ -0,0 +1,106 @@
+import gzip
+import re
+
+import pytest
+from sqlalchemy import update
+
+from app.models import Account, DataVersion
+from app.services import cache
+from tests.query_budget import assert_max_queries
+
+
+@pytest.fixture
+def browser(logged_client):
+    # Consume los flash del registro: con mensajes pendientes no hay 304
+    assert "ETag" not in logged_client.get("/").headers
+    return logged_client
+
+
+def _add_account(db, username="a@x.com"):
+    db.session.add(Account(platform="Netflix", username=username))
+    db.session.commit()
+
+
+def test_etag_and_304(browser, db):
+    _add_account(db)
+    first = browser.get("/accounts/?status=all")
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+    assert etag.startswith('W/"') and first.headers["Last-Modified"]
+    assert "no-cache" in first.headers["Cache-Control"] and "private" in first.headers["Cache-Control"]
+
+    # 304: solo el usuario de la sesión y la versión global
+    with assert_max_queries(db.engine, 2):
+        again = browser.get("/accounts/?status=all", headers={"If-None-Match": etag})
+    assert again.status_code == 304 and not again.data
+
+    # Otra URL, otro ETag
+    assert browser.get("/accounts/?status=expired").headers["ETag"] != etag
+
+
+def test_commit_bumps_global_version(browser, db):
+    etag = browser.get("/").headers["ETag"]
+    assert browser.get("/", headers={"If-None-Match": etag}).status_code == 304
+
+    before = db.session.get(DataVersion, 1).version
+    _add_account(db)
+    assert db.session.get(DataVersion, 1).version == before + 1
+    assert browser.get("/", headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_if_modified_since(browser, db):
+    resp = browser.get("/")
+    again = browser.get("/", headers={"If-Modified-Since": resp.headers["Last-Modified"]})
+    assert again.status_code == 304
+
+
+def test_other_process_commit_clears_local_cache(db):
+    cache.sync_global(cache.global_version(db.session)[0])
+    cache.get_or_set("k", lambda: 1, 60)
+    # Commit hecho por otro worker: solo cambia la fila global
+    db.session.execute(update(DataVersion).values(version=DataVersion.version + 5))
+    db.session.commit()
+    cache.sync_global(cache.global_version(db.session)[0])
+    assert cache.get_or_set("k", lambda: 2, 60) == 2
+
+
+def test_gzip_html_and_csv_export(browser, db):
+    for i in range(30):
+        db.session.add(Account(platform="Netflix", username=f"user{i}@x.com"))
+    db.session.commit()
+
+    page = browser.get("/", headers={"Accept-Encoding": "gzip"})
+    assert page.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in page.headers["Vary"]
+    assert b"</html>" in gzip.decompress(page.data)
+
+    # La lista muestra contraseñas y repite `q`: nunca se comprime (BREACH)
+    listing = browser.get("/accounts/?q=user", headers={"Accept-Encoding": "gzip"})
+    assert listing.status_code == 200 and "Content-Encoding" not in listing.headers
+
+    csv = browser.get("/accounts/export?format=csv", headers={"Accept-Encoding": "gzip"})
+    assert csv.headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(csv.data).decode().startswith("platform,username")
+
+    xlsx = browser.get("/accounts/export", headers={"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in xlsx.headers
+
+    plain = browser.get("/")
+    assert "Content-Encoding" not in plain.headers
+
+
+def test_brotli_when_available(browser, db):
+    brotli = pytest.importorskip("brotli")
+    page = browser.get("/", headers={"Accept-Encoding": "gzip, br"})
+    assert page.headers["Content-Encoding"] == "br"
+    assert b"</html>" in brotli.decompress(page.data)
+
+
+def test_fingerprinted_static(browser):
+    html = browser.get("/accounts/").get_data(as_text=True)
+    url = re.search(r'/static/css/theme\.css\?v=[0-9a-f]{10}', html).group(0)
+    resp = browser.get(url)
+    assert resp.status_code == 200
+    cc = resp.headers["Cache-Control"]
+    assert "immutable" in cc and "max-age=31536000" in cc and "public" in cc
+    resp.close()
@@ -0,0 +1,125 @@
+import io
+import os
+from datetime import date
+
+import pytest
+from openpyxl import Workbook
+
+from app.models import Account, Provider, Client
+from app.services.importer import AccountImporter, _is_blank, import_rows
+
+
+def _rows():
+    return [
+        {"platform": "Netflix", "username": "a@x.com", "provider": "P1", "client": "C1", "end_date": "2030-01-31"},
+        {"platform": "Netflix", "username": "b@x.com", "provider": "P1", "client": "C2", "time_allocated": 30.0},
+        {"platform": "Disney+", "username": "c@x.com", "provider": "P2", "client": "C1"},
+        {"platform": "", "username": "sin-plataforma@x.com"},
+    ]
+
+
+def test_blank_cells_by_type_not_text():
+    pd = pytest.importorskip("pandas")
+    assert _is_blank(float("nan")) and _is_blank(pd.NaT) and _is_blank("  ") and _is_blank(None)
+    # Una contraseña o un usuario pueden ser literalmente "nan" o "NaT"
+    assert not _is_blank("nan") and not _is_blank("NaT")
+
+
+def test_insert_resolves_catalogs_once(db):
+    s = import_rows(_rows())
+    db.session.commit()
+
+    assert (s["inserted"], s["updated"], s["skipped"]) == (3, 0, 1)
+    assert Provider.query.count() == 2
+    assert Client.query.count() == 2
+    # El cliente nuevo hereda el proveedor de la primera fila donde aparece
+    assert Client.query.filter_by(name="C1").one().provider.name == "P1"
+
+    a = Account.query.filter_by(username="a@x.com").one()
+    assert a.end_date == date(2030, 1, 31)
+    assert a.client.name == "C1" and a.provider.name == "P1"
+    assert Account.query.filter_by(username="b@x.com").one().time_allocated == 30
+
+
+def test_upsert_updates_instead_of_duplicating(db):
+    import_rows(_rows())
+    db.session.commit()
+
+    rows = _rows()
+    rows[0]["end_date"] = "2031-02-01"
+    s = import_rows(rows, mode="upsert", columns=["platform", "username", "provider", "client", "end_date"])
+    db.session.commit()
+
+    assert (s["inserted"], s["updated"], s["skipped"]) == (0, 3, 1)
+    assert Account.query.count() == 3
+    a = Account.query.filter_by(username="a@x.com").one()
+    assert a.end_date == date(2031, 2, 1)
+    # time_allocated no venía en la hoja: no se pisa
+    assert Account.query.filter_by(username="b@x.com").one().time_allocated == 30
+
+
+def test_chunks_reuse_catalog_cache(db):
+    importer = AccountImporter(chunk_size=2)
+    importer.add_rows(_rows())
+    importer.add_rows([{"platform": "Max", "username": "d@x.com", "provider": "P1"}])
+    db.session.commit()
+
+    assert importer.stats["inserted"] == 4
+    assert Provider.query.count() == 2
+
+
+def _flashes(client):
+    with client.session_transaction() as s:
+        return [m for _, m in s.get("_flashes", [])]
+
+
+def test_upload_csv_streams_in_batches(logged_client, db, app):
+    body = "platform;username;provider;end_date\n" + "".join(
+        f"Netflix;u{i}@x.com;P{i % 3};2030-01-01\n" for i in range(2500)
+    ) + ";;;\n"
+    r = logged_client.post("/accounts/upload-excel",
+                           data={"file": (io.BytesIO(body.encode()), "cuentas.csv")},
+                           content_type="multipart/form-data")
+    assert r.status_code == 302
+    assert Account.query.count() == 2500
+    assert Provider.query.count() == 3
+    assert any("2500 cuentas importadas" in m for m in _flashes(logged_client))
+    # Nada queda guardado en el volumen: la copia del job se borra al terminar
+    assert os.listdir(app.config["UPLOAD_FOLDER"]) == []
+    assert os.listdir(app.config["IMPORT_JOBS_FOLDER"]) == []
+
+
+def test_upload_xlsx_upsert(logged_client, db):
+    wb = Workbook()
+    ws = wb.active
+    ws.append(["Platform", "Username", "Client", "End_Date"])
+    ws.append(["Max", "a@x.com", "C1", date(2030, 5, 1)])
+    ws.append([None, None, None, None])
+    bio = io.BytesIO()
+    wb.save(bio)
+
+    for _ in range(2):
+        bio.seek(0)
+        logged_client.post("/accounts/upload-excel", data={"file": (io.BytesIO(bio.getvalue()), "c.xlsx"), "mode": "upsert"},
+                           content_type="multipart/form-data")
+    a = Account.query.one()
+    assert (a.platform, a.client.name, a.end_date) == ("Max", "C1", date(2030, 5, 1))
+
+
+def test_upload_rejects_unreadable_file(logged_client, db):
+    logged_client.post("/accounts/upload-excel", data={"file": (io.BytesIO(b"no es un zip"), "x.xlsx")},
+                       content_type="multipart/form-data")
+    assert any(m.startswith("Error leyendo Excel") for m in _flashes(logged_client))
+
+
+def test_upload_spool_always_spills_to_disk(app, monkeypatch):
+    from app.wrappers import DEFAULT_SPOOL_MAX, UploadRequest
+
+    with app.test_request_context(method="POST"):
+        for configured, expected in ((64, 64), (0, DEFAULT_SPOOL_MAX)):
+            monkeypatch.setitem(app.config, "UPLOAD_SPOOL_MAX", configured)
+            stream = UploadRequest.from_values()._get_file_stream(None, "application/octet-stream")
+            assert stream._max_size == expected
+            stream.write(b"x" * (expected + 1))
+            assert stream._rolled
+            stream.close()
@@ -0,0 +1,82 @@
+"""
+Comprueba con EXPLAIN que las consultas de las rutas usan sus índices y no
+ordenan en memoria. Las sentencias salen de los mismos helpers que usan la
+lista/export, el dashboard y notify. SQLite siempre; PostgreSQL si
+TEST_POSTGRES_URL existe.
+"""
+import os
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, select, text
+
+from app.blueprints.core.routes import _dashboard_stmt
+from app.extensions import db as _db
+from app.models import Account, Client, Provider
+from app.services.filters import apply_account_filters, join_account_names
+from app.services.notify import _sections_stmt
+from app.services.pagination import after_cursor, order_forward
+
+
+def _list_stmt(status="all", cursor=None, limit=11):
+    # Igual que accounts.index (keyset_paginate) y export_accounts
+    stmt = apply_account_filters(
+        join_account_names(select(Account.id, Account.platform, Client.name, Provider.name).select_from(Account)),
+        status=status,
+    )
+    if cursor is not None:
+        stmt = stmt.where(after_cursor(cursor))
+    stmt = stmt.order_by(*order_forward())
+    return stmt.limit(limit) if limit else stmt
+
+
+def _hot_queries(dialect):
+    today = date.today()
+    cursor = (today + timedelta(days=3), datetime(2026, 1, 1), 500)
+    return [
+        ("accounts.index", "ix_account_list_order", _list_stmt()),
+        ("accounts.index (cursor)", "ix_account_list_order", _list_stmt(cursor=cursor)),
+        ("accounts.index status", "ix_account_status_list_order", _list_stmt("expiring")),
+        ("accounts.index status (cursor)", "ix_account_status_list_order", _list_stmt("active", cursor=cursor)),
+        ("export_accounts", "ix_account_list_order", _list_stmt(limit=None)),
+        ("dashboard", "ix_account_status_bucket_end_date", _dashboard_stmt()),
+        ("notify full", "ix_account_end_date_id", _sections_stmt(today, 7, dialect=dialect)),
+        ("notify delta", "ix_account_end_date_id", _sections_stmt(today, 7, delta=True, dialect=dialect)),
+        # Carga de Client.accounts / Provider.accounts y borrado de catálogos
+        ("client accounts", "ix_account_client_id", select(Account.id).where(Account.client_id == 1)),
+        ("provider accounts", "ix_account_provider_id", select(Account.id).where(Account.provider_id == 1)),
+    ]
+
+
+def _compile(conn, stmt):
+    return str(stmt.compile(conn, compile_kwargs={"literal_binds": True}))
+
+
+def test_sqlite_plans_use_indexes(db):
+    db.session.add_all([
+        Account(platform="N", username=f"u{i}", end_date=date.today() + timedelta(days=i % 20) if i % 7 else None)
+        for i in range(200)
+    ])
+    db.session.commit()
+    conn = db.session.connection()
+    conn.execute(text("ANALYZE"))
+    for name, index_name, stmt in _hot_queries("sqlite"):
+        plan = conn.execute(text("EXPLAIN QUERY PLAN " + _compile(conn, stmt))).all()
+        detail = " | ".join(str(row[-1]) for row in plan)
+        assert index_name in detail and "TEMP B-TREE" not in detail, (name, detail)
+
+
+@pytest.mark.skipif(not os.environ.get("TEST_POSTGRES_URL"), reason="TEST_POSTGRES_URL no configurada")
+def test_postgres_plans_use_indexes(app):
+    engine = create_engine(os.environ["TEST_POSTGRES_URL"])
+    _db.metadata.create_all(engine)
+    try:
+        with app.app_context(), engine.connect() as conn:
+            # Con tablas vacías el planner prefiere seq scan: lo desactivamos
+            conn.execute(text("SET enable_seqscan = off"))
+            for name, index_name, stmt in _hot_queries("postgresql"):
+                plan = " | ".join(conn.execute(text("EXPLAIN " + _compile(conn, stmt))).scalars().all())
+                assert index_name in plan and "Sort" not in plan, (name, plan)
+    finally:
+        _db.metadata.drop_all(engine)
+        engine.dispose()
@@ -0,0 +1,73 @@
+import io
+import os
+from datetime import datetime, timedelta
+
+from app.models import Account, ImportJob
+from app.services import jobs
+
+
+def _csv(n):
+    return ("platform,username\n" + "".join(f"Netflix,u{i}@x.com\n" for i in range(n))).encode()
+
+
+def _job_file(app, body):
+    os.makedirs(app.config["IMPORT_JOBS_FOLDER"], exist_ok=True)
+    path = os.path.join(app.config["IMPORT_JOBS_FOLDER"], "resume.upload")
+    with open(path, "wb") as fh:
+        fh.write(body)
+    return path
+
+
+def test_orphaned_job_resumes_after_last_committed_chunk(app, db):
+    path = _job_file(app, _csv(5))
+    # Simula un proceso que murió tras confirmar las 2 primeras filas
+    db.session.add_all([Account(platform="Netflix", username=f"u{i}@x.com") for i in range(2)])
+    job = ImportJob(status="running", mode="insert", filename="c.csv", path=path,
+                    rows_processed=2, inserted=2, started_at=datetime.utcnow(),
+                    heartbeat_at=datetime.utcnow() - timedelta(hours=1))
+    db.session.add(job)
+    db.session.commit()
+
+    assert jobs.resume_pending(app) == [job.id]
+
+    job = db.session.get(ImportJob, job.id, populate_existing=True)
+    assert (job.status, job.rows_processed, job.inserted) == ("done", 5, 5)
+    assert Account.query.count() == 5
+    assert not os.path.exists(path)
+
+
+def test_live_job_is_not_claimed_twice(app, db):
+    job = ImportJob(status="queued", mode="insert", filename="c.csv")
+    db.session.add(job)
+    db.session.commit()
+
+    assert jobs.claim(job.id, stale_seconds=300) is True
+    assert jobs.claim(job.id, stale_seconds=300) is False
+    assert jobs.resume_pending(app) == []
+
+
+def test_progress_endpoint(logged_client, db):
+    r = logged_client.post("/accounts/upload-excel",
+                           data={"file": (io.BytesIO(_csv(3)), "c.csv")},
+                           content_type="multipart/form-data")
+    job = ImportJob.query.one()
+    assert r.headers["Location"].endswith(f"import_job={job.id}")
+
+    data = logged_client.get(f"/accounts/import-jobs/{job.id}").get_json()
+    assert data["status"] == "done" and data["finished"]
+    assert (data["rows_processed"], data["inserted"]) == (3, 3)
+    assert logged_client.get(f"/accounts/?import_job={job.id}").status_code == 200
+
+
+def test_job_keeps_upload_mimetype(app, db):
+    from werkzeug.datastructures import FileStorage
+
+    # Sin extensión: solo el mimetype dice que es CSV
+    upload = FileStorage(io.BytesIO(_csv(3)), filename="descarga", content_type="text/csv")
+    job, columns = jobs.create_job(app, upload, "insert")
+    db.session.commit()
+    assert (job.mimetype, columns) == ("text/csv", ["platform", "username"])
+
+    jobs.run_job(app, job.id)
+    job = db.session.get(ImportJob, job.id, populate_existing=True)
+    assert (job.status, job.inserted) == ("done", 3)
@@ -0,0 +1,39 @@
+from app.models import Account, Provider, Client
+
+
+def test_lookup_prefix_and_limit(logged_client, db):
+    db.session.add_all([Provider(name=n) for n in ("Alfa", "Alfredo", "Beta", "al_guion")])
+    db.session.add(Client(name="Ana"))
+    db.session.add_all([Account(platform=" Netflix ", username="a"), Account(platform="netflix", username="b"),
+                        Account(platform="Max", username="c")])
+    db.session.commit()
+
+    r = logged_client.get("/accounts/lookup/providers?q=alf&limit=1")
+    assert r.status_code == 200
+    assert [p["name"] for p in r.get_json()] == ["Alfa"]
+
+    # '_' es literal, no comodín
+    assert [p["name"] for p in logged_client.get("/accounts/lookup/providers?q=al_").get_json()] == ["al_guion"]
+
+    assert logged_client.get("/accounts/lookup/clients?q=an").get_json()[0]["name"] == "Ana"
+    assert "Max" in [p["name"] for p in logged_client.get("/accounts/lookup/platforms").get_json()]
+    assert logged_client.get("/accounts/lookup/nope").status_code == 404
+
+
+def test_lookup_cache_invalidated_by_writes(logged_client, db):
+    assert logged_client.get("/accounts/lookup/providers?q=ze").get_json() == []
+    db.session.add(Provider(name="Zeta"))
+    db.session.commit()
+    assert [p["name"] for p in logged_client.get("/accounts/lookup/providers?q=ze").get_json()] == ["Zeta"]
+
+
+def test_lookup_sees_other_worker_writes(logged_client, db):
+    from sqlalchemy import insert, update
+    from app.models import DataVersion
+
+    assert logged_client.get("/accounts/lookup/providers?q=om").get_json() == []
+    # Alta hecha por otro worker: en este proceso solo cambia la fila global
+    db.session.execute(insert(Provider.__table__).values(name="Omega"))
+    db.session.execute(update(DataVersion).values(version=DataVersion.version + 1))
+    db.session.commit()
+    assert [p["name"] for p in logged_client.get("/accounts/lookup/providers?q=om").get_json()] == ["Omega"]
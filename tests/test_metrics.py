@@ -0,0 +1,71 @@
+import json
+import logging
+
+import pytest
+
+from app.services import metrics
+
+
+@pytest.fixture(autouse=True)
+def _clean_metrics():
+    metrics.reset()
+    yield
+    metrics.reset()
+
+
+def test_server_timing_header(logged_client):
+    resp = logged_client.get("/accounts/")
+    assert resp.status_code == 200
+    timing = resp.headers["Server-Timing"]
+    assert "sql;dur=" in timing and "queries" in timing
+    assert "tpl;dur=" in timing and "total;dur=" in timing
+
+
+def test_metrics_endpoint_aggregates(app, logged_client, monkeypatch):
+    monkeypatch.setitem(app.config, "METRICS_TOKEN", "s3cret")
+    logged_client.get("/accounts/")
+    logged_client.get("/accounts/export?format=csv")
+    body = logged_client.get("/metrics", headers={"Authorization": "Bearer s3cret"}).get_data(as_text=True)
+    assert "# TYPE http_request_duration_seconds histogram" in body
+    assert 'http_request_duration_seconds_count{endpoint="accounts.index",method="GET",status="200"} 1' in body
+    assert 'http_request_sql_statements_total{endpoint="accounts.index",method="GET"}' in body
+    assert 'app_exports_total{format="csv"} 1' in body
+
+
+def test_metrics_sums_other_processes(tmp_path):
+    metrics.inc("app_exports_total", format="csv")
+    other = {"counters": [["app_exports_total", [["format", "csv"]], 2]], "histograms": []}
+    (tmp_path / "999999.json").write_text(json.dumps(other))
+    assert 'app_exports_total{format="csv"} 3' in metrics.render(str(tmp_path))
+
+
+def test_metrics_token(app, client, monkeypatch):
+    # Sin token configurado no se publica nada
+    monkeypatch.setitem(app.config, "METRICS_TOKEN", None)
+    assert client.get("/metrics").status_code == 404
+
+    monkeypatch.setitem(app.config, "METRICS_TOKEN", "s3cret")
+    assert client.get("/metrics").status_code == 401
+    assert client.get("/metrics", headers={"Authorization": "Bearer otro"}).status_code == 401
+    ok = client.get("/metrics", headers={"Authorization": "Bearer s3cret"})
+    assert ok.status_code == 200
+
+
+def test_slow_request_logged(app, logged_client, caplog):
+    app.config["SLOW_REQUEST_MS"] = 0.001
+    try:
+        with caplog.at_level(logging.WARNING):
+            logged_client.get("/accounts/?q=foo")
+    finally:
+        app.config["SLOW_REQUEST_MS"] = 1000
+    assert any("Petición lenta" in r.getMessage() and "accounts.index" in r.getMessage()
+               for r in caplog.records)
+
+
+def test_snapshot_not_overwritten_by_reused_pid(tmp_path, monkeypatch):
+    metrics.inc("app_exports_total", format="csv")
+    metrics.flush(str(tmp_path), force=True)
+    # Otro proceso con el mismo pid (p. ej. tras un reinicio del worker)
+    monkeypatch.setattr(metrics, "_process", (None, None))
+    metrics.flush(str(tmp_path), force=True)
+    assert len(list(tmp_path.glob("*.json"))) == 2
@@ -0,0 +1,116 @@
+from datetime import date, timedelta
+
+import pytest
+
+from app.models import Account, Provider
+from app.services.notify import _query_sections, build_pushover_messages
+
+
+def _seed(db):
+    today = date.today()
+    p = Provider(name="P1")
+    db.session.add_all([
+        Account(platform="N", username="hoy", provider=p, end_date=today),
+        Account(platform="N", username="manana", end_date=today + timedelta(days=1)),
+        Account(platform="N", username="pronto", end_date=today + timedelta(days=5)),
+        Account(platform="N", username="lejos", end_date=today + timedelta(days=20)),
+        Account(platform="N", username="vencida", end_date=today - timedelta(days=1)),
+    ])
+    db.session.commit()
+
+
+def test_sections_bucketed_from_one_query(db):
+    _seed(db)
+    sections = _query_sections(date.today(), 7)
+
+    assert [r["username"] for r in sections["hoy"]] == ["hoy"]
+    assert [r["username"] for r in sections["mañana"]] == ["manana"]
+    assert [(r["username"], r["d"]) for r in sections["soon"]] == [("pronto", 5)]
+    assert sections["hoy"][0]["provider"] == "P1"
+    assert sections["mañana"][0]["client"] == ""
+
+
+def test_build_messages_summary_first(app, db):
+    _seed(db)
+    messages = build_pushover_messages(date.today(), 7, app.config)
+    assert messages[0]["title"].startswith("Resumen")
+    assert [m["title"] for m in messages[1:]] == ["VENCE HOY", "VENCE MAÑANA (1 día)", "POR VENCER (≤ 7 días)"]
+
+
+def test_pillow_chart_is_cached(monkeypatch):
+    from app.services import charts
+
+    counts = {"hoy": 2, "mañana": 0, "soon": 5}
+    png = charts.summary_chart_png(counts, date(2026, 1, 1))
+    assert png.startswith(b"\x89PNG")
+
+    monkeypatch.setattr(charts, "_render_pillow", lambda *a: pytest.fail("debería venir de la caché"))
+    assert charts.summary_chart_png(counts, date(2026, 1, 1)) == png
+
+
+def test_notify_does_not_import_matplotlib():
+    import subprocess
+    import sys
+
+    code = "import sys, app.services.notify; print('matplotlib' in sys.modules)"
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "False"
+
+
+def test_delta_mode_only_details_new_accounts(app, db, monkeypatch):
+    from app.models import NotificationLog
+    from app.services import notify
+
+    _seed(db)
+    sent = []
+    monkeypatch.setattr(notify.PushoverDispatcher, "send_all",
+                        lambda self, jobs: sent.extend(jobs) or [(True, "OK")] * len(jobs))
+    monkeypatch.setitem(app.config, "PUSHOVER_USER_KEY", "u")
+    monkeypatch.setitem(app.config, "PUSHOVER_API_TOKEN", "t")
+
+    with app.test_request_context():
+        notify.send_pushover_now(mode="delta")
+        assert NotificationLog.query.count() == 3
+
+        # Segunda corrida: nada nuevo, no se envía nada
+        sent.clear()
+        assert notify.send_pushover_now(mode="delta") == [("Pushover", True, "Sin novedades")]
+        assert sent == []
+
+        # Cambia la fecha de una cuenta: vuelve a avisarse, con los totales de la ventana
+        a = Account.query.filter_by(username="pronto").one()
+        a.end_date = date.today() + timedelta(days=6)
+        db.session.commit()
+        messages = build_pushover_messages(date.today(), 7, app.config, mode="delta")
+        assert [m["section"] for m in messages] == ["resumen", "soon"]
+        assert [r["username"] for r in messages[1]["items"]] == ["pronto"]
+        assert "Vence <b>HOY</b>: 1" in messages[0]["message"]
+
+        # El modo completo sigue listando todo
+        full = build_pushover_messages(date.today(), 7, app.config, mode="full")
+        assert [m["section"] for m in full] == ["resumen", "hoy", "mañana", "soon"]
+
+
+def test_full_send_after_delta_updates_log(app, db, monkeypatch):
+    from app.models import NotificationLog
+    from app.services import notify
+
+    _seed(db)
+    monkeypatch.setattr(notify.PushoverDispatcher, "send_all", lambda self, jobs: [(True, "OK")] * len(jobs))
+    monkeypatch.setitem(app.config, "PUSHOVER_USER_KEY", "u")
+    monkeypatch.setitem(app.config, "PUSHOVER_API_TOKEN", "t")
+
+    with app.test_request_context():
+        notify.send_pushover_now(mode="delta")
+        first = {l.account_id: l.notified_at for l in NotificationLog.query}
+
+        # Una cuenta nueva entra en la ventana y se manda el resumen completo
+        db.session.add(Account(platform="N", username="nueva", end_date=date.today() + timedelta(days=3)))
+        db.session.commit()
+        notify.send_pushover_now(mode="full")
+
+        logs = {l.account_id: l.notified_at for l in NotificationLog.query}
+        assert len(logs) == 4
+        assert all(logs[k] >= v for k, v in first.items())
+        # La corrida delta siguiente no repite nada
+        assert notify.send_pushover_now(mode="delta") == [("Pushover", True, "Sin novedades")]
@@ -0,0 +1,102 @@
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import text
+
+from app.models import Account
+from app.services.pagination import keyset_paginate, order_forward
+
+
+def _seed(db):
+    today = date.today()
+    created = datetime(2025, 1, 1)
+    rows = []
+    for i in range(23):
+        end = None if i % 5 == 0 else today + timedelta(days=i % 4)
+        # created_at repetido a propósito: el id desempata
+        rows.append(Account(platform="N", username=f"u{i}", end_date=end, created_at=created + timedelta(hours=i % 3)))
+    db.session.add_all(rows)
+    db.session.commit()
+
+
+def test_walk_forward_and_back_matches_offset_order(db):
+    _seed(db)
+    expected = [a.id for a in Account.query.order_by(*order_forward()).all()]
+
+    seen, pages, after = [], [], None
+    while True:
+        page = keyset_paginate(Account.query, 5, after=after)
+        seen += [a.id for a in page.items]
+        pages.append(page)
+        if not page.has_next:
+            break
+        after = page.next_cursor
+    assert seen == expected
+    assert not pages[0].has_prev and pages[-1].prev_cursor
+
+    # Volver hacia atrás desde la última página reproduce las anteriores
+    back = keyset_paginate(Account.query, 5, before=pages[-1].prev_cursor)
+    assert [a.id for a in back.items] == [a.id for a in pages[-2].items]
+    assert back.has_next and back.has_prev
+
+
+def test_invalid_cursor_falls_back_to_first_page(db):
+    _seed(db)
+    page = keyset_paginate(Account.query, 5, after="no-es-un-cursor")
+    assert [a.id for a in page.items] == [a.id for a in Account.query.order_by(*order_forward()).limit(5)]
+
+
+def test_pages_across_null_created_at(db):
+    from sqlalchemy import update
+
+    _seed(db)
+    # Cuentas anteriores a la columna: created_at NULL, con y sin end_date
+    db.session.execute(update(Account).where(Account.id % 4 == 0).values(created_at=None))
+    db.session.commit()
+    expected = [a.id for a in Account.query.order_by(*order_forward()).all()]
+    assert len(expected) == 23
+
+    seen, pages, after = [], [], None
+    while True:
+        page = keyset_paginate(Account.query, 3, after=after)
+        seen += [a.id for a in page.items]
+        pages.append(page)
+        if not page.has_next:
+            break
+        after = page.next_cursor
+    assert seen == expected
+
+    for prev, page in zip(pages, pages[1:]):
+        back = keyset_paginate(Account.query, 3, before=page.prev_cursor)
+        assert [a.id for a in back.items] == [a.id for a in prev.items]
+
+
+def test_pages_walk_the_list_index(db):
+    from sqlalchemy.orm import contains_eager
+
+    from app.services.filters import apply_account_filters, join_account_names
+    from tests.query_budget import count_queries
+
+    _seed(db)
+    db.session.execute(text("ANALYZE"))
+
+    def plans(status):
+        query = apply_account_filters(
+            join_account_names(Account.query).options(contains_eager(Account.client), contains_eager(Account.provider)),
+            status=status,
+        )
+        with count_queries(db.engine) as stmts:
+            first = keyset_paginate(query, 3)
+            second = keyset_paginate(query, 3, after=first.next_cursor)
+            keyset_paginate(query, 3, before=second.prev_cursor)
+        conn = db.session.connection()
+        return [
+            " | ".join(row[-1] for row in conn.exec_driver_sql("EXPLAIN QUERY PLAN " + s, p))
+            for s, p in zip(stmts.statements, stmts.parameters)
+        ]
+
+    for status, index in (("all", "ix_account_list_order"), ("expiring", "ix_account_status_list_order")):
+        first, after, before = plans(status)
+        for plan in (first, after, before):
+            assert f"USING INDEX {index}" in plan and "TEMP B-TREE" not in plan, plan
+        # Con cursor se salta directo a la fecha (rango sobre el índice), no se recorre desde el inicio
+        assert "<expr>>?" in after and "<expr><?" in before, (after, before)
@@ -0,0 +1,102 @@
+"""Dispatcher de Pushover contra un servidor local de pruebas."""
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+import pytest
+
+from app.services.pushover import PushoverDispatcher
+
+
+class _Stub(BaseHTTPRequestHandler):
+    # Respuestas a devolver en orden; cuando se acaban, 200
+    script = []
+    received = []
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0))).decode()
+        self.received.append(parse_qs(body).get("title", [""])[0])
+        status = self.script.pop(0) if self.script else 200
+        if status == "slow":
+            # Recibe el mensaje pero no contesta a tiempo (el cliente ya se fue)
+            time.sleep(0.5)
+            self.close_connection = True
+            return
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.end_headers()
+        self.wfile.write(b'{"status":1}')
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub():
+    _Stub.script, _Stub.received = [], []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Stub)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield _Stub, f"http://127.0.0.1:{server.server_port}/1/messages.json"
+    server.shutdown()
+
+
+def _cfg(url, **extra):
+    cfg = {"PUSHOVER_API_URL": url, "PUSHOVER_MAX_PER_SECOND": 0, "PUSHOVER_BACKOFF_SECONDS": 0.01,
+           "PUSHOVER_CONCURRENCY": 3}
+    cfg.update(extra)
+    return cfg
+
+
+def test_sends_all_in_order(stub):
+    handler, url = stub
+    jobs = [({"title": f"m{i}"}, None) for i in range(6)]
+    results = PushoverDispatcher(_cfg(url)).send_all(jobs)
+    assert results == [(True, "OK")] * 6
+    assert handler.received[0] == "m0"  # el resumen sale primero
+    assert sorted(handler.received) == [f"m{i}" for i in range(6)]
+
+
+def test_retries_transient_errors(stub):
+    handler, url = stub
+    handler.script = [503, 429]
+    ok, info = PushoverDispatcher(_cfg(url)).post({"title": "x"})
+    assert (ok, info) == (True, "OK")
+    assert len(handler.received) == 3
+
+
+def test_client_errors_are_not_retried(stub):
+    handler, url = stub
+    handler.script = [400]
+    ok, _ = PushoverDispatcher(_cfg(url)).post({"title": "x"})
+    assert not ok
+    assert len(handler.received) == 1
+
+
+def test_gives_up_after_max_retries(stub):
+    handler, url = stub
+    handler.script = [500, 500, 500]
+    ok, info = PushoverDispatcher(_cfg(url, PUSHOVER_MAX_RETRIES=2)).post({"title": "x"})
+    assert (ok, info) == (False, "HTTP 500")
+
+
+def test_read_timeout_is_not_retried(stub):
+    # Pushover pudo haber aceptado el mensaje: reintentar lo duplicaría
+    handler, url = stub
+    handler.script = ["slow"]
+    ok, _ = PushoverDispatcher(_cfg(url, PUSHOVER_TIMEOUT=0.1)).post({"title": "x"})
+    assert not ok
+    assert len(handler.received) == 1
+
+
+def test_connection_errors_are_retried(monkeypatch):
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    retries = []
+    dispatcher = PushoverDispatcher(_cfg(f"http://127.0.0.1:{port}/1/messages.json", PUSHOVER_MAX_RETRIES=2))
+    monkeypatch.setattr(dispatcher, "_sleep_before_retry", lambda attempt, resp=None: retries.append(attempt))
+    ok, _ = dispatcher.post({"title": "x"})
+    assert not ok
+    assert retries == [0, 1]
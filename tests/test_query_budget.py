@@ -0,0 +1,49 @@
+"""Presupuesto de consultas por ruta: no debe crecer con el número de filas."""
+from datetime import date, timedelta
+
+from app.models import Account, Provider, Client
+from app.services.notify import _query_sections
+
+from .query_budget import assert_max_queries
+
+
+def _seed(db, n):
+    today = date.today()
+    for i in range(n):
+        p = Provider(name=f"P{i}")
+        c = Client(name=f"C{i}", provider=p)
+        db.session.add(Account(platform="N", username=f"u{i}", provider=p, client=c,
+                               end_date=today + timedelta(days=i % 5)))
+    db.session.commit()
+
+
+def test_accounts_index_budget(logged_client, db):
+    _seed(db, 10)
+    logged_client.get("/accounts/")  # calienta status_bucket y el total cacheado
+    with assert_max_queries(db.engine, 3):
+        r = logged_client.get("/accounts/")
+    assert r.status_code == 200
+    assert b"C9" in r.data or b"C0" in r.data
+
+
+def test_clients_index_budget(logged_client, db):
+    _seed(db, 10)
+    with assert_max_queries(db.engine, 4):
+        r = logged_client.get("/clients/")
+    assert r.status_code == 200
+    assert b"P9" in r.data
+
+
+def test_account_edit_budget(logged_client, db):
+    _seed(db, 1)
+    with assert_max_queries(db.engine, 3):
+        r = logged_client.get("/accounts/1/edit")
+    assert r.status_code == 200
+
+
+def test_notify_sections_budget(app, db):
+    _seed(db, 10)
+    with assert_max_queries(db.engine, 1):
+        sections = _query_sections(date.today(), 7)
+    assert sum(len(v) for v in sections.values()) == 10
+    assert all(r["client"] and r["provider"] for v in sections.values() for r in v)
@@ -0,0 +1,63 @@
+from datetime import datetime, timedelta
+
+from app.models import ScheduledJob
+from app.services.scheduler import DailyJob, acquire_lease, release_lease, run_due_jobs
+
+NOW = datetime(2026, 3, 10, 9, 30)
+
+
+def test_single_leader_with_failover(db):
+    assert acquire_lease("a", 90, now=NOW)
+    assert not acquire_lease("b", 90, now=NOW + timedelta(seconds=30))
+    # El líder renueva con su latido
+    assert acquire_lease("a", 90, now=NOW + timedelta(seconds=60))
+    # Si deja de latir, el lease vence y otro lo toma
+    assert acquire_lease("b", 90, now=NOW + timedelta(seconds=200))
+    assert not acquire_lease("a", 90, now=NOW + timedelta(seconds=210))
+
+
+def test_release_hands_over_immediately(db):
+    assert acquire_lease("a", 90)
+    release_lease("a")
+    assert acquire_lease("b", 90, now=datetime.utcnow() + timedelta(seconds=1))
+
+
+def test_each_slot_runs_once_across_processes(app, db):
+    calls = []
+    jobs = [DailyJob("notify_daily", 9, 0, lambda app: calls.append("notify"))]
+
+    # Dos procesos que se creen líderes a la vez
+    assert run_due_jobs(app, jobs, "a", now=NOW) == ["notify_daily"]
+    assert run_due_jobs(app, jobs, "b", now=NOW) == []
+    assert calls == ["notify"]
+    # Antes de la hora del día siguiente no hay nada pendiente
+    assert run_due_jobs(app, jobs, "a", now=NOW + timedelta(hours=20)) == []
+    assert db.session.get(ScheduledJob, "notify_daily").last_status == "done"
+
+
+def test_missed_runs_are_caught_up_once(app, db):
+    calls = []
+    jobs = [DailyJob("notify_daily", 9, 0, lambda app: calls.append(1))]
+    run_due_jobs(app, jobs, "a", now=NOW)
+
+    # La máquina estuvo parada de 8:00 a 10:00 del día siguiente: se recupera al volver
+    assert run_due_jobs(app, jobs, "a", now=NOW + timedelta(days=1, minutes=30)) == ["notify_daily"]
+    assert len(calls) == 2
+
+
+def test_stale_runs_are_skipped(app, db):
+    calls = []
+    jobs = [DailyJob("notify_daily", 9, 0, lambda app: calls.append(1))]
+    late = NOW.replace(hour=23)
+    assert run_due_jobs(app, jobs, "a", now=late, grace_seconds=3600) == []
+    assert calls == []
+    assert db.session.get(ScheduledJob, "notify_daily").last_status == "skipped"
+
+
+def test_failures_are_recorded(app, db):
+    def boom(app):
+        raise RuntimeError("sin red")
+
+    run_due_jobs(app, [DailyJob("notify_daily", 9, 0, boom)], "a", now=NOW)
+    row = db.session.get(ScheduledJob, "notify_daily")
+    assert (row.last_status, row.last_error) == ("failed", "sin red")
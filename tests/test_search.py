@@ -0,0 +1,69 @@
+from app.models import Account, Client, Provider
+from app.services import search
+from app.services.filters import join_account_names, apply_account_filters
+from app.services.importer import import_rows
+
+
+def _ids(q):
+    query = apply_account_filters(join_account_names(Account.query), q=q)
+    return sorted(a.username for a in query)
+
+
+def _seed(db):
+    p = Provider(name="Proveedor Norte")
+    c = Client(name="Cliente Ñandú", provider=p)
+    db.session.add_all([
+        Account(platform="Netflix", username="juan@x.com", client=c, provider=p),
+        Account(platform="Disney+", username="ana@x.com"),
+    ])
+    db.session.commit()
+
+
+def test_document_follows_orm_writes(db):
+    _seed(db)
+    a = Account.query.filter_by(username="juan@x.com").one()
+    assert a.search_text == "netflix juan@x.com cliente ñandú proveedor norte"
+
+    a.platform = "Max"
+    db.session.commit()
+    assert Account.query.filter_by(username="juan@x.com").one().search_text.startswith("max ")
+
+    # Renombrar el cliente actualiza las cuentas que lo usan
+    Client.query.one().name = "Cliente Sur"
+    db.session.commit()
+    db.session.expire_all()
+    assert "cliente sur" in Account.query.filter_by(username="juan@x.com").one().search_text
+
+
+def test_search_uses_fts_on_sqlite(db):
+    _seed(db)
+    assert search.fts_enabled()
+    assert _ids("NORTE") == ["juan@x.com"]
+    assert _ids("ñandú") == ["juan@x.com"]
+    assert _ids("@x.com") == ["ana@x.com", "juan@x.com"]
+    # Menos de 3 caracteres: LIKE sobre la columna
+    assert _ids("an") == ["ana@x.com", "juan@x.com"]
+    assert _ids("zzz") == []
+
+    # Borrar la cuenta la saca del índice
+    db.session.delete(Account.query.filter_by(username="juan@x.com").one())
+    db.session.commit()
+    assert _ids("norte") == []
+
+
+def test_bulk_import_fills_document(db):
+    import_rows([{"platform": "Netflix", "username": "a@x.com", "provider": "P1", "client": "Casa"}])
+    db.session.commit()
+    assert _ids("casa") == ["a@x.com"]
+
+    import_rows([{"platform": "Netflix", "username": "a@x.com", "client": "Oficina"}],
+                mode="upsert", columns=["platform", "username", "client"])
+    db.session.commit()
+    assert _ids("casa") == []
+    assert _ids("oficina") == ["a@x.com"]
+
+
+def test_index_route_searches(logged_client, db):
+    _seed(db)
+    html = logged_client.get("/accounts/?q=norte").get_data(as_text=True)
+    assert "juan@x.com" in html and "ana@x.com" not in html
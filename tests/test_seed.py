@@ -0,0 +1,34 @@
+from datetime import date
+
+from app.models import Account, Client, Provider, compute_status_bucket
+from app.services import synthetic
+
+
+def test_seed_counts_and_derived_columns(db):
+    today = date(2030, 6, 1)
+    totals = synthetic.seed(accounts=1200, clients=40, providers=5, today=today, batch=500)
+    assert totals == {"providers": 5, "clients": 40, "accounts": 1200}
+    assert Account.query.count() == 1200
+
+    for a in Account.query.limit(50):
+        assert a.status_bucket == compute_status_bucket(a.status_manual, a.end_date, today)
+        assert a.platform.lower() in a.search_text
+
+    # Los vencimientos se concentran cerca de hoy, pero hay de todos los estados
+    buckets = {b for (b,) in db.session.query(Account.status_bucket).distinct()}
+    assert buckets == {"down", "nodate", "expired", "expiring", "active"}
+
+
+def test_seed_reuses_catalogs(db):
+    synthetic.seed(accounts=10, clients=8, providers=3)
+    synthetic.seed(accounts=10, clients=8, providers=3)
+    assert (Provider.query.count(), Client.query.count(), Account.query.count()) == (3, 8, 20)
+
+
+def test_seed_cli_wipe(app, db):
+    runner = app.test_cli_runner()
+    result = runner.invoke(args=["seed", "--accounts", "30", "--clients", "5", "--providers", "2"])
+    assert result.exit_code == 0, result.output
+    result = runner.invoke(args=["seed", "--accounts", "7", "--clients", "5", "--providers", "2", "--wipe", "--yes"])
+    assert result.exit_code == 0, result.output
+    assert Account.query.count() == 7
@@ -1,2 +1,8 @@
-def test_placeholder():
-    assert True
+from app.services import synthetic
+
+
+def test_pages_render_on_seeded_data(logged_client, db):
+    synthetic.seed(accounts=300, clients=20, providers=4)
+    for url in ("/", "/accounts/", "/accounts/?status=expiring", "/accounts/?q=cliente",
+                "/accounts/export?format=csv", "/clients/", "/providers/"):
+        assert logged_client.get(url).status_code == 200, url
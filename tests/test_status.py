@@ -0,0 +1,70 @@
+from datetime import date, timedelta
+
+from app.models import Account
+from app.services.importer import import_rows
+from app.services.status import IN_CHUNK, refresh_ids, refresh_status_buckets
+from tests.query_budget import count_queries
+
+
+def test_bucket_follows_writes(db):
+    today = date.today()
+    a = Account(platform="N", username="a", end_date=today + timedelta(days=30))
+    db.session.add(a)
+    db.session.commit()
+    assert a.status_bucket == "active"
+
+    a.end_date = today + timedelta(days=2)
+    db.session.commit()
+    assert a.status_bucket == "expiring"
+
+    a.status_manual = "CAIDA"
+    db.session.commit()
+    assert a.status_bucket == "down"
+
+
+def test_refresh_moves_rows_across_boundaries(db):
+    today = date.today()
+    db.session.add_all([
+        Account(platform="N", username="a", end_date=today + timedelta(days=8)),
+        Account(platform="N", username="b", end_date=today + timedelta(days=1)),
+        Account(platform="N", username="c", end_date=today + timedelta(days=60)),
+    ])
+    db.session.commit()
+
+    # Dos días después: a pasa a "por vencer" y b a "vencida"
+    changed = refresh_status_buckets(today + timedelta(days=2))
+    db.session.commit()
+
+    assert changed == 2
+    buckets = dict(db.session.query(Account.username, Account.status_bucket).all())
+    assert buckets == {"a": "expiring", "b": "expired", "c": "active"}
+
+
+def test_bulk_import_sets_bucket(db):
+    past = (date.today() - timedelta(days=1)).isoformat()
+    import_rows([{"platform": "N", "username": "a", "end_date": past}, {"platform": "N", "username": "b"}])
+    db.session.commit()
+    Account.query.filter_by(username="a").one().status_manual = "CAIDA"
+    db.session.commit()
+
+    import_rows([{"platform": "N", "username": "a", "end_date": None}], mode="upsert",
+                columns=["platform", "username", "end_date"])
+    db.session.commit()
+    db.session.expire_all()
+
+    buckets = dict(db.session.query(Account.username, Account.status_bucket).all())
+    # El estado manual se conserva aunque la hoja cambie la fecha
+    assert buckets == {"a": "down", "b": "nodate"}
+
+
+def test_refresh_ids_chunks_large_lists(db):
+    past = date.today() - timedelta(days=1)
+    db.session.add_all([Account(platform="N", username=f"u{i}", end_date=past) for i in range(IN_CHUNK + 10)])
+    db.session.commit()
+    ids = [a.id for a in Account.query]
+
+    with count_queries(db.engine) as counter:
+        changed = refresh_ids(ids + [10 ** 9] * 1000)
+    assert changed == len(ids)
+    # 1510 ids -> 4 UPDATE de como mucho IN_CHUNK ids cada uno
+    assert len(counter.statements) == 4